@@ -0,0 +1,200 @@
+"""Аутентификация по JWT без запроса к базе на каждый запрос.
+
+Токен, выданный `RoleAccessToken`, несёт роль и флаги `is_staff`,
+`is_superuser`. По ним `CachedJWTAuthentication` строит ленивого
+пользователя: права доступа читают поля из токена, а строка пользователя
+загружается, только когда нужны другие поля, и берётся из ограниченного
+кэша процесса с временем жизни (`API_USER_CACHE`).
+
+Полям токена доверяют только `TIMEOUT` секунд после его выдачи, дальше
+пользователь читается из кэша процесса или базы. Поэтому изменение роли,
+флагов или активности доходит до любого процесса не дольше чем за
+`TIMEOUT`, даже с кэшем Django в памяти процесса. Кроме того, в процессе,
+где пользователя изменили, запись в кэше процесса сбрасывается, а в кэше
+Django сохраняется время изменения: токены, выданные раньше, сразу
+перестают доверять своим полям. С общим бэкендом кэша так происходит во
+всех процессах.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import metrics
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+    'KEY_PREFIX': 'auth-claims-changed',
+}
+
+# Поля пользователя, которые копируются в токен.
+CLAIMS = ('role', 'is_staff', 'is_superuser')
+# Изменение этих полей делает поля уже выданных токенов недействительными.
+TRACKED_FIELDS = CLAIMS + ('is_active',)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'API_USER_CACHE', {})}
+
+
+class UserCache:
+    """
+    Строки пользователей по id: не больше `MAX_ENTRIES`, каждая живёт
+    `TIMEOUT` секунд. Хранятся значения полей, а не экземпляры, поэтому
+    каждый запрос получает свой объект.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                row = entry[1]
+            else:
+                row = False
+        if row is not False:
+            metrics.CACHE_REQUESTS.inc(cache='user', result='hit')
+            return self.build(row)
+        metrics.CACHE_REQUESTS.inc(cache='user', result='miss')
+        model = get_user_model()
+        user = model.objects.filter(pk=user_id).first()
+        row = None
+        if user is not None:
+            row = (user._state.db, tuple(
+                getattr(user, field.attname)
+                for field in model._meta.concrete_fields
+            ))
+        config = get_config()
+        with self.lock:
+            self.entries[user_id] = (now + config['TIMEOUT'], row)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > config['MAX_ENTRIES']:
+                self.entries.popitem(last=False)
+        return user
+
+    def build(self, row):
+        if row is None:
+            return None
+        model = get_user_model()
+        db, values = row
+        names = [field.attname for field in model._meta.concrete_fields]
+        return model.from_db(db, names, values)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_cache():
+    return caches[get_config()['CACHE']]
+
+
+def changed_key(user_id):
+    return f'{get_config()["KEY_PREFIX"]}:{user_id}'
+
+
+def invalidate_user(user_id, claims_changed=False):
+    """Сбрасывает пользователя в кэше после фиксации транзакции."""
+    def invalidate():
+        user_cache.invalidate(user_id)
+        if claims_changed:
+            get_cache().set(
+                changed_key(user_id),
+                time.time(),
+                jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+            )
+    transaction.on_commit(invalidate)
+
+
+def claims_are_fresh(user_id, token):
+    """
+    Токен выдан не раньше `TIMEOUT` секунд назад и после последнего
+    изменения роли пользователя.
+    """
+    if any(claim not in token for claim in CLAIMS) or 'iat' not in token:
+        return False
+    if time.time() >= token['iat'] + get_config()['TIMEOUT']:
+        return False
+    changed = get_cache().get(changed_key(user_id))
+    return changed is None or token['iat'] > changed
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью и флагами пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['iat'] = int(time.time())
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    Пользователь из токена: id, роль и флаги известны сразу, остальные
+    поля загружаются при первом обращении.
+    """
+
+    def __init__(self, user_id, claims, load):
+        super().__init__(load)
+        self.__dict__.update(
+            claims,
+            pk=user_id,
+            id=user_id,
+            is_active=True,
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатор пользователя'
+            )
+        if claims_are_fresh(user_id, validated_token):
+            claims = {claim: validated_token[claim] for claim in CLAIMS}
+            return LazyUser(user_id, claims, lambda: self.load_user(user_id))
+        return self.load_user(user_id)
+
+    def load_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден', code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен', code='user_inactive'
+            )
+        return user
@@ -0,0 +1,175 @@
+"""Версии ресурсов API и кэш ответов.
+
+Каждая область данных (`category`, `title:5`, `review:title:5` и т.п.)
+имеет в кэше счётчик поколений и время последнего изменения. Запись в модель
+увеличивает счётчики своих областей (см. `api.signals`). Из схемы, хоста и
+пути запроса, строки запроса, типа содержимого и поколений областей, от
+которых зависит ответ, строится дайджест версии: он служит и ETag, и ключом
+кэша ответов.
+Поэтому проверка условных запросов и поиск в кэше не обращаются к базе.
+
+Счётчики хранятся в кэше `API_RESPONSE_CACHE['CACHE']`, поэтому при
+нескольких процессах нужен общий бэкенд (memcached, redis, файловый кэш).
+"""
+import hashlib
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import metrics
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CONDITIONAL': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+    'KEY_PREFIX': 'api-response',
+}
+
+# Общая область всех версий: её смена сбрасывает все ETag и кэш разом.
+EPOCH = 'epoch'
+
+HITS = 'hits'
+MISSES = 'misses'
+
+Version = namedtuple('Version', ('digest', 'last_modified'))
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'API_RESPONSE_CACHE', {})}
+
+
+def is_enabled():
+    return get_config()['ENABLED']
+
+
+def is_conditional():
+    return get_config()['CONDITIONAL']
+
+
+def _cache_and_prefix():
+    config = get_config()
+    return caches[config['CACHE']], config['KEY_PREFIX']
+
+
+def _generation_key(prefix, scope):
+    return f'{prefix}:generation:{scope}'
+
+
+def _changed_key(prefix, scope):
+    return f'{prefix}:changed:{scope}'
+
+
+def _stats_key(prefix, name):
+    return f'{prefix}:stats:{name}'
+
+
+def get_generations(scopes):
+    """
+    Поколения и время изменения областей одним обращением к кэшу.
+    Пропавший счётчик заводится заново со временем «сейчас».
+    """
+    cache, prefix = _cache_and_prefix()
+    generation_keys = [_generation_key(prefix, scope) for scope in scopes]
+    changed_keys = [_changed_key(prefix, scope) for scope in scopes]
+    values = cache.get_many(generation_keys + changed_keys)
+    for generation_key, changed_key in zip(generation_keys, changed_keys):
+        if generation_key not in values:
+            # Новое значение не должно совпасть ни с одним прежним,
+            # иначе после вытеснения счётчика ожили бы старые ответы.
+            cache.add(generation_key, time.time_ns(), None)
+            values[generation_key] = cache.get(generation_key)
+        if changed_key not in values:
+            values[changed_key] = time.time()
+            cache.add(changed_key, values[changed_key], None)
+    generations = [values[key] for key in generation_keys]
+    changed = max((values[key] for key in changed_keys), default=None)
+    return generations, changed
+
+
+def bump_generation(scope):
+    cache, prefix = _cache_and_prefix()
+    key = _generation_key(prefix, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(_changed_key(prefix, scope), time.time(), None)
+
+
+def invalidate_all():
+    """Для массовых изменений в обход сигналов (импорт, миграции данных)."""
+    bump_generation(EPOCH)
+
+
+def get_version(request, scopes):
+    generations, changed = get_generations((EPOCH, *scopes))
+    query = '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        for value in values
+    )
+    # Схема и хост входят в ключ: ссылки next/previous в ответе абсолютные.
+    raw = '|'.join((
+        request.scheme,
+        request.get_host(),
+        request.path,
+        query,
+        request.accepted_renderer.media_type,
+        ','.join(str(generation) for generation in generations),
+    ))
+    return Version(
+        digest=hashlib.sha1(raw.encode('utf-8')).hexdigest(),
+        last_modified=int(changed) if changed is not None else None,
+    )
+
+
+def _response_key(version):
+    _, prefix = _cache_and_prefix()
+    return f'{prefix}:response:{version.digest}'
+
+
+def get_response(version):
+    cache, _ = _cache_and_prefix()
+    data = cache.get(_response_key(version))
+    record(HITS if data is not None else MISSES)
+    metrics.CACHE_REQUESTS.inc(
+        cache='response', result='hit' if data is not None else 'miss'
+    )
+    return data
+
+
+def set_response(version, data):
+    cache, _ = _cache_and_prefix()
+    cache.set(_response_key(version), data, get_config()['TIMEOUT'])
+
+
+def record(name):
+    cache, prefix = _cache_and_prefix()
+    key = _stats_key(prefix, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    cache, prefix = _cache_and_prefix()
+    keys = {name: _stats_key(prefix, name) for name in (HITS, MISSES)}
+    values = cache.get_many(keys.values())
+    hits = values.get(keys[HITS], 0)
+    misses = values.get(keys[MISSES], 0)
+    total = hits + misses
+    return {
+        HITS: hits,
+        MISSES: misses,
+        'ratio': hits / total if total else None,
+    }
+
+
+def reset_stats():
+    cache, prefix = _cache_and_prefix()
+    cache.delete_many([_stats_key(prefix, name) for name in (HITS, MISSES)])
@@ -1,4 +1,7 @@
+from django.db import connections
+from django.db.models import Q
 from django_filters import CharFilter, FilterSet, NumberFilter
+from titles import search
 from titles.models import Title
 
 
@@ -18,7 +21,30 @@ class TitleFilter(FilterSet):
     year = NumberFilter(
         field_name='year',
     )
+    search = CharFilter(
+        method='filter_search',
+    )
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию, лучшие первыми."""
+        if connections[queryset.db].vendor != 'sqlite':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        match = search.build_match_query(value)
+        if not match:
+            return queryset.none()
+        table = search.FTS_TABLE
+        return queryset.extra(
+            tables=[table],
+            where=[
+                f'{table}.rowid = {Title._meta.db_table}.id',
+                f'{table} MATCH %s',
+            ],
+            params=[match],
+            order_by=[f'{table}.rank'],
+        )
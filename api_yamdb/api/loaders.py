@@ -0,0 +1,53 @@
+"""
+Пакетная загрузка связанных объектов (в духе DataLoader).
+
+Вместо ленивой загрузки внешнего ключа у каждого объекта страницы
+собираются все нужные id, и недостающие объекты загружаются одним
+запросом. Загруженные объекты кэшируются на запросе, поэтому повторные
+обращения в том же запросе не идут в базу.
+"""
+
+
+class BatchLoader:
+    """Объекты модели по первичному ключу, пачками и с кэшем."""
+
+    def __init__(self, model):
+        self.model = model
+        self.cache = {}
+
+    def load_many(self, keys):
+        missing = set(keys).difference(self.cache)
+        if missing:
+            self.cache.update(self.model._default_manager.in_bulk(missing))
+        return [self.cache.get(key) for key in keys]
+
+    def load(self, key):
+        return self.load_many((key,))[0]
+
+    def prime(self, obj):
+        self.cache.setdefault(obj.pk, obj)
+
+
+def get_loader(request, model):
+    """Загрузчик `model`, общий для всего запроса."""
+    if request is None:
+        return BatchLoader(model)
+    loaders = getattr(request, 'loaders', None)
+    if loaders is None:
+        loaders = request.loaders = {}
+    if model not in loaders:
+        loaders[model] = BatchLoader(model)
+    return loaders[model]
+
+
+def load_related(instances, field_name, loader):
+    """Заполняет внешний ключ `field_name` у всех объектов одним запросом."""
+    if not instances:
+        return
+    field = instances[0]._meta.get_field(field_name)
+    pending = [obj for obj in instances if not field.is_cached(obj)]
+    related = loader.load_many(
+        [getattr(obj, field.attname) for obj in pending]
+    )
+    for obj, value in zip(pending, related):
+        field.set_cached_value(obj, value)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api import cache as response_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает число попаданий и промахов кэша ответов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = response_cache.get_stats()
+        ratio = stats['ratio']
+        self.stdout.write(
+            f'hits: {stats["hits"]}\n'
+            f'misses: {stats["misses"]}\n'
+            f'hit ratio: {"-" if ratio is None else f"{ratio:.2%}"}'
+        )
+        if options['reset']:
+            response_cache.reset_stats()
@@ -1,4 +1,18 @@
-from rest_framework import filters, mixins, viewsets
+import functools
+
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import cache as response_cache
+from .permission import UserAdminOnly
+from core import routers
+from core.middleware import measure
 
 
 class CreateDestroyListGenericMixin(mixins.CreateModelMixin,
@@ -8,3 +22,224 @@ class CreateDestroyListGenericMixin(mixins.CreateModelMixin,
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+
+
+class VersionedMixin:
+    """Версия ответа по областям данных, от которых он зависит."""
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        return self.cache_dependencies
+
+    def get_version(self, refresh=False):
+        if refresh or getattr(self, '_version', None) is None:
+            self._version = response_cache.get_version(
+                self.request, self.get_cache_dependencies()
+            )
+        return self._version
+
+
+class CachedListMixin(VersionedMixin):
+    """Отдаёт список из кэша ответов, пока не изменились его зависимости."""
+
+    def list(self, request, *args, **kwargs):
+        if not response_cache.is_enabled():
+            return super().list(request, *args, **kwargs)
+        version = self.get_version()
+        data = response_cache.get_response(version)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = super().list(request, *args, **kwargs)
+        # Реплика могла ещё не получить изменения, учтённые в версии.
+        if (
+            response.status_code == status.HTTP_200_OK
+            and not routers.replica_was_read()
+        ):
+            response_cache.set_response(version, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalResponse(Exception):
+    """Готовый ответ 304/412, прерывающий обработку запроса."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalMixin(VersionedMixin):
+    """
+    ETag и Last-Modified для чтения, If-None-Match/If-Modified-Since
+    отвечают 304, If-Match/If-Unmodified-Since защищают изменение и
+    удаление (412). Проверка выполняется после прав доступа, но до
+    обращения к базе и сериализации.
+    """
+    conditional_actions = (
+        'list', 'retrieve', 'update', 'partial_update', 'destroy',
+    )
+
+    def is_conditional(self):
+        return (
+            response_cache.is_conditional()
+            and self.action in self.conditional_actions
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.is_conditional():
+            return
+        version = self.get_version()
+        response = get_conditional_response(
+            request,
+            etag=quote_etag(version.digest),
+            last_modified=version.last_modified,
+        )
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            self.is_conditional()
+            and response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+            )
+            and not routers.replica_was_read()
+        ):
+            version = self.get_version(
+                refresh=request.method not in permissions.SAFE_METHODS
+            )
+            response['ETag'] = quote_etag(version.digest)
+            if version.last_modified is not None:
+                response['Last-Modified'] = http_date(version.last_modified)
+        return response
+
+
+class CreateThrottleMixin:
+    """Ограничители частоты только для создания объектов (`create`)."""
+    create_throttle_classes = ()
+
+    def get_throttles(self):
+        if self.action == 'create':
+            return [throttle() for throttle in self.create_throttle_classes]
+        return super().get_throttles()
+
+
+class ParentObjectMixin:
+    """
+    Родительский объект из URL (произведение для отзывов, отзыв для
+    комментариев). Загружается не больше одного раза за запрос: объекты
+    хранятся в словаре на запросе, и представление, сериализаторы и права
+    доступа получают один и тот же экземпляр через `get_parent`.
+    `parent_lookups` — поле модели и имя аргумента URL.
+    """
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        objects = getattr(self.request, 'parent_objects', None)
+        if objects is None:
+            objects = self.request.parent_objects = {}
+        lookups = {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        }
+        key = (self.parent_model, tuple(sorted(lookups.items())))
+        if key not in objects:
+            objects[key] = get_object_or_404(self.parent_model, **lookups)
+        return objects[key]
+
+
+@functools.lru_cache(maxsize=None)
+def timed_serializer_class(serializer_class):
+    """Подкласс, у которого чтение `data` измеряется как `serialize`."""
+
+    class TimedSerializer(serializer_class):
+        timed = True
+
+        @property
+        def data(self):
+            with measure(self.context.get('request'), 'serialize'):
+                return super().data
+
+    TimedSerializer.__name__ = serializer_class.__name__
+    TimedSerializer.__qualname__ = serializer_class.__qualname__
+    return TimedSerializer
+
+
+class SerializeTimingMixin:
+    """Время `serializer.data` — в `serialize` заголовка Server-Timing."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if not getattr(serializer, 'timed', False):
+            serializer.__class__ = timed_serializer_class(type(serializer))
+        return serializer
+
+
+class ProjectionMixin:
+    """
+    `list` и `retrieve` без сериализатора: страница выбирается через
+    `values()` и собирается проекцией (`projection_class`). Запись по-прежнему
+    идёт через сериализаторы.
+    """
+    projection_class = None
+
+    def list(self, request, *args, **kwargs):
+        projection = self.projection_class()
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with measure(request, 'serialize'):
+                data = projection.render(page)
+            return self.get_paginated_response(data)
+        with measure(request, 'serialize'):
+            data = projection.render(queryset)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        projection = self.projection_class()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        with measure(request, 'serialize'):
+            rows = projection.render(projection.values(queryset)[:1])
+        if not rows:
+            raise Http404
+        self.check_object_permissions(request, rows[0])
+        return Response(rows[0])
+
+
+class BulkCreateMixin:
+    """`POST .../bulk/`: массовое создание объектов администратором."""
+    bulk_serializer_class = None
+
+    def get_bulk_serializer_context(self):
+        return self.get_serializer_context()
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        permission_classes=(permissions.IsAuthenticated, UserAdminOnly),
+    )
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.bulk_serializer_class(
+            data=request.data,
+            many=True,
+            context=self.get_bulk_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
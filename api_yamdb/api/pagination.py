@@ -0,0 +1,53 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class TitleCursorPagination(CursorPagination):
+    """Курсорная пагинация произведений по возрастанию id."""
+    ordering = 'id'
+    page_size_query_param = 'limit'
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация отзывов и комментариев, новые первыми."""
+    ordering = ('-pub_date', 'id')
+    page_size_query_param = 'limit'
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """
+    По умолчанию limit/offset, как и раньше. С параметром `?pagination=cursor`
+    (или с уже выданным `cursor`) страница строится курсором: без COUNT(*)
+    и без OFFSET, поэтому глубокие страницы не дороже первой.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = None
+
+    def use_cursor(self, request):
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or cursor_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(OptionalCursorPagination):
+    cursor_pagination_class = TitleCursorPagination
+
+
+class PubDatePagination(OptionalCursorPagination):
+    cursor_pagination_class = PubDateCursorPagination
@@ -2,9 +2,14 @@ from rest_framework import permissions
 from rest_framework.permissions import SAFE_METHODS
 
 
+def is_admin(user):
+    """Администратор API: роль `admin` или персонал Django."""
+    return user.is_authenticated and (user.role == 'admin' or user.is_staff)
+
+
 class UserAdminOnly(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.role == 'admin' or request.user.is_staff
+        return is_admin(request.user)
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -21,11 +26,20 @@ class IsAdminOrReadOnly(permissions.BasePermission):
 
 class ReviewAndCommentPermission(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.method in SAFE_METHODS or request.user.is_authenticated
+        if request.method in SAFE_METHODS:
+            return True
+        if not request.user.is_authenticated:
+            return False
+        # Несуществующий родитель — 404 до разбора тела запроса; объект
+        # остаётся в запросе для сериализатора и perform_create.
+        view.get_parent()
+        return True
 
     def has_object_permission(self, request, view, obj):
         return request.method in SAFE_METHODS or (
             request.user.is_authenticated
             and (
-                obj.author == request.user or request.user.role == 'moderator')
+                obj.author_id == request.user.pk
+                or request.user.role == 'moderator'
+            )
         )
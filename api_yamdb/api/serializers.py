@@ -1,38 +1,83 @@
 import datetime
 
-from django.shortcuts import get_object_or_404
+from core import metrics
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from reviews.models import Comment, Review
+from reviews.signals import shift_title_rating
 from titles.models import Category, Genre, Title
 from user.models import User
 
+from .loaders import get_loader, load_related
+from .signals import bump_on_commit
+
 
 class UserAuthSerializer(serializers.ModelSerializer):
-    """Сериализатор для авторизации пользователя."""
+    """
+    Сериализатор для регистрации пользователя. Уникальность username и
+    email проверяет сама база при вставке (`create`), без предварительных
+    запросов: так два одновременных запроса не создадут двух пользователей.
+    """
 
     class Meta:
         model = User
         fields = ('username', 'email',)
+        extra_kwargs = {
+            'username': {
+                'validators': User._meta.get_field('username').validators,
+            },
+            'email': {'validators': []},
+        }
 
     def validate(self, data):
-        if User.objects.filter(username=data['username']).exists():
-            raise ValidationError('Пользователь c таким именем существует')
         if data['username'] == 'me':
             raise ValidationError(
                 'Пользователь c таким именем нельзя зарегистрировать'
             )
-        if User.objects.filter(email=data['email']).exists():
-            return ValidationError(
-                'Такая электронная почта уже зарегистрирована'
-            )
         return data
 
+    def create(self, validated_data):
+        """
+        Новый пользователь или уже зарегистрированный с теми же username и
+        email (повторная отправка кода, в том числе за новым токеном).
+        """
+        self.created = False
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(**validated_data)
+                self.created = True
+                return user
+            except IntegrityError:
+                user = self.get_registered(**validated_data)
+                if user is not None:
+                    return user
+        raise ValidationError('Не удалось зарегистрировать пользователя')
+
+    def get_registered(self, username, email):
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        for user in users:
+            if user.username == username and user.email == email:
+                return user
+            if user.username == username:
+                raise ValidationError(
+                    {'username': ['Пользователь c таким именем существует']}
+                )
+            raise ValidationError(
+                {'email': ['Такая электронная почта уже зарегистрирована']}
+            )
+        # Пользователя удалили между вставкой и выборкой: пробуем снова.
+        return None
+
 
 class MyTokenObtainPairSerializer(serializers.Serializer):
     """Сериализатор для получения JWT токена."""
     username = serializers.CharField(max_length=150)
-    confirmation_code = serializers.CharField(max_length=10)
+    confirmation_code = serializers.CharField(max_length=64)
 
 
 class UserMeSerializer(serializers.ModelSerializer):
@@ -56,7 +101,20 @@ class UsersSerializer(serializers.ModelSerializer):
         lookup_field = 'username'
 
 
-class CategorySerializer(serializers.ModelSerializer):
+# Адреса `.../<slug>/`, занятые действиями списка (`BulkCreateMixin`).
+RESERVED_SLUGS = ('bulk',)
+
+
+class SlugSerializerMixin:
+    """Запрещает slug, совпадающий с адресом действия списка."""
+
+    def validate_slug(self, value):
+        if value in RESERVED_SLUGS:
+            raise ValidationError(f'Адрес «{value}» зарезервирован.')
+        return value
+
+
+class CategorySerializer(SlugSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для модели Category."""
     class Meta:
         model = Category
@@ -66,7 +124,7 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SlugSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
     class Meta:
         model = Genre
@@ -102,7 +160,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating',)
 
 
 class TitleViewSerializer(serializers.ModelSerializer):
@@ -117,10 +175,36 @@ class TitleViewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count',)
+
+
+def get_author_loader(context):
+    """Загрузчик авторов запроса; текущий пользователь уже в кэше."""
+    request = context.get('request')
+    loader = get_loader(request, User)
+    if request is not None and request.user.is_authenticated:
+        loader.prime(request.user)
+    return loader
+
+
+class AuthorListSerializer(serializers.ListSerializer):
+    """Авторы всех объектов списка загружаются одним запросом."""
+
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, 'all') else data)
+        load_related(instances, 'author', get_author_loader(self.context))
+        return super().to_representation(instances)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class AuthorSerializerMixin:
+    """Автор объекта берётся из загрузчика запроса, а не лениво из базы."""
+
+    def to_representation(self, instance):
+        load_related([instance], 'author', get_author_loader(self.context))
+        return super().to_representation(instance)
+
+
+class ReviewSerializer(AuthorSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
         default=serializers.CurrentUserDefault()
@@ -138,19 +222,21 @@ class ReviewSerializer(serializers.ModelSerializer):
     def validate(self, data):
         request = self.context['request']
         author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
+        title = self.context['view'].get_parent()
         if request.method == 'POST':
-            if Review.objects.filter(title=title, author=author).exists():
+            if Review.objects.filter(
+                title=title, author_id=author.pk
+            ).exists():
                 raise ValidationError('Вы уже оставляли отзыв.')
         return data
 
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date', 'rating',)
+        list_serializer_class = AuthorListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(AuthorSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -160,3 +246,260 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date',)
+        list_serializer_class = AuthorListSerializer
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Массовое создание объектов. Каждый элемент проверяется отдельно,
+    связанные объекты загружаются одним запросом на модель
+    (`resolve`), ошибки возвращаются списком по элементам. Запись
+    выполняется через `bulk_create`.
+    """
+    default_error_messages = {
+        'too_many': 'Не больше {max_items} объектов за один запрос.',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Ожидается непустой список объектов.'
+                ]
+            })
+        max_items = getattr(settings, 'API_BULK_MAX_ITEMS', 5000)
+        if len(data) > max_items:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.error_messages['too_many'].format(max_items=max_items)
+                ]
+            })
+        items = []
+        errors = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        self.resolve(items, errors)
+        if any(errors):
+            raise ValidationError(errors)
+        return items
+
+    def resolve(self, items, errors):
+        """Проверки, которым нужна база: одним запросом на модель."""
+
+    def add_error(self, errors, index, field, message):
+        errors[index].setdefault(field, []).append(message)
+
+    def check_unique(self, items, errors, field, queryset, lookup):
+        """Уникальность `field` и внутри пакета, и среди уже созданных."""
+        values = {item[field] for item in items if item is not None}
+        existing = set(queryset.filter(
+            **{f'{lookup}__in': values}
+        ).values_list(lookup, flat=True))
+        seen = set()
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            value = item[field]
+            if value in existing or value in seen:
+                self.add_error(
+                    errors, index, field, f'Значение «{value}» уже занято.'
+                )
+            seen.add(value)
+
+
+class SlugBulkListSerializer(BulkListSerializer):
+    """Категории и жанры: slug уникален."""
+
+    def resolve(self, items, errors):
+        model = self.child.Meta.model
+        self.check_unique(items, errors, 'slug', model.objects, 'slug')
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objects = model.objects.bulk_create(
+            [model(**item) for item in validated_data]
+        )
+        bump_on_commit((model._meta.model_name,))
+        return objects
+
+
+class CategoryBulkSerializer(
+    SlugSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = Category
+        fields = ('name', 'slug',)
+        extra_kwargs = {'slug': {'validators': []}}
+        list_serializer_class = SlugBulkListSerializer
+
+
+class GenreBulkSerializer(SlugSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Genre
+        fields = ('name', 'slug',)
+        extra_kwargs = {'slug': {'validators': []}}
+        list_serializer_class = SlugBulkListSerializer
+
+
+def assign_bulk_ids(model, objects):
+    """
+    Проставляет id объектам после `bulk_create`, если база их не вернула.
+    Вызывается в той же транзакции: SQLite держит блокировку записи с
+    первого INSERT до фиксации, поэтому последние `len(objects)` id
+    по возрастанию принадлежат этим объектам в порядке вставки.
+    """
+    if not objects or objects[0].pk is not None:
+        return
+    ids = list(model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    )[:len(objects)])
+    for obj, pk in zip(objects, reversed(ids)):
+        obj.pk = pk
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+
+    def resolve(self, items, errors):
+        valid = [item for item in items if item is not None]
+        categories = Category.objects.in_bulk(
+            {item['category_slug'] for item in valid}, field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid for slug in item['genre_slugs']},
+            field_name='slug',
+        )
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            item['category'] = categories.get(item['category_slug'])
+            if item['category'] is None:
+                self.add_error(
+                    errors, index, 'category',
+                    f'Категории «{item["category_slug"]}» не существует.'
+                )
+            item['genres'] = []
+            for slug in item['genre_slugs']:
+                if slug not in genres:
+                    self.add_error(
+                        errors, index, 'genre',
+                        f'Жанра «{slug}» не существует.'
+                    )
+                else:
+                    item['genres'].append(genres[slug])
+
+    def create(self, validated_data):
+        titles = []
+        for item in validated_data:
+            title = Title(
+                name=item['name'],
+                year=item.get('year'),
+                description=item.get('description'),
+                category=item['category'],
+            )
+            title.category_slug = item['category_slug']
+            title.genre_slugs = item['genre_slugs']
+            titles.append(title)
+        Title.objects.bulk_create(titles)
+        assign_bulk_ids(Title, titles)
+        links = dict.fromkeys(
+            (title.pk, genre.pk)
+            for title, item in zip(titles, validated_data)
+            for genre in item['genres']
+        )
+        Title.genre.through.objects.bulk_create([
+            Title.genre.through(title_id=title_id, genre_id=genre_id)
+            for title_id, genre_id in links
+        ])
+        bump_on_commit(('title',))
+        return titles
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Элемент массового создания произведений."""
+    category = serializers.SlugField(source='category_slug')
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False,
+        source='genre_slugs',
+    )
+    description = serializers.CharField(required=False)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'category', 'genre',)
+        list_serializer_class = TitleBulkListSerializer
+
+
+class ReviewBulkListSerializer(BulkListSerializer):
+
+    def resolve(self, items, errors):
+        title = self.context['title']
+        valid = [item for item in items if item is not None]
+        authors = User.objects.in_bulk(
+            {item['author_username'] for item in valid},
+            field_name='username',
+        )
+        reviewed = set(Review.objects.filter(
+            title=title, author__in=authors.values()
+        ).values_list('author_id', flat=True))
+        seen = set()
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            author = authors.get(item['author_username'])
+            if author is None:
+                self.add_error(
+                    errors, index, 'author',
+                    f'Пользователя «{item["author_username"]}» не существует.'
+                )
+                continue
+            if author.pk in reviewed or author.pk in seen:
+                self.add_error(
+                    errors, index, 'author',
+                    'Пользователь уже оставлял отзыв на это произведение.'
+                )
+            seen.add(author.pk)
+            item['author'] = author
+
+    def create(self, validated_data):
+        title = self.context['title']
+        reviews = [
+            Review(
+                title=title,
+                author=item['author'],
+                text=item['text'],
+                score=item['score'],
+            )
+            for item in validated_data
+        ]
+        Review.objects.bulk_create(reviews)
+        assign_bulk_ids(Review, reviews)
+        shift_title_rating(
+            title.pk, sum(review.score for review in reviews), len(reviews)
+        )
+        bump_on_commit(('review', f'review:title:{title.pk}'))
+        # bulk_create не отправляет post_save, поэтому счётчик — вручную.
+        metrics.REVIEW_WRITES.inc(len(reviews), operation='create')
+        return reviews
+
+
+class ReviewBulkSerializer(serializers.ModelSerializer):
+    """Элемент массового создания отзывов: автор задаётся явно."""
+    author = serializers.CharField(
+        max_length=150, source='author_username'
+    )
+    score = serializers.IntegerField(max_value=10, min_value=1)
+
+    class Meta:
+        model = Review
+        fields = ('id', 'text', 'author', 'score', 'pub_date',)
+        list_serializer_class = ReviewBulkListSerializer
+
+    def to_representation(self, instance):
+        instance.author_username = instance.author.username
+        return super().to_representation(instance)
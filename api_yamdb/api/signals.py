@@ -0,0 +1,151 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from user.models import User
+from . import cache as response_cache
+from .authentication import TRACKED_FIELDS, invalidate_user
+
+
+# Больше зависимых объектов — дешевле сменить эпоху, чем поколение каждого.
+MAX_DEPENDENT_SCOPES = 1000
+
+
+def get_scopes(instance, created=False):
+    """
+    Области версий, которые затрагивает запись объекта: общие — для
+    списков, `<модель>:<pk>` — для отдельных объектов. Отдельный объект
+    зависит только от своей области, поэтому запись в соседний объект не
+    меняет его ETag (см. `get_dependent_scopes`).
+    """
+    if isinstance(instance, Category):
+        return ('category',)
+    if isinstance(instance, Genre):
+        return ('genre',)
+    if isinstance(instance, Title):
+        return ('title', f'title:{instance.pk}')
+    if isinstance(instance, Review):
+        return (
+            'review',
+            f'review:title:{instance.title_id}',
+            f'review:{instance.pk}',
+        )
+    if isinstance(instance, Comment):
+        return (
+            'comment',
+            f'comment:review:{instance.review_id}',
+            f'comment:{instance.pk}',
+        )
+    if isinstance(instance, User):
+        # У нового пользователя ещё нет отзывов и комментариев.
+        return ('user',) if created else ('user', 'user:profile')
+    return ()
+
+
+def get_dependent_scopes(instance):
+    """
+    Области отдельных объектов, в которых показан изменяемый или удаляемый
+    объект: произведения категории или жанра, отзывы и комментарии автора.
+    Если их больше `MAX_DEPENDENT_SCOPES`, сменяется эпоха.
+    """
+    if isinstance(instance, Category):
+        scopes = [
+            ('title', Title.objects.filter(category=instance))
+        ]
+    elif isinstance(instance, Genre):
+        scopes = [('title', Title.objects.filter(genre=instance))]
+    elif isinstance(instance, User):
+        scopes = [
+            ('review', Review.objects.filter(author=instance)),
+            ('comment', Comment.objects.filter(author=instance)),
+        ]
+    else:
+        return ()
+    result = []
+    for prefix, queryset in scopes:
+        pks = queryset.order_by().values_list('pk', flat=True)
+        pks = list(pks[:MAX_DEPENDENT_SCOPES + 1])
+        if len(result) + len(pks) > MAX_DEPENDENT_SCOPES:
+            return (response_cache.EPOCH,)
+        result.extend(f'{prefix}:{pk}' for pk in pks)
+    return tuple(result)
+
+
+def bump_on_commit(scopes):
+    def bump():
+        for scope in scopes:
+            response_cache.bump_generation(scope)
+    # До фиксации транзакции читатели ещё видят старые данные: если сменить
+    # поколение раньше, под новой версией закэшировался бы старый ответ.
+    transaction.on_commit(bump)
+
+
+@receiver(post_save)
+def invalidate_on_save(sender, instance, created=False, raw=False,
+                       **kwargs):
+    scopes = get_scopes(instance, created)
+    if scopes and not created and not raw:
+        scopes += get_dependent_scopes(instance)
+    if scopes:
+        bump_on_commit(scopes)
+
+
+@receiver(pre_delete)
+def invalidate_dependents_on_delete(sender, instance, **kwargs):
+    # До удаления: потом связи уже обнулены или удалены каскадом.
+    scopes = get_dependent_scopes(instance)
+    if scopes:
+        bump_on_commit(scopes)
+
+
+@receiver(post_delete)
+def invalidate_on_delete(sender, instance, **kwargs):
+    scopes = get_scopes(instance)
+    if scopes:
+        bump_on_commit(scopes)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Изменены произведения жанра: от `genre` зависят списки.
+        scopes = ('title', 'genre')
+        if pk_set is None:
+            scopes += (response_cache.EPOCH,)
+        else:
+            scopes += tuple(f'title:{pk}' for pk in pk_set)
+        bump_on_commit(scopes)
+    else:
+        bump_on_commit(('title', f'title:{instance.pk}'))
+
+
+def get_tracked_fields(user):
+    # __dict__, а не getattr: отложенные поля не должны загружаться.
+    return tuple(user.__dict__.get(field) for field in TRACKED_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_tracked_fields(sender, instance, **kwargs):
+    instance._tracked_fields = get_tracked_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_on_save(sender, instance, created=False, **kwargs):
+    current = get_tracked_fields(instance)
+    invalidate_user(
+        instance.pk,
+        claims_changed=not created and current != instance._tracked_fields,
+    )
+    instance._tracked_fields = current
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    invalidate_user(instance.pk, claims_changed=True)
@@ -0,0 +1,199 @@
+"""Ограничение частоты запросов корзиной токенов.
+
+У каждой корзины ёмкость `N` и скорость пополнения `N / период` токенов в
+секунду (лимит `'N/min'` и т.п.). Запрос забирает один токен; если токенов
+меньше одного, ответ 429 с `Retry-After` — сколько ждать до следующего.
+
+Лимиты задаются в `API_THROTTLE['RATES']` по ключу `'<область>:<вид>'`,
+где вид — `ip` (адрес клиента), `user` (пользователь, для анонимов адрес)
+или `endpoint` (один общий счётчик области). Нет лимита — нет проверки.
+
+Адрес клиента — `REMOTE_ADDR`. Заголовок `X-Forwarded-For` клиент может
+подставить сам, поэтому он учитывается, только если задано число доверенных
+прокси перед приложением `API_THROTTLE['NUM_PROXIES']`: берётся адрес,
+добавленный самым дальним из них.
+
+Хранилище корзин (`API_THROTTLE['STORE']`):
+
+* `cache` — кэш Django: общий для процессов при общем бэкенде
+  (memcached, redis); чтение и запись корзины не атомарны между
+  процессами, в худшем случае пропускается несколько лишних запросов;
+* `memory` — словарь процесса, самый быстрый, счётчики у каждого процесса
+  свои;
+* `database` — таблица `core.ThrottleBucket`, одна атомарная UPSERT-запись
+  на запрос, общая для всех процессов.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from rest_framework.throttling import BaseThrottle
+
+from core.models import ThrottleBucket
+
+DEFAULTS = {
+    'ENABLED': True,
+    'STORE': 'cache',
+    'CACHE': 'default',
+    'KEY_PREFIX': 'throttle',
+    'NUM_PROXIES': 0,
+    'RATES': {},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'API_THROTTLE', {})}
+
+
+def parse_rate(rate):
+    """`'10/min'` → (ёмкость 10, 10 / 60 токенов в секунду)."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def refill(state, capacity, rate, now):
+    if state is None:
+        return float(capacity)
+    tokens, updated = state
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def take(tokens, rate):
+    """(пропустить, токенов после запроса, сколько ждать)."""
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / rate
+
+
+class MemoryStore:
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self.lock:
+            tokens = refill(self.buckets.get(key), capacity, rate, now)
+            allowed, tokens, wait = take(tokens, rate)
+            self.buckets[key] = (tokens, now)
+        return allowed, wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheStore:
+
+    def __init__(self):
+        # Атомарность внутри процесса; между процессами — см. описание модуля.
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        cache = caches[get_config()['CACHE']]
+        with self.lock:
+            tokens = refill(cache.get(key), capacity, rate, now)
+            allowed, tokens, wait = take(tokens, rate)
+            # Через capacity / rate секунд корзина всё равно была бы полной.
+            cache.set(key, (tokens, now), capacity / rate + 1)
+        return allowed, wait
+
+
+class DatabaseStore:
+    """Пополнение и списание считаются в самой записи UPSERT."""
+
+    def get_sql(self):
+        qn = connection.ops.quote_name
+        least = 'MIN' if connection.vendor == 'sqlite' else 'LEAST'
+        tokens = f'{least}(%s, {qn("tokens")} + (%s - {qn("updated")}) * %s)'
+        return (
+            f'INSERT INTO {qn(ThrottleBucket._meta.db_table)} '
+            f'({qn("key")}, {qn("tokens")}, {qn("updated")}, '
+            f'{qn("allowed")}) VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT ({qn("key")}) DO UPDATE SET '
+            f'{qn("allowed")} = {tokens} >= 1, '
+            f'{qn("tokens")} = CASE WHEN {tokens} >= 1 THEN {tokens} - 1 '
+            f'ELSE {tokens} END, '
+            f'{qn("updated")} = %s'
+        )
+
+    def consume(self, key, capacity, rate, now):
+        refilled = [capacity, now, rate]
+        params = (
+            [key, capacity - 1, now, True] + refilled * 4 + [now]
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(self.get_sql(), params)
+            tokens, allowed = ThrottleBucket.objects.filter(
+                key=key
+            ).values_list('tokens', 'allowed').get()
+        if allowed:
+            return True, 0
+        return False, (1 - tokens) / rate
+
+
+STORES = {
+    'memory': MemoryStore(),
+    'cache': CacheStore(),
+    'database': DatabaseStore(),
+}
+
+
+def get_client_ip(request):
+    """Адрес клиента с учётом `NUM_PROXIES` доверенных прокси."""
+    num_proxies = get_config()['NUM_PROXIES']
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if num_proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_ident(request, kind):
+    if kind == 'endpoint':
+        return '*'
+    if kind == 'user' and request.user and request.user.is_authenticated:
+        return f'user-{request.user.pk}'
+    return get_client_ip(request)
+
+
+class BucketThrottle(BaseThrottle):
+    """Корзина токенов для области `scope` и вида ключа `kind`."""
+    scope = None
+    kind = 'ip'
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        config = get_config()
+        rate = config['RATES'].get(f'{self.scope}:{self.kind}')
+        if not config['ENABLED'] or rate is None:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        key = ':'.join((
+            config['KEY_PREFIX'], self.scope, self.kind,
+            get_ident(request, self.kind),
+        ))
+        allowed, self.wait_time = STORES[config['STORE']].consume(
+            key, capacity, refill_rate, time.time()
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_time
+
+
+def throttles(scope, *kinds):
+    """Классы ограничителей области для `throttle_classes`."""
+    return [
+        type(
+            f'{scope.title()}{kind.title()}Throttle',
+            (BucketThrottle,),
+            {'scope': scope, 'kind': kind},
+        )
+        for kind in kinds
+    ]
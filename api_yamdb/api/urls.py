@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
 from .views import (
-    CategoryViewSet, CommentViewSet,
-    GenreViewSet, obtain_pair,
+    CategoryViewSet, CommentViewSet, export_data,
+    GenreViewSet, obtain_pair, profile_download,
     ReviewViewSet, user_sign_up,
     TitleViewSet, UsersViewSet,
 )
@@ -54,5 +54,11 @@ urlpatterns = [
         include(extra_patterns)
     ),
 
+    path('v1/export/<str:kind>/', export_data, name='export_data'),
+    path(
+        'v1/profiles/<str:name>/',
+        profile_download,
+        name='profile_download',
+    ),
     path('v1/', include(router.urls)),
 ]
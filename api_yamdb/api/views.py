@@ -1,28 +1,52 @@
-from django.db.models import Avg
+import os
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action, api_view, permission_classes, throttle_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from .authentication import RoleAccessToken
 from .filters import TitleFilter
-from .mixins import CreateDestroyListGenericMixin
+from .mixins import (
+    BulkCreateMixin,
+    CachedListMixin,
+    ConditionalMixin,
+    CreateDestroyListGenericMixin,
+    CreateThrottleMixin,
+    ParentObjectMixin,
+    ProjectionMixin,
+    SerializeTimingMixin,
+)
+from .pagination import PubDatePagination, TitlePagination
+from .projections import (
+    CommentProjection,
+    ReviewProjection,
+    TitleProjection,
+)
 from .permission import (
     IsAdminOrReadOnly,
     ReviewAndCommentPermission,
     UserAdminOnly,
 )
 from .serializers import (
-    CategorySerializer, CommentSerializer,
+    CategoryBulkSerializer, CategorySerializer,
+    CommentSerializer, GenreBulkSerializer,
     GenreSerializer, MyTokenObtainPairSerializer,
-    ReviewSerializer, TitleCreateSerializer,
+    ReviewBulkSerializer, ReviewSerializer,
+    TitleBulkSerializer, TitleCreateSerializer,
     TitleViewSerializer, UserAuthSerializer,
     UserMeSerializer, UsersSerializer,
 )
+from .throttling import throttles
+from core import exporter, metrics, outbox, profiling
 from reviews.models import Review
 from titles.models import Category, Genre, Title
 from user.models import User
@@ -30,35 +54,35 @@ from user.models import User
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes(throttles('signup', 'ip', 'endpoint'))
 def user_sign_up(request):
     serializer = UserAuthSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
-    serializer.save()
-    future_user = User.objects.get(
-        username=request.data['username'],
-        email=request.data['email'],
-    )
-    code = default_token_generator.make_token(future_user)
-    to_email = request.data['email']
+    try:
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+    except ValidationError:
+        metrics.SIGNUPS.inc(outcome='rejected')
+        raise
+    metrics.SIGNUPS.inc(outcome='created' if serializer.created else 'resent')
+    code = default_token_generator.make_token(user)
     sender = 'api'
     email_domen = '@email.com'
-    send_mail(
+    outbox.enqueue(
         'Confirmation_code',
         "Добро пожаловать {0}!"
         " Ваш код для получения JWT-токена: {1}".format(
-            request.data['username'],
+            user.username,
             code
         ),
         sender + email_domen,
-        [to_email],
-        fail_silently=False,
-
+        [user.email],
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes(throttles('token', 'ip', 'endpoint'))
 def obtain_pair(request):
     serializer = MyTokenObtainPairSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -66,9 +90,12 @@ def obtain_pair(request):
     if default_token_generator.check_token(
             cur_user, request.data['confirmation_code']
     ):
-        refresh = RefreshToken.for_user(cur_user)
+        # Вход подтверждает регистрацию и делает код одноразовым: last_login
+        # входит в хэш кода. update(), а не save(): сигналы сбросили бы
+        # версии ответов, зависящих от пользователей.
+        User.objects.filter(pk=cur_user.pk).update(last_login=timezone.now())
         token = {
-            'token': str(refresh.access_token)
+            'token': str(RoleAccessToken.for_user(cur_user))
         }
         return Response(token, status=status.HTTP_200_OK)
     return Response(
@@ -77,7 +104,64 @@ def obtain_pair(request):
     )
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, UserAdminOnly])
+def export_data(request, kind):
+    """
+    Потоковая выгрузка для администратора: `?fmt=ndjson|csv`, сжатие gzip,
+    если клиент передал `Accept-Encoding: gzip`.
+    """
+    if kind not in exporter.EXPORTS:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    fmt = request.query_params.get('fmt', 'ndjson')
+    if fmt not in exporter.FORMATS:
+        return Response(
+            data={'fmt': [
+                f'Допустимые форматы: {", ".join(exporter.FORMATS)}.'
+            ]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    compress = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = StreamingHttpResponse(
+        exporter.export(kind, fmt=fmt, compress=compress),
+        content_type=EXPORT_CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{fmt}"'
+    )
+    response['Vary'] = 'Accept-Encoding'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, UserAdminOnly])
+def profile_download(request, name):
+    """Файл профиля, сохранённый `core.middleware.ProfilingMiddleware`."""
+    path = profiling.get_path(name)
+    if path is None or not os.path.isfile(path):
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=name,
+        content_type=(
+            'text/plain; charset=utf-8' if name.endswith('.collapsed')
+            else 'application/octet-stream'
+        ),
+    )
+
+
+class UsersViewSet(ConditionalMixin, SerializeTimingMixin,
+                   viewsets.ModelViewSet):
+    cache_dependencies = ('user',)
     permission_classes = (permissions.IsAuthenticated, UserAdminOnly)
     queryset = User.objects.all()
     serializer_class = UsersSerializer
@@ -108,57 +192,103 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(CreateDestroyListGenericMixin):
+class CategoryViewSet(ConditionalMixin, CachedListMixin, BulkCreateMixin,
+                      SerializeTimingMixin, CreateDestroyListGenericMixin):
+    cache_dependencies = ('category',)
+    bulk_serializer_class = CategoryBulkSerializer
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = LimitOffsetPagination
 
 
-class GenreViewSet(CreateDestroyListGenericMixin):
+class GenreViewSet(ConditionalMixin, CachedListMixin, BulkCreateMixin,
+                   SerializeTimingMixin, CreateDestroyListGenericMixin):
+    cache_dependencies = ('genre',)
+    bulk_serializer_class = GenreBulkSerializer
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = LimitOffsetPagination
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).all()
+class TitleViewSet(ConditionalMixin, CachedListMixin, BulkCreateMixin,
+                   ProjectionMixin, SerializeTimingMixin,
+                   viewsets.ModelViewSet):
+    cache_dependencies = ('title', 'category', 'genre', 'review')
+    bulk_serializer_class = TitleBulkSerializer
+    projection_class = TitleProjection
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
+    def get_cache_dependencies(self):
+        pk = self.kwargs.get('pk')
+        if pk is None:
+            return self.cache_dependencies
+        return (f'title:{pk}', f'review:title:{pk}')
+
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleViewSerializer
         return TitleCreateSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalMixin, BulkCreateMixin, CreateThrottleMixin,
+                    ParentObjectMixin, ProjectionMixin, SerializeTimingMixin,
+                    viewsets.ModelViewSet):
+    bulk_serializer_class = ReviewBulkSerializer
+    create_throttle_classes = throttles('review', 'user', 'endpoint')
+    projection_class = ReviewProjection
     serializer_class = ReviewSerializer
     permission_classes = (ReviewAndCommentPermission,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+
+    def get_cache_dependencies(self):
+        pk = self.kwargs.get('pk')
+        if pk is not None:
+            return (f'review:{pk}',)
+        return (f'review:title:{self.kwargs.get("title_id")}', 'user:profile')
+
+    def get_bulk_serializer_context(self):
+        context = super().get_bulk_serializer_context()
+        context['title'] = self.get_parent()
+        return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_parent().reviews.all()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalMixin, CreateThrottleMixin, ParentObjectMixin,
+                     ProjectionMixin, SerializeTimingMixin,
+                     viewsets.ModelViewSet):
+    create_throttle_classes = throttles('comment', 'user', 'endpoint')
+    projection_class = CommentProjection
     serializer_class = CommentSerializer
     permission_classes = (ReviewAndCommentPermission,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+
+    def get_cache_dependencies(self):
+        pk = self.kwargs.get('pk')
+        if pk is not None:
+            return (f'comment:{pk}',)
+        return (
+            f'comment:review:{self.kwargs.get("review_id")}', 'user:profile'
+        )
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_parent().comments.all()
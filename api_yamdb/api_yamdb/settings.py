@@ -27,19 +27,24 @@ INSTALLED_APPS = [
     'rest_framework',
     'djoser',
     'user',
-    'api',
+    'api.apps.ApiConfig',
     'titles',
-    'reviews',
+    'reviews.apps.ReviewsConfig',
+    'core.apps.CoreConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -70,9 +75,132 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение остаётся открытым между запросами потока.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики для чтения: псевдонимы из DATABASES, см. core.routers. Например,
+# копия SQLite, которую обновляет `manage.py refresh_replicas --interval 5`:
+#     DATABASES['replica'] = {
+#         'ENGINE': 'django.db.backends.sqlite3',
+#         'NAME': os.path.join(BASE_DIR, 'db-replica.sqlite3'),
+#     }
+#     DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    # Сколько секунд после записи клиент читает из основной базы.
+    'PIN_SECONDS': 5,
+}
+
+# PRAGMA для каждого нового соединения с SQLite, см. core.db.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# Версии ресурсов (ETag) и кэш ответов живут в этом же кэше: при нескольких
+# процессах здесь должен быть общий бэкенд (memcached, redis, файловый).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'CONDITIONAL': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+API_BULK_MAX_ITEMS = 5000
+
+# Лимиты '<область>:<вид>' (вид: ip, user, endpoint), см. api.throttling.
+API_THROTTLE = {
+    'ENABLED': True,
+    'STORE': 'cache',
+    'CACHE': 'default',
+    # Число доверенных прокси перед приложением (nginx — 1); 0 — адрес
+    # клиента берётся только из REMOTE_ADDR, X-Forwarded-For не учитывается.
+    'NUM_PROXIES': 0,
+    'RATES': {
+        'signup:ip': '20/hour',
+        'signup:endpoint': '600/min',
+        'token:ip': '30/hour',
+        'token:endpoint': '600/min',
+        'review:user': '30/min',
+        'review:endpoint': '1200/min',
+        'comment:user': '60/min',
+        'comment:endpoint': '2400/min',
+    },
+}
+
+API_USER_CACHE = {
+    'CACHE': 'default',
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+}
+
+# Время запроса по частям: заголовок Server-Timing и журнал core.timing.
+REQUEST_TIMING = {
+    'ENABLED': True,
+    # Server-Timing только администраторам (и всем при DEBUG).
+    'HEADER': 'staff',
+    'LOG': True,
+    # В журнал попадают только медленные запросы; 0 — все.
+    'LOG_MIN_MS': 500,
+    'SLOW_QUERIES': 3,
+}
+
+# Профилирование запроса администратора по `X-Profile: cprofile|sample`.
+REQUEST_PROFILING = {
+    'ENABLED': True,
+    'DIR': os.path.join(BASE_DIR, 'profiles'),
+    'SAMPLE_INTERVAL': 0.001,
+    'MAX_FILES': 50,
+}
+
+# Метрики Prometheus на /metrics/. При нескольких процессах сервера задайте
+# общий каталог DIR: процессы пишут туда свои значения, /metrics/ их
+# складывает.
+METRICS = {
+    'ENABLED': True,
+    'DIR': None,
+    'FLUSH_INTERVAL': 1.0,
+    'ALLOWED_IPS': ('127.0.0.1', '::1'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 
 # Password validation
 
@@ -114,12 +242,21 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Письма уходят через очередь (core.outbox), отправляет `send_outbox`.
+EMAIL_OUTBOX = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF': 30,
+    'MAX_BACKOFF': 3600,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
@@ -0,0 +1,46 @@
+"""Настройка соединений SQLite.
+
+При открытии каждого соединения с базой SQLite выполняются PRAGMA из
+`SQLITE_PRAGMAS` (в порядке словаря). Значения по умолчанию рассчитаны на
+сервер с несколькими потоками или процессами:
+
+* `busy_timeout` — сколько миллисекунд ждать освобождения блокировки вместо
+  немедленной ошибки «database is locked»; идёт первым, чтобы ожидание
+  действовало и на смену режима журнала;
+* `journal_mode=WAL` — читатели не блокируются писателем и наоборот;
+  режим сохраняется в файле базы;
+* `synchronous=NORMAL` — в режиме WAL данные не теряются при падении
+  процесса, fsync выполняется только при контрольной точке;
+* `mmap_size`, `cache_size` (отрицательное значение — в КиБ),
+  `temp_store=MEMORY` — меньше системных вызовов на чтение и сортировки.
+"""
+import re
+
+from django.conf import settings
+
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+
+NAME_RE = re.compile(r'^[a-z_]+$')
+VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def get_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Обработчик `connection_created`."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_pragmas().items():
+            if not NAME_RE.match(name) or not VALUE_RE.match(str(value)):
+                raise ValueError(f'Недопустимая PRAGMA: {name}={value}')
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,150 @@
+"""Потоковая выгрузка произведений, отзывов и комментариев.
+
+Таблица читается пачками по первичному ключу (`pk > последний`), поэтому
+в памяти одновременно находится одна пачка, а SQLite не держит открытый
+курсор на всё время выгрузки. Жанры пачки произведений загружаются одним
+запросом. Строки выдаются как NDJSON или CSV, при желании сжатые gzip
+на лету.
+"""
+import csv
+import io
+import json
+import zlib
+
+from reviews.models import Comment, Review
+from titles.models import Title
+
+CHUNK_SIZE = 2000
+FORMATS = ('ndjson', 'csv')
+
+
+def iterate_batches(queryset, fields, chunk_size):
+    """Пачки словарей `values()` по возрастанию pk."""
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk').values(*fields)[
+                :chunk_size
+            ]
+        )
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]['pk']
+
+
+def title_batches(chunk_size):
+    fields = (
+        'pk', 'name', 'year', 'description', 'rating',
+        'category__name', 'category__slug',
+    )
+    links = Title.genre.through.objects.order_by('genre__name')
+    for batch in iterate_batches(Title.objects, fields, chunk_size):
+        genres = {row['pk']: [] for row in batch}
+        for title_id, name, slug in links.filter(
+            title_id__in=genres
+        ).values_list('title_id', 'genre__name', 'genre__slug'):
+            genres[title_id].append({'name': name, 'slug': slug})
+        yield [
+            {
+                'id': row['pk'],
+                'name': row['name'],
+                'year': row['year'],
+                'description': row['description'],
+                'rating': row['rating'],
+                'category': {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                } if row['category__slug'] is not None else None,
+                'genre': genres[row['pk']],
+            }
+            for row in batch
+        ]
+
+
+def review_batches(chunk_size):
+    fields = ('pk', 'title_id', 'text', 'author__username', 'score',
+              'pub_date')
+    for batch in iterate_batches(Review.objects, fields, chunk_size):
+        yield [
+            {
+                'id': row['pk'],
+                'title_id': row['title_id'],
+                'text': row['text'],
+                'author': row['author__username'],
+                'score': row['score'],
+                'pub_date': row['pub_date'].isoformat(),
+            }
+            for row in batch
+        ]
+
+
+def comment_batches(chunk_size):
+    fields = ('pk', 'review_id', 'review__title_id', 'text',
+              'author__username', 'pub_date')
+    for batch in iterate_batches(Comment.objects, fields, chunk_size):
+        yield [
+            {
+                'id': row['pk'],
+                'title_id': row['review__title_id'],
+                'review_id': row['review_id'],
+                'text': row['text'],
+                'author': row['author__username'],
+                'pub_date': row['pub_date'].isoformat(),
+            }
+            for row in batch
+        ]
+
+
+EXPORTS = {
+    'titles': title_batches,
+    'reviews': review_batches,
+    'comments': comment_batches,
+}
+
+
+def flatten(value):
+    """Значение для CSV: связанные объекты превращаются в slug."""
+    if isinstance(value, dict):
+        return value['slug']
+    if isinstance(value, list):
+        return ','.join(item['slug'] for item in value)
+    return value
+
+
+def to_ndjson(batches):
+    for batch in batches:
+        yield ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in batch
+        )
+
+
+def to_csv(batches):
+    header_written = False
+    for batch in batches:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(batch[0].keys())
+            header_written = True
+        writer.writerows(
+            [flatten(value) for value in row.values()] for row in batch
+        )
+        yield buffer.getvalue()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(kind, fmt='ndjson', compress=False, chunk_size=CHUNK_SIZE):
+    """Байтовые куски выгрузки `kind` в формате `fmt`."""
+    batches = EXPORTS[kind](chunk_size)
+    lines = to_csv(batches) if fmt == 'csv' else to_ndjson(batches)
+    chunks = (text.encode('utf-8') for text in lines)
+    return gzip_stream(chunks) if compress else chunks
@@ -0,0 +1,357 @@
+"""Синтетический набор данных в формате `static/data`.
+
+Генератор выдаёт записи тех же CSV-файлов, что читает `core.importer`:
+их можно записать в каталог (`write_csv`) или сразу загрузить в базу
+(команда `generate_data --database`). Категории и жанры из `static/data`
+входят в набор первыми, остальные строятся из них.
+
+Распределения близки к живому каталогу:
+
+* число отзывов на произведение подчиняется закону Ципфа (`zipf`), самые
+  популярные произведения разбросаны по id случайно;
+* у произведения от одного до трёх жанров, популярные жанры встречаются
+  чаще, поэтому жанры произведений пересекаются;
+* оценки группируются вокруг «качества» произведения;
+* тексты отзывов и комментариев — русские предложения логнормальной длины
+  с медианой `text_size` символов;
+* комментарии сосредоточены на небольшой доле отзывов.
+
+Каждая таблица получает свой генератор случайных чисел от `seed` и имени
+таблицы: при одинаковых параметрах набор совпадает байт в байт, а записи
+любой таблицы можно пропустить или построить заново независимо от других.
+"""
+import bisect
+import csv
+import itertools
+import math
+import os
+import random
+import time
+
+from .importer import chunked
+
+STATIC_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'static', 'data',
+)
+HEADERS = {
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'titles': ('id', 'name', 'year', 'category'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'users': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+    ),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+FILENAMES = {
+    'category': 'category.csv',
+    'genre': 'genre.csv',
+    'titles': 'titles.csv',
+    'genre_title': 'genre_title.csv',
+    'users': 'users.csv',
+    'review': 'review.csv',
+    'comments': 'comments.csv',
+}
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'героиня', 'финал', 'автор',
+    'музыка', 'саундтрек', 'актёр', 'режиссёр', 'история', 'персонаж',
+    'сцена', 'диалог', 'атмосфера', 'оператор', 'композитор', 'глава',
+    'роман', 'повесть', 'песня', 'альбом', 'голос', 'мир', 'время',
+    'жизнь', 'любовь', 'дружба', 'война', 'детство', 'город', 'дорога',
+    'отлично', 'скучно', 'затянуто', 'неожиданно', 'красиво', 'честно',
+    'смешно', 'грустно', 'страшно', 'тонко', 'ярко', 'медленно',
+    'шедевр', 'провал', 'классика', 'открытие', 'разочарование',
+    'очень', 'совсем', 'слишком', 'вполне', 'почти', 'никогда', 'снова',
+    'понравился', 'запомнилась', 'удивил', 'пересмотрю', 'советую',
+    'не', 'и', 'но', 'а', 'в', 'на', 'с', 'по', 'до', 'после', 'это',
+    'каждый', 'главный', 'второй', 'лучший', 'странный', 'новый',
+    'старый', 'живой', 'настоящий', 'последний', 'первый', 'долгий',
+)
+ENDINGS = ('.', '.', '.', '!', '?', '...')
+ADJECTIVES = (
+    'Тихий', 'Последний', 'Белый', 'Долгий', 'Забытый', 'Северный',
+    'Золотой', 'Тёмный', 'Далёкий', 'Старый', 'Новый', 'Красный',
+    'Ночной', 'Летний', 'Железный', 'Невидимый', 'Большой', 'Чужой',
+)
+NOUNS = (
+    'дом', 'берег', 'сад', 'город', 'путь', 'ветер', 'остров', 'мост',
+    'голос', 'сон', 'свет', 'лес', 'поезд', 'маяк', 'фронт', 'век',
+    'рассвет', 'закат', 'океан', 'двор', 'страх', 'шторм', 'театр',
+)
+FIRST_NAMES = (
+    'Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Алексей', 'Елена',
+    'Дмитрий', 'Наталья', 'Сергей', 'Татьяна', 'Михаил', 'Ирина',
+    'Андрей', 'Светлана', 'Николай', 'Юлия', 'Павел',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев',
+    'Козлов', 'Новиков', 'Морозов', 'Волков', 'Соловьёв', 'Васильев',
+    'Зайцев', 'Павлов', 'Семёнов', 'Голубев', 'Виноградов', 'Богданов',
+)
+CATEGORY_NAMES = (
+    'Сериал', 'Комикс', 'Игра', 'Подкаст', 'Спектакль', 'Аудиокнига',
+    'Мультфильм', 'Картина', 'Поэзия', 'Опера',
+)
+GENRE_NAMES = (
+    'Мелодрама', 'Нуар', 'Мюзикл', 'Биография', 'Военный', 'Семейный',
+    'Спорт', 'Исторический', 'Фэнтези', 'Киберпанк', 'Постапокалипсис',
+    'Мистика', 'Криминал', 'Антиутопия', 'Сатира', 'Притча',
+)
+CYRILLIC = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+LATIN = (
+    'a', 'b', 'v', 'g', 'd', 'e', 'e', 'zh', 'z', 'i', 'y', 'k', 'l', 'm',
+    'n', 'o', 'p', 'r', 's', 't', 'u', 'f', 'h', 'ts', 'ch', 'sh', 'sch',
+    '', 'y', '', 'e', 'yu', 'ya',
+)
+TRANSLIT = str.maketrans(dict(zip(CYRILLIC, LATIN)))
+
+# 2010-01-01 и 2021-01-01 UTC.
+DATE_FROM = 1262304000
+DATE_TO = 1609459200
+
+
+class Scale:
+    """
+    Размеры набора. Не заданные явно величины выводятся из числа отзывов:
+    произведений в 20 раз меньше, пользователей в 10 раз меньше (но не
+    меньше, чем отзывов у самого популярного произведения — у автора один
+    отзыв на произведение), комментариев вдвое меньше.
+    """
+
+    def __init__(self, reviews, titles=None, users=None, comments=None,
+                 categories=10, genres=30, text_size=300, zipf=1.0, seed=0):
+        self.seed = seed
+        self.reviews = reviews
+        self.titles = titles or max(reviews // 20, 10)
+        self.comments = reviews // 2 if comments is None else comments
+        self.categories = categories
+        self.genres = genres
+        self.text_size = text_size
+        self.zipf = zipf
+        self.review_counts = zipf_counts(
+            self.reviews, self.titles, zipf, self.get_random('review-counts')
+        )
+        self.users = max(
+            users or reviews // 10, max(self.review_counts, default=0), 1
+        )
+
+    def get_random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def get_rows(self, name):
+        """Записи таблицы `name` (строки, как в CSV), без заголовка."""
+        return ROWS[name](self, self.get_random(name))
+
+
+def zipf_counts(total, size, exponent, rng):
+    """
+    Делит `total` на `size` частей пропорционально 1 / rank ** exponent;
+    части перемешаны, чтобы популярность не зависела от id.
+    """
+    weights = [rank ** -exponent for rank in range(1, size + 1)]
+    norm = total / math.fsum(weights)
+    counts = [int(weight * norm) for weight in weights]
+    for rank in range(total - sum(counts)):
+        counts[rank] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def make_sentences(rng, size):
+    """Случайные предложения общей длиной не меньше `size`."""
+    sentences = []
+    length = 0
+    while length < size:
+        words = rng.choices(WORDS, k=rng.randint(4, 16))
+        sentence = ' '.join(words).capitalize() + rng.choice(ENDINGS)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return sentences
+
+
+class TextSource:
+    """
+    Тексты логнормальной длины: отрезки общего корпуса от начала одного
+    предложения до конца другого. Корпус и границы предложений строятся
+    один раз, поэтому текст стоит один двоичный поиск и срез строки.
+    """
+
+    def __init__(self, rng, median):
+        self.rng = rng
+        self.mu = math.log(median)
+        self.max_length = median * 20
+        sentences = make_sentences(rng, max(self.max_length * 4, 2 ** 20))
+        self.corpus = ' '.join(sentences)
+        self.starts = []
+        self.ends = []
+        position = 0
+        for sentence in sentences:
+            self.starts.append(position)
+            position += len(sentence)
+            self.ends.append(position)
+            position += 1
+        # Начало, после которого до конца корпуса есть max_length символов.
+        self.limit = bisect.bisect(
+            self.starts, len(self.corpus) - self.max_length
+        )
+
+    def __call__(self):
+        length = min(
+            self.rng.lognormvariate(self.mu, 0.8), self.max_length
+        )
+        start = self.starts[int(self.rng.random() * self.limit)]
+        end = self.ends[bisect.bisect_left(self.ends, start + length)]
+        return self.corpus[start:end]
+
+
+def random_date(rng):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(
+        DATE_FROM + int(rng.random() * (DATE_TO - DATE_FROM))
+    ))
+
+
+def read_base(filename):
+    with open(os.path.join(STATIC_PATH, filename), encoding='utf-8') as file:
+        return [
+            (int(row['id']), row['name'], row['slug'])
+            for row in csv.DictReader(file)
+        ]
+
+
+def extend_base(filename, names, size):
+    """Записи из `static/data`, дополненные до `size` новыми."""
+    rows = read_base(filename)[:size]
+    slugs = {slug for _, _, slug in rows}
+    next_id = max((pk for pk, _, _ in rows), default=0) + 1
+    variants = itertools.chain(names, (
+        f'{name} {number}'
+        for number in itertools.count(2) for name in names
+    ))
+    while len(rows) < size:
+        name = next(variants)
+        slug = name.lower().translate(TRANSLIT).replace(' ', '-')
+        if slug in slugs:
+            continue
+        slugs.add(slug)
+        rows.append((next_id, name, slug))
+        next_id += 1
+    return rows
+
+
+def category_rows(scale, rng):
+    return extend_base('category.csv', CATEGORY_NAMES, scale.categories)
+
+
+def genre_rows(scale, rng):
+    return extend_base('genre.csv', GENRE_NAMES, scale.genres)
+
+
+def title_rows(scale, rng):
+    categories = [
+        pk for pk, _, _ in extend_base(
+            'category.csv', CATEGORY_NAMES, scale.categories
+        )
+    ]
+    # Первые категории (фильмы, книги, музыка) заметно популярнее.
+    weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(categories) + 1)
+    ))
+    current_year = time.gmtime(DATE_TO).tm_year
+    for pk in range(1, scale.titles + 1):
+        name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+        # Новых произведений больше, чем старых.
+        year = current_year - int(rng.expovariate(1 / 15)) % 120
+        category = rng.choices(categories, cum_weights=weights)[0]
+        yield pk, name, year, category
+
+
+def genre_title_rows(scale, rng):
+    genres = [
+        pk for pk, _, _ in extend_base('genre.csv', GENRE_NAMES, scale.genres)
+    ]
+    weights = list(itertools.accumulate(
+        rank ** -scale.zipf for rank in range(1, len(genres) + 1)
+    ))
+    pk = 0
+    for title in range(1, scale.titles + 1):
+        chosen = set(rng.choices(
+            genres, cum_weights=weights, k=rng.choice((1, 1, 2, 2, 2, 3))
+        ))
+        for genre in sorted(chosen):
+            pk += 1
+            yield pk, title, genre
+
+
+def user_rows(scale, rng):
+    for pk in range(1, scale.users + 1):
+        chance = rng.random()
+        role = (
+            'admin' if chance < 0.001
+            else 'moderator' if chance < 0.01 else 'user'
+        )
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        if first_name.endswith('а') or first_name.endswith('я'):
+            last_name += 'а'
+        yield (
+            pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '',
+            first_name, last_name,
+        )
+
+
+def review_rows(scale, rng):
+    text = TextSource(rng, scale.text_size)
+    pk = 0
+    for title, count in enumerate(scale.review_counts, start=1):
+        quality = rng.uniform(3, 10)
+        # Подряд идущие id различны при count <= users: один отзыв автора
+        # на произведение.
+        first_author = rng.randrange(scale.users)
+        for offset in range(count):
+            pk += 1
+            score = min(max(round(rng.gauss(quality, 1.5)), 1), 10)
+            author = (first_author + offset) % scale.users + 1
+            yield pk, title, text(), author, score, random_date(rng)
+
+
+def comment_rows(scale, rng):
+    text = TextSource(rng, max(scale.text_size // 4, 1))
+    if not scale.reviews:
+        return
+    for pk in range(1, scale.comments + 1):
+        # Плотность ~ x ** (-2/3): обсуждают в основном немногие отзывы.
+        review = int(scale.reviews * rng.random() ** 3) + 1
+        author = rng.randrange(scale.users) + 1
+        yield pk, review, text(), author, random_date(rng)
+
+
+ROWS = {
+    'category': category_rows,
+    'genre': genre_rows,
+    'titles': title_rows,
+    'genre_title': genre_title_rows,
+    'users': user_rows,
+    'review': review_rows,
+    'comments': comment_rows,
+}
+TABLE_NAMES = tuple(ROWS)
+
+
+def write_csv(scale, path, tables=TABLE_NAMES):
+    """Записывает CSV-файлы набора в каталог `path`: {таблица: записей}."""
+    os.makedirs(path, exist_ok=True)
+    written = {}
+    for name in tables:
+        filename = os.path.join(path, FILENAMES[name])
+        with open(filename, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADERS[name])
+            count = 0
+            for chunk in chunked(scale.get_rows(name), 10000):
+                writer.writerows(chunk)
+                count += len(chunk)
+        written[name] = count
+    return written
@@ -0,0 +1,214 @@
+"""Потоковая загрузка CSV-файлов из `static/data` в базу.
+
+Файлы читаются кусками по `chunk_size` записей. Значения разбираются и
+проверяются полями модели, а кусок вставляется одним `executemany` в обход
+ORM (сигналы и `auto_now_add` не срабатывают, даты берутся из файла) и
+фиксируется в отдельной транзакции вместе с отметкой `ImportCheckpoint`.
+После сбоя повторный запуск пропускает уже зафиксированные записи и
+продолжает со следующего куска.
+"""
+import csv
+import itertools
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from user.models import User
+from .models import ImportCheckpoint
+
+CHUNK_SIZE = 5000
+
+
+class CSVImportError(Exception):
+    """Ошибка в данных: загрузка остановлена на последнем целом куске."""
+
+
+class ImportTable:
+    """
+    Описание CSV-файла. Колонки называются как поля модели; колонка
+    внешнего ключа (`category`, `author`) содержит id связанного объекта.
+    """
+
+    def __init__(self, name, model, filename):
+        self.name = name
+        self.model = model
+        self.filename = filename
+
+    def __repr__(self):
+        return f'ImportTable({self.name!r})'
+
+    def get_plan(self, header):
+        """
+        Колонки таблицы и разбор строк для заголовка файла. Поля, которых
+        нет в файле, получают значения по умолчанию из модели.
+        """
+        converters = []
+        for column in header:
+            field = self.model._meta.get_field(column)
+            target = field.target_field if field.is_relation else field
+            converters.append((column, field, target.to_python))
+        present = {field for _, field, _ in converters}
+        defaults = []
+        for field in self.model._meta.concrete_fields:
+            if field in present or field.primary_key:
+                continue
+            if getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False
+            ):
+                value = timezone.now()
+            else:
+                value = field.get_default()
+            defaults.append((field, field.get_db_prep_save(value, connection)))
+        columns = tuple(
+            field.column for _, field, _ in converters
+        ) + tuple(field.column for field, _ in defaults)
+        return columns, converters, tuple(value for _, value in defaults)
+
+    def parse(self, converters, defaults, record, number):
+        """Строка CSV -> значения для INSERT; ошибки с номером записи."""
+        if len(record) != len(converters):
+            raise CSVImportError(
+                f'{self.filename}: запись {number}: ожидалось '
+                f'{len(converters)} значений, получено {len(record)}'
+            )
+        row = []
+        for (column, field, to_python), value in zip(converters, record):
+            if value == '' and field.null:
+                row.append(None)
+                continue
+            try:
+                value = to_python(value)
+            except ValidationError as error:
+                raise CSVImportError(
+                    f'{self.filename}: запись {number}: {column}: '
+                    f'{"; ".join(error.messages)}'
+                ) from error
+            row.append(field.get_db_prep_save(value, connection))
+        return (*row, *defaults)
+
+    def get_insert_sql(self, columns):
+        quote = connection.ops.quote_name
+        return 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(self.model._meta.db_table),
+            ', '.join(quote(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+
+
+# Порядок задаёт зависимости по внешним ключам.
+TABLES = (
+    ImportTable('category', Category, 'category.csv'),
+    ImportTable('genre', Genre, 'genre.csv'),
+    ImportTable('titles', Title, 'titles.csv'),
+    ImportTable('genre_title', Title.genre.through, 'genre_title.csv'),
+    ImportTable('users', User, 'users.csv'),
+    ImportTable('review', Review, 'review.csv'),
+    ImportTable('comments', Comment, 'comments.csv'),
+)
+TABLE_NAMES = tuple(table.name for table in TABLES)
+
+
+def get_table(name):
+    return TABLES[TABLE_NAMES.index(name)]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_checkpoint(table, path, restart=False):
+    checkpoint, created = ImportCheckpoint.objects.get_or_create(
+        table=table.name, defaults={'path': path}
+    )
+    if restart or created:
+        checkpoint.path = path
+        checkpoint.rows_done = 0
+        checkpoint.finished = False
+        checkpoint.save()
+    elif checkpoint.path != path:
+        raise CSVImportError(
+            f'Таблица {table.name} уже загружалась из {checkpoint.path}; '
+            'для загрузки другого файла запустите импорт с --restart'
+        )
+    return checkpoint
+
+
+def write_chunk(table, chunk, checkpoint):
+    """Вставляет кусок и сдвигает отметку в одной транзакции."""
+    columns, rows = chunk
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(table.get_insert_sql(columns), rows)
+        checkpoint.rows_done += len(rows)
+        checkpoint.save(update_fields=('rows_done', 'updated_at'))
+
+
+def read_records(path, skip, chunk_size):
+    """Заголовок файла и куски `(номер первой записи, записи)` после `skip`."""
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        records = itertools.islice(
+            (record for record in reader if record), skip, None
+        )
+        number = skip + 1
+        chunks = chunked(records, chunk_size)
+        yield header
+        for chunk in chunks:
+            yield number, chunk
+            number += len(chunk)
+
+
+def parse_chunk(table, header, number, records):
+    """Разбирает кусок записей в `(колонки, строки)` для `write_chunk`."""
+    columns, converters, defaults = table.get_plan(header)
+    return columns, [
+        table.parse(converters, defaults, record, record_number)
+        for record_number, record in enumerate(records, start=number)
+    ]
+
+
+def read_chunks(table, path, skip, chunk_size):
+    """Разобранные куски файла начиная с записи `skip`."""
+    records = read_records(path, skip, chunk_size)
+    header = next(records)
+    for number, chunk in records:
+        yield parse_chunk(table, header, number, chunk)
+
+
+def write_chunks(table, chunks, checkpoint, report=None):
+    """
+    Записывает разобранные куски по одному в транзакции и отмечает файл
+    загруженным. Возвращает число вставленных строк; `report(table,
+    rows_done, rows_per_second)` вызывается после каждого куска.
+    """
+    started = time.monotonic()
+    inserted = 0
+    for chunk in chunks:
+        write_chunk(table, chunk, checkpoint)
+        inserted += len(chunk[1])
+        if report is not None:
+            elapsed = time.monotonic() - started
+            report(table, checkpoint.rows_done, inserted / elapsed)
+    checkpoint.finished = True
+    checkpoint.save(update_fields=('finished', 'updated_at'))
+    return inserted
+
+
+def import_table(table, path, chunk_size=CHUNK_SIZE, restart=False,
+                 report=None):
+    """Загружает один файл в текущем процессе."""
+    checkpoint = get_checkpoint(table, path, restart)
+    if checkpoint.finished:
+        return 0
+    chunks = read_chunks(table, path, checkpoint.rows_done, chunk_size)
+    return write_chunks(table, chunks, checkpoint, report)
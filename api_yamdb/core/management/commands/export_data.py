@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core import exporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения, отзывы или комментарии в NDJSON или CSV '
+        'потоком, без загрузки всей таблицы в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=tuple(exporter.EXPORTS))
+        parser.add_argument(
+            '--format',
+            dest='fmt',
+            choices=exporter.FORMATS,
+            default='ndjson',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать выгрузку gzip.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки (по умолчанию stdout).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=exporter.CHUNK_SIZE,
+            help='Строк в одном запросе к базе.',
+        )
+
+    def handle(self, *args, **options):
+        chunks = exporter.export(
+            options['kind'],
+            fmt=options['fmt'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            return
+        output = getattr(self.stdout, 'buffer', None) or sys.stdout.buffer
+        for chunk in chunks:
+            output.write(chunk)
+        output.flush()
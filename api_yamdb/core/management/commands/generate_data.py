@@ -0,0 +1,150 @@
+import itertools
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api import cache as response_cache
+from core import generator, importer
+from core.models import ImportCheckpoint
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит синтетический набор данных в формате static/data: пишет '
+        'CSV-файлы для import_csv или сразу загружает их в пустую базу. '
+        'При одном и том же --seed набор одинаков.'
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument(
+            '--output',
+            help='Каталог для CSV-файлов.',
+        )
+        target.add_argument(
+            '--database',
+            action='store_true',
+            help='Загрузить набор в базу (таблицы должны быть пустыми).',
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=10000,
+            help='Число отзывов; остальные размеры выводятся из него.',
+        )
+        parser.add_argument('--titles', type=int)
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--comments', type=int)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument(
+            '--text-size',
+            type=int,
+            default=300,
+            help='Медианная длина отзыва в символах.',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.0,
+            help='Показатель закона Ципфа для отзывов на произведение.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=importer.CHUNK_SIZE,
+            help='Записей в одной транзакции при загрузке в базу.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Забыть сохранённый прогресс загрузки в базу.',
+        )
+
+    def report(self, table, rows_done, rate):
+        self.stdout.write(
+            f'{table.name}: {rows_done} строк, {rate:.0f} строк/с'
+        )
+
+    def handle(self, *args, **options):
+        if not options['output'] and not options['database']:
+            raise CommandError('Укажите --output или --database.')
+        scale = generator.Scale(
+            options['reviews'],
+            titles=options['titles'],
+            users=options['users'],
+            comments=options['comments'],
+            categories=options['categories'],
+            genres=options['genres'],
+            text_size=options['text_size'],
+            zipf=options['zipf'],
+            seed=options['seed'],
+        )
+        if options['output']:
+            total = generator.write_csv(scale, options['output'])
+        else:
+            total = self.load(scale, options)
+        for name, count in total.items():
+            self.stdout.write(self.style.SUCCESS(f'{name}: {count} строк'))
+
+    def check_empty(self, source, restart):
+        """
+        Набор вставляется с id с единицы, поэтому в непустую таблицу он
+        упал бы на IntegrityError посреди загрузки. Проверяются таблицы,
+        загрузка которых начинается заново, а не продолжается с отметки.
+        """
+        for table in importer.TABLES:
+            checkpoint = ImportCheckpoint.objects.filter(
+                table=table.name, path=source
+            ).first()
+            resuming = not restart and checkpoint is not None and (
+                checkpoint.rows_done or checkpoint.finished
+            )
+            if not resuming and table.model.objects.exists():
+                raise CommandError(
+                    f'Таблица {table.name} не пуста: загрузка --database '
+                    'возможна только в пустую базу.'
+                )
+
+    def load(self, scale, options):
+        """
+        Загружает записи генератора через разбор и вставку `import_csv`.
+        Набор детерминирован, поэтому после сбоя загрузка продолжается с
+        отметки `ImportCheckpoint`, как и загрузка файлов.
+        """
+        source = 'generate_data:' + ','.join(
+            f'{name}={options[name]}' for name in (
+                'reviews', 'titles', 'users', 'comments', 'categories',
+                'genres', 'text_size', 'zipf', 'seed',
+            )
+        )
+        self.check_empty(source, options['restart'])
+        total = {}
+        for table in importer.TABLES:
+            checkpoint = importer.get_checkpoint(
+                table, source, options['restart']
+            )
+            if checkpoint.finished:
+                total[table.name] = 0
+                continue
+            records = itertools.islice(
+                scale.get_rows(table.name), checkpoint.rows_done, None
+            )
+            chunks = (
+                importer.parse_chunk(
+                    table,
+                    generator.HEADERS[table.name],
+                    checkpoint.rows_done + 1,
+                    chunk,
+                )
+                for chunk in importer.chunked(records, options['chunk_size'])
+            )
+            total[table.name] = importer.write_chunks(
+                table, chunks, checkpoint, self.report
+            )
+        if total['review']:
+            call_command('rebuild_ratings', stdout=self.stdout)
+        if any(total.values()):
+            response_cache.invalidate_all()
+        return total
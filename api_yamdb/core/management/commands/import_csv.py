@@ -0,0 +1,93 @@
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api import cache as response_cache
+from core import importer, pipeline
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV-файлы в базу кусками с фиксацией каждого куска. '
+        'Повторный запуск продолжает с последнего зафиксированного куска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=importer.TABLE_NAMES,
+            default=importer.TABLE_NAMES,
+            help='Какие таблицы загружать (порядок по внешним ключам '
+                 'соблюдается всегда).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=importer.CHUNK_SIZE,
+            help='Записей в одной транзакции.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Процессов для разбора файлов; при 1 всё выполняется '
+                 'последовательно в текущем процессе.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Забыть сохранённый прогресс и загрузить файлы заново.',
+        )
+
+    def report(self, table, rows_done, rate):
+        self.stdout.write(
+            f'{table.name}: {rows_done} строк, {rate:.0f} строк/с'
+        )
+
+    def handle(self, *args, **options):
+        tables = [
+            table for table in importer.TABLES
+            if table.name in options['tables']
+        ]
+        paths = {
+            table.name: os.path.join(options['path'], table.filename)
+            for table in tables
+        }
+        try:
+            if options['workers'] > 1:
+                total = pipeline.import_tables(
+                    tables,
+                    paths,
+                    workers=options['workers'],
+                    chunk_size=options['chunk_size'],
+                    restart=options['restart'],
+                    report=self.report,
+                )
+            else:
+                total = {}
+                for table in pipeline.topological_order(tables):
+                    total[table.name] = importer.import_table(
+                        table,
+                        paths[table.name],
+                        chunk_size=options['chunk_size'],
+                        restart=options['restart'],
+                        report=self.report,
+                    )
+        except (importer.CSVImportError, OSError) as error:
+            raise CommandError(error)
+        if total.get('review'):
+            call_command('rebuild_ratings', stdout=self.stdout)
+        if any(total.values()):
+            response_cache.invalidate_all()
+        for name, inserted in total.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: загружено {inserted} строк'
+            ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+def seconds(value):
+    return '-' if value is None else f'{value:.1f} с'
+
+
+class Command(BaseCommand):
+    help = 'Показывает глубину очереди писем и задержку доставки.'
+
+    def handle(self, *args, **options):
+        stats = outbox.get_stats()
+        self.stdout.write(
+            f'depth: {stats["depth"]}\n'
+            f'oldest: {seconds(stats["oldest_age"])}\n'
+            f'failed: {stats["failed"]}\n'
+            f'latency p50: {seconds(stats["latency_p50"])}\n'
+            f'latency p95: {seconds(stats["latency_p95"])}\n'
+            f'latency max: {seconds(stats["latency_max"])}'
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import replicas
+from core.routers import get_replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет SQLite-копии основной базы, перечисленные в '
+        'DATABASE_REPLICAS. С --interval повторяет обновление.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Период обновления в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for alias in get_replicas():
+                started = time.perf_counter()
+                replicas.refresh(alias)
+                self.stdout.write(
+                    f'{alias}: {time.perf_counter() - started:.2f} с'
+                )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Пишет метку времени в основную базу и показывает, насколько '
+        'отстаёт от неё каждая реплика.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            type=float,
+            help='Повторять замер каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for alias, lag in replicas.measure().items():
+                self.stdout.write(
+                    f'{alias}: '
+                    + ('нет метки' if lag is None else f'{lag:.2f} с')
+                )
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
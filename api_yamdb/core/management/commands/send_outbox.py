@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение '
+        'с почтовым бэкендом. Без --once работает, пока не остановят.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Писем за один проход (по умолчанию EMAIL_OUTBOX).',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать готовые письма и выйти.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.deliver_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'отправлено: {sent}, ошибок: {failed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,450 @@
+"""Метрики процесса в текстовом формате Prometheus.
+
+Счётчики (`Counter`), значения (`Gauge`) и гистограммы с фиксированными
+границами (`Histogram`) хранятся в памяти процесса под блокировкой и
+отдаются по адресу `/metrics/` (`core.views.metrics_view`).
+
+Если у сервера несколько процессов, в `METRICS['DIR']` задаётся общий
+каталог: каждый процесс не чаще раза в `FLUSH_INTERVAL` секунд (и при
+выходе) сохраняет свои значения в файл `<pid>-<время запуска>.json`, а
+процесс, отвечающий на запрос `/metrics/`, складывает файлы всех процессов.
+Счётчики и гистограммы суммируются, в том числе от завершившихся процессов;
+значения `Gauge` — по `mode`: `sum`, `max` или `all` (отдельно с меткой
+`pid`), только от живых процессов. Файлы завершившихся процессов при сборе
+складываются в один `archive.json` и удаляются, поэтому каталог не растёт
+с перезапусками воркеров. Сбор идёт под блокировкой файла `archive.lock`.
+
+Функции `add_collector` вычисляются при каждом запросе `/metrics/` в
+отвечающем процессе — для значений, общих для всех процессов (глубина
+очереди писем в базе).
+"""
+import atexit
+import bisect
+import fcntl
+import json
+import math
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': None,
+    'FLUSH_INTERVAL': 1.0,
+    'ALLOWED_IPS': ('127.0.0.1', '::1'),
+}
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+GAUGE_MODES = ('sum', 'max', 'all')
+PROCESS_FILE_RE = re.compile(r'^(\d+)-\d+\.json$')
+ARCHIVE = 'archive.json'
+LOCK = 'archive.lock'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def get_key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'{self.name}: ожидались метки {self.labelnames}, '
+                f'получены {tuple(labels)}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self):
+        return {
+            'type': self.type,
+            'help': self.documentation,
+            'labelnames': self.labelnames,
+        }
+
+    def snapshot(self):
+        with self.lock:
+            return [[list(key), value] for key, value in self.values.items()]
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        registry.changed()
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), mode='sum'):
+        if mode not in GAUGE_MODES:
+            raise ValueError(f'{name}: mode — одно из {GAUGE_MODES}')
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode
+
+    def describe(self):
+        return {**super().describe(), 'mode': self.mode}
+
+    def set(self, value, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = value
+        registry.changed()
+
+    def inc(self, amount=1, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        registry.changed()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Число наблюдений по корзинам (не накопительно), сумма и количество."""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def describe(self):
+        return {**super().describe(), 'buckets': self.buckets}
+
+    def observe(self, value, **labels):
+        key = self.get_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {
+                    'counts': [0] * (len(self.buckets) + 1),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+        registry.changed()
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [list(key), {**state, 'counts': list(state['counts'])}]
+                for key, state in self.values.items()
+            ]
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.last_flush = 0.0
+        self.started = time.time_ns()
+
+    def register(self, metric):
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f'Метрика {metric.name} уже есть')
+            self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, name, documentation, function):
+        """Значение без меток, вычисляемое при каждом запросе метрик."""
+        self.collectors.append((name, documentation, function))
+
+    def snapshot(self):
+        return {
+            name: {**metric.describe(), 'samples': metric.snapshot()}
+            for name, metric in self.metrics.items()
+        }
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def get_path(self, directory):
+        return os.path.join(directory, f'{os.getpid()}-{self.started}.json')
+
+    def changed(self):
+        """После изменения: сохранить файл процесса, если пора."""
+        config = get_config()
+        if not config['DIR']:
+            return
+        now = time.monotonic()
+        if now - self.last_flush < config['FLUSH_INTERVAL']:
+            return
+        self.last_flush = now
+        self.flush(config['DIR'])
+
+    def flush(self, directory=None):
+        directory = directory or get_config()['DIR']
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = self.get_path(directory)
+        temporary = f'{path}.tmp'
+        with self.flush_lock:
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(temporary, path)
+
+    def collect(self):
+        """Снимки всех процессов: [(pid, живой ли, снимок)]."""
+        directory = get_config()['DIR']
+        if not directory:
+            return [(os.getpid(), True, self.snapshot())]
+        self.flush(directory)
+        with open(os.path.join(directory, LOCK), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return self.read_directory(directory)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def read_directory(self, directory):
+        """Читает файлы процессов, файлы завершившихся добавляет в архив."""
+        archive_path = os.path.join(directory, ARCHIVE)
+        archive = read_snapshot(archive_path) or {}
+        snapshots = []
+        dead = []
+        for filename in sorted(os.listdir(directory)):
+            match = PROCESS_FILE_RE.match(filename)
+            if not match:
+                continue
+            pid = int(match.group(1))
+            path = os.path.join(directory, filename)
+            snapshot = read_snapshot(path)
+            if snapshot is None:
+                continue
+            if is_alive(pid):
+                snapshots.append((pid, True, snapshot))
+            else:
+                dead.append((path, snapshot))
+        if dead:
+            archive = to_snapshot(merge(
+                [(0, False, archive)]
+                + [(0, False, snapshot) for _, snapshot in dead]
+            ))
+            temporary = f'{archive_path}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(archive, file)
+            os.replace(temporary, archive_path)
+            for path, _ in dead:
+                os.remove(path)
+        return [(0, False, archive)] + snapshots
+
+
+def read_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(snapshots):
+    """Складывает снимки процессов: {имя: (описание, {метки: значение})}."""
+    merged = {}
+    for pid, alive, snapshot in snapshots:
+        for name, data in snapshot.items():
+            description, values = merged.setdefault(name, (data, {}))
+            mode = data.get('mode')
+            if data['type'] == 'gauge' and not alive:
+                continue
+            for labelvalues, value in data['samples']:
+                if data['type'] == 'gauge' and mode == 'all':
+                    key = (*labelvalues, str(pid))
+                else:
+                    key = tuple(labelvalues)
+                if key not in values:
+                    values[key] = value
+                elif data['type'] == 'histogram':
+                    values[key] = {
+                        'counts': [
+                            a + b for a, b in zip(
+                                values[key]['counts'], value['counts']
+                            )
+                        ],
+                        'sum': values[key]['sum'] + value['sum'],
+                        'count': values[key]['count'] + value['count'],
+                    }
+                elif mode == 'max':
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] = values[key] + value
+    return merged
+
+
+def to_snapshot(merged):
+    """Обратно к формату файла процесса: результат `merge` для архива."""
+    return {
+        name: {
+            **data,
+            'samples': [[list(key), value] for key, value in values.items()],
+        }
+        for name, (data, values) in merged.items()
+    }
+
+
+def escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    )
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    ) + '}'
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(snapshots=None):
+    """Текст для Prometheus (формат 0.0.4)."""
+    if snapshots is None:
+        snapshots = registry.collect()
+    lines = []
+    for name, (data, values) in sorted(merge(snapshots).items()):
+        lines.append(f'# HELP {name} {data["help"]}')
+        lines.append(f'# TYPE {name} {data["type"]}')
+        labelnames = list(data['labelnames'])
+        if data['type'] == 'gauge' and data.get('mode') == 'all':
+            labelnames.append('pid')
+        for key, value in sorted(values.items()):
+            if data['type'] != 'histogram':
+                lines.append(
+                    f'{name}{format_labels(labelnames, key)} '
+                    f'{format_value(value)}'
+                )
+                continue
+            cumulative = 0
+            bounds = list(data['buckets']) + [math.inf]
+            for bound, count in zip(bounds, value['counts']):
+                cumulative += count
+                labels = format_labels(
+                    labelnames + ['le'], key + (format_value(bound),)
+                )
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = format_labels(labelnames, key)
+            lines.append(f'{name}_sum{labels} {format_value(value["sum"])}')
+            lines.append(f'{name}_count{labels} {value["count"]}')
+    for name, documentation, function in registry.collectors:
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {format_value(function())}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def counter(name, documentation, labelnames=()):
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=(), mode='sum'):
+    return registry.register(Gauge(name, documentation, labelnames, mode))
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return registry.register(
+        Histogram(name, documentation, labelnames, buckets)
+    )
+
+
+# Метрики приложения. Маршрут — имя URL из api/urls.py (`titles-list`,
+# `reviews-detail`, `user_sign_up`...), `unmatched` для ненайденных адресов.
+HTTP_REQUESTS = counter(
+    'yamdb_http_requests_total',
+    'Ответы по маршруту, методу и коду.',
+    ('route', 'method', 'status'),
+)
+HTTP_DURATION = histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('route', 'method'),
+)
+HTTP_IN_PROGRESS = gauge(
+    'yamdb_http_requests_in_progress',
+    'Запросы, обрабатываемые сейчас.',
+)
+DB_QUERIES = counter(
+    'yamdb_db_queries_total',
+    'Запросы к базе, выполненные при обработке запросов API.',
+    ('route', 'method'),
+)
+DB_DURATION = counter(
+    'yamdb_db_query_seconds_total',
+    'Суммарное время запросов к базе.',
+    ('route', 'method'),
+)
+CACHE_REQUESTS = counter(
+    'yamdb_cache_requests_total',
+    'Обращения к кэшам: ответов (response) и пользователей (user).',
+    ('cache', 'result'),
+)
+SIGNUPS = counter(
+    'yamdb_signups_total',
+    'Регистрации: created, resent (повторная отправка кода), rejected.',
+    ('outcome',),
+)
+EMAILS = counter(
+    'yamdb_emails_total',
+    'Письма: queued, sent, failed (неудачная попытка отправки).',
+    ('outcome',),
+)
+REVIEW_WRITES = counter(
+    'yamdb_review_writes_total',
+    'Изменения отзывов: create, update, delete. В минуту: '
+    'rate(yamdb_review_writes_total[5m]) * 60.',
+    ('operation',),
+)
@@ -0,0 +1,329 @@
+import hashlib
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.permission import is_admin
+
+from . import metrics, profiling, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+TIMING_DEFAULTS = {
+    'ENABLED': True,
+    # Кому отдавать Server-Timing: True — всем, 'staff' — администраторам
+    # (и всем при DEBUG), False — никому.
+    'HEADER': 'staff',
+    'LOG': True,
+    # Логировать только запросы дольше стольких миллисекунд.
+    'LOG_MIN_MS': 500,
+    # Сколько самых долгих запросов к базе попадает в журнал.
+    'SLOW_QUERIES': 3,
+    'SQL_MAX_LENGTH': 300,
+}
+
+timing_logger = logging.getLogger('core.timing')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы к путям `REPLICA_ROUTING['PATHS']` читают с реплик.
+    После записи клиент закрепляется за основной базой на `PIN_SECONDS`,
+    чтобы сразу увидеть свой отзыв: по cookie и, для запросов с токеном,
+    по отпечатку заголовка Authorization в общем кэше (клиенты API часто
+    не хранят cookie).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not routers.get_replicas():
+            return self.get_response(request)
+        config = routers.get_config()
+        token = routers.use_replicas(
+            request.method in SAFE_METHODS
+            and request.path.startswith(tuple(config['PATHS']))
+            and not self.is_pinned(request, config)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request, response, config)
+        return response
+
+    def get_client_key(self, request, config):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        digest = hashlib.sha1(authorization.encode()).hexdigest()
+        return f'{config["KEY_PREFIX"]}:{digest}'
+
+    def is_pinned(self, request, config):
+        if config['COOKIE'] in request.COOKIES:
+            return True
+        key = self.get_client_key(request, config)
+        return key is not None and caches[config['CACHE']].get(key) is not None
+
+    def pin(self, request, response, config):
+        response.set_cookie(
+            config['COOKIE'], '1', max_age=config['PIN_SECONDS']
+        )
+        key = self.get_client_key(request, config)
+        if key is not None:
+            caches[config['CACHE']].set(key, 1, config['PIN_SECONDS'])
+
+
+def get_timing_config():
+    return {**TIMING_DEFAULTS, **getattr(settings, 'REQUEST_TIMING', {})}
+
+
+class QueryRecorder:
+    """
+    Обёртка `execute_wrapper`: число запросов к базе, их суммарное время и
+    несколько самых долгих. Хранит только счётчики и ограниченную кучу, а не
+    все запросы, как `connection.queries` при DEBUG.
+    """
+
+    def __init__(self, slow_queries, sql_max_length):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.slow_queries = slow_queries
+        self.sql_max_length = sql_max_length
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if self.slow_queries:
+                entry = (duration, self.count, sql[:self.sql_max_length])
+                if len(self.slowest) < self.slow_queries:
+                    heapq.heappush(self.slowest, entry)
+                else:
+                    heapq.heappushpop(self.slowest, entry)
+
+
+@contextmanager
+def measure(request, name):
+    """
+    Добавляет время блока за вычетом SQL к `request.timing[name]`. Принимает
+    и запрос Django, и запрос DRF; без `RequestTimingMiddleware` ничего не
+    делает.
+    """
+    request = getattr(request, '_request', request)
+    timing = getattr(request, 'timing', None)
+    if timing is None:
+        yield
+        return
+    recorder = request.query_recorder
+    started = time.perf_counter()
+    db_started = recorder.duration
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        elapsed -= recorder.duration - db_started
+        timing[name] = timing.get(name, 0.0) + elapsed
+
+
+class RequestTimingMiddleware:
+    """
+    Время запроса по частям: работа с базой (число запросов и время SQL во
+    всех соединениях), представление, сериализация (`serialize`, см.
+    `measure`; входит в `view`) и отрисовка ответа (`render` — JSON для
+    ответов DRF). Результат — заголовок `Server-Timing` и строка JSON в
+    журнале `core.timing`. Не зависит от DEBUG.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_timing_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+        recorder = QueryRecorder(
+            config['SLOW_QUERIES'], config['SQL_MAX_LENGTH']
+        )
+        request.timing = {}
+        request.query_recorder = recorder
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(recorder)
+                )
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        timings = self.get_timings(request, recorder, total)
+        if self.show_header(request, config['HEADER']):
+            response['Server-Timing'] = self.format_header(
+                timings, recorder
+            )
+        if config['LOG'] and timings['total'] >= config['LOG_MIN_MS']:
+            self.log(request, response, timings, recorder)
+        return response
+
+    def show_header(self, request, header):
+        # Число запросов к базе и время — внутренние сведения.
+        if header != 'staff':
+            return bool(header)
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or (user is not None and is_admin(user))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'timing'):
+            request.timing['view_started'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Вызывается прямо перед response.render().
+        if hasattr(request, 'timing'):
+            timing = request.timing
+            timing['render_started'] = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: timing.update(
+                    render_finished=time.perf_counter()
+                )
+            )
+        return response
+
+    def get_timings(self, request, recorder, total):
+        """Длительности в миллисекундах."""
+        timing = request.timing
+        timings = {'db': recorder.duration * 1000, 'total': total * 1000}
+        view_started = timing.get('view_started')
+        render_started = timing.get('render_started')
+        if view_started is not None:
+            timings['view'] = (
+                (render_started or time.perf_counter()) - view_started
+            ) * 1000
+        if 'serialize' in timing:
+            timings['serialize'] = timing['serialize'] * 1000
+        if render_started is not None and 'render_finished' in timing:
+            timings['render'] = (
+                timing['render_finished'] - render_started
+            ) * 1000
+        return timings
+
+    def format_header(self, timings, recorder):
+        metrics = []
+        for name, duration in timings.items():
+            metric = f'{name};dur={duration:.2f}'
+            if name == 'db':
+                metric += f';desc="{recorder.count} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def log(self, request, response, timings, recorder):
+        match = request.resolver_match
+        timing_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': recorder.count,
+            **{
+                f'{name}_ms': round(duration, 2)
+                for name, duration in timings.items()
+            },
+            'slowest_queries': [
+                {'ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, _, sql in sorted(recorder.slowest, reverse=True)
+            ],
+        }, ensure_ascii=False))
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос администратора с заголовком `X-Profile` или
+    параметром `?profile=` (см. `core.profiling`). Прочие запросы проходят
+    без изменений: проверка триггера — поиск в двух строках.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(profiling.HEADER)
+        if mode is None and profiling.QUERY_PARAM in request.META.get(
+            'QUERY_STRING', ''
+        ):
+            mode = request.GET.get(profiling.QUERY_PARAM)
+        if (
+            mode not in profiling.EXTENSIONS
+            or not profiling.get_config()['ENABLED']
+            or not self.is_requested_by_admin(request)
+        ):
+            return self.get_response(request)
+        response, name = profiling.profile(mode, self.get_response, request)
+        response['X-Profile'] = name
+        response['X-Profile-Url'] = reverse(
+            'profile_download', kwargs={'name': name}
+        )
+        return response
+
+    def is_requested_by_admin(self, request):
+        """Администратор по сессии или по токену API."""
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            authenticators = [
+                authentication()
+                for authentication
+                in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ]
+            try:
+                user = Request(request, authenticators=authenticators).user
+            except APIException:
+                return False
+        return is_admin(user)
+
+
+class MetricsMiddleware:
+    """
+    Число и время ответов по маршруту и методу для `core.metrics`. Число
+    запросов к базе берётся у `RequestTimingMiddleware`, поэтому этот
+    middleware стоит в списке раньше него.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.get_config()['ENABLED']:
+            return self.get_response(request)
+        metrics.HTTP_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.HTTP_IN_PROGRESS.dec()
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        labels = {
+            'route': match.view_name if match else 'unmatched',
+            'method': request.method,
+        }
+        metrics.HTTP_REQUESTS.inc(status=response.status_code, **labels)
+        metrics.HTTP_DURATION.observe(duration, **labels)
+        recorder = getattr(request, 'query_recorder', None)
+        if recorder is not None:
+            metrics.DB_QUERIES.inc(recorder.count, **labels)
+            metrics.DB_DURATION.inc(recorder.duration, **labels)
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, unique=True, verbose_name='таблица')),
+                ('path', models.CharField(max_length=500, verbose_name='файл')),
+                ('rows_done', models.BigIntegerField(default=0, verbose_name='загружено строк')),
+                ('finished', models.BooleanField(default=False, verbose_name='загрузка завершена')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='обновлено')),
+            ],
+            options={
+                'verbose_name': 'Import checkpoint',
+                'verbose_name_plural': 'Import checkpoints',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='тема')),
+                ('body', models.TextField(verbose_name='текст')),
+                ('from_email', models.CharField(max_length=254, verbose_name='отправитель')),
+                ('recipients', models.TextField(help_text='Адреса через запятую', verbose_name='получатели')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='поставлено в очередь')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='можно отправлять с')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('claimed_by', models.CharField(blank=True, max_length=32, null=True, verbose_name='взято обработчиком')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='отправлено')),
+                ('last_error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Outbox message',
+                'verbose_name_plural': 'Outbox messages',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['sent_at', 'available_at'], name='outbox_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='ключ')),
+                ('tokens', models.FloatField(verbose_name='токенов')),
+                ('updated', models.FloatField(verbose_name='обновлено (unix time)')),
+                ('allowed', models.BooleanField(default=True, verbose_name='последний запрос пропущен')),
+            ],
+            options={
+                'verbose_name': 'Throttle bucket',
+                'verbose_name_plural': 'Throttle buckets',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_throttle_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicaHeartbeat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.FloatField(verbose_name='время записи (unix time)')),
+            ],
+            options={
+                'verbose_name': 'Replica heartbeat',
+                'verbose_name_plural': 'Replica heartbeats',
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько строк CSV-файла уже загружено и зафиксировано в базе."""
+    table = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='таблица',
+    )
+    path = models.CharField(
+        max_length=500,
+        verbose_name='файл',
+    )
+    rows_done = models.BigIntegerField(
+        default=0,
+        verbose_name='загружено строк',
+    )
+    finished = models.BooleanField(
+        default=False,
+        verbose_name='загрузка завершена',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='обновлено',
+    )
+
+    class Meta:
+        verbose_name = 'Import checkpoint'
+        verbose_name_plural = 'Import checkpoints'
+
+    def __str__(self):
+        return f'{self.table}: {self.rows_done}'
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком (`send_outbox`)."""
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='тема',
+    )
+    body = models.TextField(
+        verbose_name='текст',
+    )
+    from_email = models.CharField(
+        max_length=254,
+        verbose_name='отправитель',
+    )
+    recipients = models.TextField(
+        verbose_name='получатели',
+        help_text='Адреса через запятую',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='поставлено в очередь',
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='можно отправлять с',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='попыток',
+    )
+    claimed_by = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        verbose_name='взято обработчиком',
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='отправлено',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='последняя ошибка',
+    )
+
+    class Meta:
+        verbose_name = 'Outbox message'
+        verbose_name_plural = 'Outbox messages'
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'available_at'],
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
+
+
+class ThrottleBucket(models.Model):
+    """Корзина токенов ограничителя частоты запросов (`api.throttling`)."""
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='ключ',
+    )
+    tokens = models.FloatField(
+        verbose_name='токенов',
+    )
+    updated = models.FloatField(
+        verbose_name='обновлено (unix time)',
+    )
+    allowed = models.BooleanField(
+        default=True,
+        verbose_name='последний запрос пропущен',
+    )
+
+    class Meta:
+        verbose_name = 'Throttle bucket'
+        verbose_name_plural = 'Throttle buckets'
+
+    def __str__(self):
+        return f'{self.key}: {self.tokens:.2f}'
+
+
+class ReplicaHeartbeat(models.Model):
+    """Метка времени, которую `replica_lag` пишет в основную базу."""
+    timestamp = models.FloatField(
+        verbose_name='время записи (unix time)',
+    )
+
+    class Meta:
+        verbose_name = 'Replica heartbeat'
+        verbose_name_plural = 'Replica heartbeats'
+
+    def __str__(self):
+        return str(self.timestamp)
@@ -0,0 +1,163 @@
+"""Очередь исходящих писем.
+
+Запрос только сохраняет письмо в таблицу `OutboxMessage`, отправкой
+занимается команда `send_outbox`. Обработчик забирает пачку писем одним
+UPDATE (поле `claimed_by` и аренда через `available_at`), поэтому несколько
+обработчиков не отправят одно письмо дважды, а письма упавшего обработчика
+снова станут доступны по истечении аренды. Вся пачка отправляется через одно
+соединение с почтовым бэкендом; неудачные письма откладываются с
+экспоненциальной задержкой, после `MAX_ATTEMPTS` попыток остаются в таблице
+с последней ошибкой.
+
+Если `EMAIL_OUTBOX['EAGER']` включён, письмо отправляется сразу после
+фиксации транзакции (удобно для разработки и тестов).
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from . import metrics
+from .models import OutboxMessage
+
+DEFAULTS = {
+    'EAGER': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF': 30,
+    'MAX_BACKOFF': 3600,
+    'LEASE': 300,
+}
+
+LATENCY_SAMPLE = 1000
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_OUTBOX', {})}
+
+
+def enqueue(subject, body, from_email, recipients):
+    message = OutboxMessage.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipients=','.join(recipients),
+    )
+    metrics.EMAILS.inc(outcome='queued')
+    if get_config()['EAGER']:
+        transaction.on_commit(lambda: deliver([message]))
+    return message
+
+
+def get_backoff(attempts):
+    config = get_config()
+    return timedelta(seconds=min(
+        config['BACKOFF'] * 2 ** (attempts - 1), config['MAX_BACKOFF']
+    ))
+
+
+def pending():
+    return OutboxMessage.objects.filter(
+        sent_at__isnull=True, attempts__lt=get_config()['MAX_ATTEMPTS']
+    )
+
+
+def claim_batch(batch_size):
+    """Забирает до `batch_size` писем, готовых к отправке."""
+    now = timezone.now()
+    claim = uuid.uuid4().hex
+    ids = pending().filter(available_at__lte=now).order_by(
+        'available_at'
+    ).values('pk')[:batch_size]
+    OutboxMessage.objects.filter(pk__in=ids).update(
+        claimed_by=claim,
+        available_at=now + timedelta(seconds=get_config()['LEASE']),
+    )
+    return list(OutboxMessage.objects.filter(claimed_by=claim))
+
+
+def deliver(messages):
+    """Отправляет письма через одно соединение: (отправлено, ошибок)."""
+    if not messages:
+        return 0, 0
+    errors = {}
+    connection = get_connection()
+    try:
+        connection.open()
+        for message in messages:
+            try:
+                EmailMessage(
+                    message.subject,
+                    message.body,
+                    message.from_email,
+                    message.recipients.split(','),
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                errors[message.pk] = repr(error)
+    except Exception as error:
+        errors = {message.pk: repr(error) for message in messages}
+    finally:
+        connection.close()
+    now = timezone.now()
+    for message in messages:
+        message.claimed_by = None
+        if message.pk in errors:
+            message.attempts += 1
+            message.available_at = now + get_backoff(message.attempts)
+            message.last_error = errors[message.pk]
+        else:
+            message.sent_at = now
+    OutboxMessage.objects.bulk_update(
+        messages,
+        ('claimed_by', 'attempts', 'available_at', 'last_error', 'sent_at'),
+    )
+    sent = len(messages) - len(errors)
+    metrics.EMAILS.inc(sent, outcome='sent')
+    metrics.EMAILS.inc(len(errors), outcome='failed')
+    return sent, len(errors)
+
+
+def deliver_batch(batch_size=None):
+    return deliver(claim_batch(batch_size or get_config()['BATCH_SIZE']))
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def get_stats():
+    """Глубина очереди и задержка доставки последних писем, в секундах."""
+    now = timezone.now()
+    queue = pending()
+    oldest = queue.aggregate(oldest=Min('created_at'))['oldest']
+    latencies = sorted(
+        (sent_at - created_at).total_seconds()
+        for created_at, sent_at in OutboxMessage.objects.filter(
+            sent_at__isnull=False
+        ).order_by('-sent_at').values_list(
+            'created_at', 'sent_at'
+        )[:LATENCY_SAMPLE]
+    )
+    return {
+        'depth': queue.count(),
+        'oldest_age': (now - oldest).total_seconds() if oldest else None,
+        'failed': OutboxMessage.objects.filter(
+            sent_at__isnull=True,
+            attempts__gte=get_config()['MAX_ATTEMPTS'],
+        ).count(),
+        'latency_p50': percentile(latencies, 0.5) if latencies else None,
+        'latency_p95': percentile(latencies, 0.95) if latencies else None,
+        'latency_max': latencies[-1] if latencies else None,
+    }
+
+
+metrics.registry.add_collector(
+    'yamdb_outbox_depth',
+    'Письма в очереди, ожидающие отправки.',
+    lambda: pending().count(),
+)
@@ -0,0 +1,144 @@
+"""Параллельный импорт CSV.
+
+Порядок записи таблиц выводится из внешних ключей моделей (DAG). Основной
+процесс читает файлы в этом порядке и раздаёт сырые куски записей пулу
+процессов; разбор и проверка значений — самая дорогая часть загрузки —
+идут параллельно и внутри одной таблицы, и для соседних независимых таблиц.
+Разобранные куски возвращаются по порядку единственному писателю в основном
+процессе: SQLite никогда не видит конкурентных записей, а в памяти
+находится не больше `prefetch` кусков.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+
+from . import importer
+
+
+def get_dependencies(tables):
+    """Таблица -> таблицы, на которые ссылаются её внешние ключи."""
+    by_model = {table.model: table.name for table in tables}
+    return {
+        table.name: {
+            by_model[field.related_model]
+            for field in table.model._meta.concrete_fields
+            if field.many_to_one
+            and field.related_model in by_model
+            and field.related_model is not table.model
+        }
+        for table in tables
+    }
+
+
+def topological_order(tables):
+    """Порядок записи, при котором зависимости загружаются раньше."""
+    dependencies = get_dependencies(tables)
+    order = []
+    done = set()
+    while len(order) < len(tables):
+        ready = [
+            table for table in tables
+            if table.name not in done and dependencies[table.name] <= done
+        ]
+        if not ready:
+            raise importer.CSVImportError(
+                'Циклическая зависимость между таблицами: '
+                + ', '.join(sorted(set(dependencies) - done))
+            )
+        order.extend(ready)
+        done.update(table.name for table in ready)
+    return order
+
+
+def parse_chunk(name, header, number, records):
+    """Выполняется в процессе пула."""
+    return importer.parse_chunk(
+        importer.get_table(name), header, number, records
+    )
+
+
+def submit_chunks(pool, tables, paths, checkpoints, chunk_size):
+    """Задачи разбора всех таблиц по порядку: (таблица, future)."""
+    for table in tables:
+        records = importer.read_records(
+            paths[table.name], checkpoints[table.name].rows_done, chunk_size
+        )
+        header = next(records)
+        for number, chunk in records:
+            yield table, pool.submit(
+                parse_chunk, table.name, header, number, chunk
+            )
+        yield table, None
+
+
+class ChunkWindow:
+    """Не больше `size` кусков в разборе или ожидании записи."""
+
+    def __init__(self, tasks, size):
+        self.tasks = tasks
+        self.size = size
+        self.window = deque()
+
+    def fill(self):
+        while len(self.window) < self.size:
+            task = next(self.tasks, None)
+            if task is None:
+                return
+            self.window.append(task)
+
+    def chunks(self, table):
+        """Разобранные куски таблицы по порядку."""
+        while True:
+            self.fill()
+            task_table, future = self.window.popleft()
+            assert task_table is table
+            if future is None:
+                return
+            yield future.result()
+
+    def cancel(self):
+        for _, future in self.window:
+            if future is not None:
+                future.cancel()
+
+
+def import_tables(tables, paths, workers, chunk_size=importer.CHUNK_SIZE,
+                  restart=False, report=None, prefetch=None):
+    """
+    Загружает таблицы: разбор в `workers` процессах, запись здесь же.
+    Возвращает {имя таблицы: вставлено строк}.
+    """
+    order = topological_order(tables)
+    checkpoints = {
+        table.name: importer.get_checkpoint(table, paths[table.name], restart)
+        for table in order
+    }
+    pending = [
+        table for table in order if not checkpoints[table.name].finished
+    ]
+    inserted = {table.name: 0 for table in order}
+    if not pending:
+        return inserted
+    # Процессы пула не должны наследовать открытое соединение с базой.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=django.setup
+    ) as pool:
+        window = ChunkWindow(
+            submit_chunks(pool, pending, paths, checkpoints, chunk_size),
+            prefetch or 2 * workers,
+        )
+        try:
+            for table in pending:
+                inserted[table.name] = importer.write_chunks(
+                    table,
+                    window.chunks(table),
+                    checkpoints[table.name],
+                    report,
+                )
+        except BaseException:
+            window.cancel()
+            raise
+    return inserted
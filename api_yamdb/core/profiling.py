@@ -0,0 +1,134 @@
+"""Профилирование отдельного запроса по требованию администратора.
+
+Запрос с заголовком `X-Profile: cprofile|sample` или параметром
+`?profile=cprofile|sample` от администратора выполняется под профилировщиком:
+
+* `cprofile` — детерминированный `cProfile`, результат в файле `.prof`
+  (`python -m pstats`, snakeviz);
+* `sample` — поток раз в `SAMPLE_INTERVAL` секунд снимает стек потока
+  запроса; результат — свёрнутые стеки `.collapsed` для flamegraph.pl или
+  speedscope. Накладные расходы почти не зависят от числа вызовов.
+
+Имя файла возвращается в заголовке `X-Profile`, скачать его можно по адресу
+`/api/v1/profiles/<имя>/`. Хранятся последние `MAX_FILES` файлов. Запросы
+без заголовка и параметра не профилируются и проверяются одной строкой.
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': None,
+    'SAMPLE_INTERVAL': 0.001,
+    'MAX_FILES': 50,
+}
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = 'profile'
+EXTENSIONS = {'cprofile': 'prof', 'sample': 'collapsed'}
+NAME_RE = re.compile(r'^[0-9]+-[0-9a-f]{32}\.(prof|collapsed)$')
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+    if config['DIR'] is None:
+        config['DIR'] = os.path.join(settings.BASE_DIR, 'profiles')
+    return config
+
+
+def get_path(name):
+    """Путь к файлу профиля или None для чужого имени."""
+    if not NAME_RE.match(name):
+        return None
+    return os.path.join(get_config()['DIR'], name)
+
+
+def new_path(mode):
+    directory = get_config()['DIR']
+    os.makedirs(directory, exist_ok=True)
+    name = f'{time.time_ns()}-{uuid.uuid4().hex}.{EXTENSIONS[mode]}'
+    return name, os.path.join(directory, name)
+
+
+def prune():
+    """Удаляет самые старые профили сверх `MAX_FILES`."""
+    config = get_config()
+    names = sorted(
+        name for name in os.listdir(config['DIR']) if NAME_RE.match(name)
+    )
+    for name in names[:max(len(names) - config['MAX_FILES'], 0)]:
+        try:
+            os.remove(os.path.join(config['DIR'], name))
+        except FileNotFoundError:
+            pass
+
+
+def frame_label(frame):
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """Снимает стек одного потока в фоне; `collapsed()` — свёрнутые стеки."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def collapsed(self):
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.items()
+        )
+
+
+def profile(mode, function, *args):
+    """Вызывает `function(*args)` под профилировщиком: (результат, имя)."""
+    name, path = new_path(mode)
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(function, *args)
+        finally:
+            profiler.dump_stats(path)
+    else:
+        sampler = StackSampler(
+            threading.get_ident(), get_config()['SAMPLE_INTERVAL']
+        )
+        try:
+            with sampler:
+                result = function(*args)
+        finally:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(sampler.collapsed())
+    prune()
+    return result, name
@@ -0,0 +1,53 @@
+"""Копии SQLite как реплики и измерение их отставания."""
+import sqlite3
+import time
+
+from django.db import DatabaseError, connections
+
+from .models import ReplicaHeartbeat
+from .routers import PRIMARY, get_replicas
+
+HEARTBEAT_ID = 1
+
+
+def refresh(alias):
+    """Копирует основную базу в файл реплики `alias` (sqlite3 backup API)."""
+    primary = connections[PRIMARY]
+    primary.ensure_connection()
+    replica = connections[alias]
+    # Открытое соединение реплики увидело бы файл посреди копирования.
+    replica.close()
+    target = sqlite3.connect(replica.settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+
+
+def beat():
+    """Записывает текущее время в основную базу."""
+    now = time.time()
+    ReplicaHeartbeat.objects.using(PRIMARY).update_or_create(
+        pk=HEARTBEAT_ID, defaults={'timestamp': now}
+    )
+    return now
+
+
+def get_lag(alias, primary_timestamp):
+    """Насколько данные реплики старше основной базы, в секундах."""
+    try:
+        heartbeat = ReplicaHeartbeat.objects.using(alias).filter(
+            pk=HEARTBEAT_ID
+        ).first()
+    except DatabaseError:
+        # Реплика ещё ни разу не обновлялась: таблицы нет.
+        heartbeat = None
+    if heartbeat is None:
+        return None
+    return primary_timestamp - heartbeat.timestamp
+
+
+def measure():
+    """{реплика: отставание} относительно только что записанной метки."""
+    now = beat()
+    return {alias: get_lag(alias, now) for alias in get_replicas()}
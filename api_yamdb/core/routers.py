@@ -0,0 +1,88 @@
+"""Чтение с реплик и запись в основную базу.
+
+`ReplicaRouter` отправляет чтение на одну из баз `DATABASE_REPLICAS`, только
+если текущий запрос это разрешил (`use_replicas`), иначе — в `default`.
+Решение принимает `core.middleware.ReplicaRoutingMiddleware`: безопасные
+запросы к каталогу и отзывам читают с реплики, если клиент недавно ничего
+не записывал. Любая запись в запросе переключает остаток запроса на
+основную базу.
+
+Прочитанное с реплики может отставать от счётчиков поколений кэша ответов
+(`api.cache`), поэтому такие ответы не кэшируются и не получают ETag
+(`replica_was_read`).
+
+Реплики — копии основной базы: миграции к ним не применяются. Для SQLite
+копии обновляет команда `refresh_replicas`, отставание показывает
+`replica_lag`.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULTS = {
+    'PIN_SECONDS': 5,
+    'PATHS': (
+        '/api/v1/titles/',
+        '/api/v1/genres/',
+        '/api/v1/categories/',
+    ),
+    'COOKIE': 'primary_pin',
+    'CACHE': 'default',
+    'KEY_PREFIX': 'replica-pin',
+}
+
+PRIMARY = 'default'
+
+_use_replicas = ContextVar('use_replicas', default=False)
+_replica_read = ContextVar('replica_read', default=False)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REPLICA_ROUTING', {})}
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def use_replicas(allowed):
+    """Разрешает чтение с реплик в текущем контексте; возвращает токен."""
+    return _use_replicas.set(allowed), _replica_read.set(False)
+
+
+def reset(token):
+    use_token, read_token = token
+    _use_replicas.reset(use_token)
+    _replica_read.reset(read_token)
+
+
+def replica_was_read():
+    """Читал ли текущий запрос с реплики."""
+    return _replica_read.get()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = get_replicas()
+        if not replicas or not _use_replicas.get():
+            return None
+        _replica_read.set(True)
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # После записи запрос должен видеть её сам.
+        _use_replicas.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
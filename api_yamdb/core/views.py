@@ -0,0 +1,21 @@
+from django.http import HttpResponse, HttpResponseForbidden
+
+from api.throttling import get_client_ip
+
+from . import metrics
+
+
+def metrics_view(request):
+    """Метрики всех процессов в текстовом формате Prometheus.
+
+    Адрес клиента определяется как и для ограничения частоты запросов: за
+    прокси из `API_THROTTLE['NUM_PROXIES']` — по `X-Forwarded-For`.
+    """
+    config = metrics.get_config()
+    allowed = config['ALLOWED_IPS']
+    if allowed and get_client_ip(request) not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
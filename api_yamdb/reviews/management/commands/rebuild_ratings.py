@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from api import cache as response_cache
+from reviews.models import Review
+from titles.models import Title
+
+RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сумму, количество и среднюю оценку всех произведений '
+        'одним GROUP BY по отзывам и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одном UPDATE.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = {
+            row['title_id']: (row['total'], row['count'])
+            for row in Review.objects.order_by().values('title_id').annotate(
+                total=Sum('score'), count=Count('id')
+            )
+        }
+        fixed = 0
+        batch = []
+        with transaction.atomic():
+            titles = Title.objects.only('pk', *RATING_FIELDS).order_by('pk')
+            for title in titles.iterator(chunk_size=batch_size):
+                total, count = totals.get(title.pk, (0, 0))
+                rating = total / count if count else None
+                current = (title.rating_sum, title.rating_count, title.rating)
+                if current == (total, count, rating):
+                    continue
+                title.rating_sum = total
+                title.rating_count = count
+                title.rating = rating
+                batch.append(title)
+                if len(batch) >= batch_size:
+                    Title.objects.bulk_update(batch, RATING_FIELDS)
+                    fixed += len(batch)
+                    batch = []
+            if batch:
+                Title.objects.bulk_update(batch, RATING_FIELDS)
+                fixed += len(batch)
+        if fixed:
+            # bulk_update не отправляет сигналов, поколения не меняются.
+            response_cache.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны, исправлено произведений: {fixed}'
+        ))
@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('titles', 'Title')
+    totals = Review.objects.order_by().values('title_id').annotate(
+        total=Sum('score'), count=Count('id')
+    )
+    for row in totals.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            rating=row['total'] / row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        ('titles', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
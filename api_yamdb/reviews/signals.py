@@ -0,0 +1,60 @@
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import metrics
+from titles.models import Title
+from .models import Review
+
+
+def shift_title_rating(title_id, score, count):
+    """Сдвигает сумму и количество оценок произведения одним UPDATE."""
+    if not score and not count:
+        return
+    new_sum = F('rating_sum') + score
+    new_count = F('rating_count') + count
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count=-count, then=Value(None)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    instance._previous_rating = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_rating = Review.objects.filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def apply_review_score(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    metrics.REVIEW_WRITES.inc(operation='create' if created else 'update')
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        shift_title_rating(instance.title_id, instance.score, 1)
+        return
+    previous_title_id, previous_score = previous
+    if previous_title_id == instance.title_id:
+        shift_title_rating(
+            instance.title_id, instance.score - previous_score, 0
+        )
+        return
+    shift_title_rating(previous_title_id, -previous_score, -1)
+    shift_title_rating(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def revoke_review_score(sender, instance, **kwargs):
+    metrics.REVIEW_WRITES.inc(operation='delete')
+    shift_title_rating(instance.title_id, -instance.score, -1)
@@ -44,9 +44,15 @@ class TitleAdmin(admin.ModelAdmin):
         'name',
         'year',
         'description',
+        'rating',
     )
     search_fields = (
         'name',
         'year',
     )
+    readonly_fields = (
+        'rating_sum',
+        'rating_count',
+        'rating',
+    )
     empty_value_display = '-пусто-'
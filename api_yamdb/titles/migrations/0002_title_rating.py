@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, help_text='Средняя оценка произведения', null=True, verbose_name='rating'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Количество отзывов на произведение', verbose_name='rating count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Сумма оценок всех отзывов на произведение', verbose_name='rating sum'),
+        ),
+    ]
@@ -87,6 +87,22 @@ class Title(models.Model):
         verbose_name='genre',
         help_text='Жанр которой относится произведение',
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='rating sum',
+        help_text='Сумма оценок всех отзывов на произведение',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='rating count',
+        help_text='Количество отзывов на произведение',
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='rating',
+        help_text='Средняя оценка произведения',
+    )
 
     class Meta:
         verbose_name = 'Title'
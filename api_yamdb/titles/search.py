@@ -0,0 +1,82 @@
+"""Полнотекстовый поиск произведений на SQLite FTS5.
+
+Индекс `titles_title_fts` хранит название и описание произведения под тем
+же rowid, что и `titles_title.id`, и поддерживается триггерами на
+`titles_title`. Регистр приводится токенизатором `unicode61` (в том числе
+для кириллицы), а «ё» заменяется на «е» и при индексации, и в запросе.
+
+Django пересоздаёт таблицу SQLite при изменении схемы модели, и триггеры
+при этом теряются, поэтому миграции, меняющие `Title`, должны заново
+выполнить `CREATE_TRIGGERS_SQL`.
+"""
+import re
+
+FTS_TABLE = 'titles_title_fts'
+
+
+def _fold_sql(column):
+    return f"replace(replace(coalesce({column}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+CREATE_TABLE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+    "USING fts5(name, description, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+CREATE_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON titles_title BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, description)
+        VALUES (new.id, {_fold_sql('new.name')},
+                {_fold_sql('new.description')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON titles_title BEGIN
+        UPDATE {FTS_TABLE}
+        SET name = {_fold_sql('new.name')},
+            description = {_fold_sql('new.description')}
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON titles_title BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+REBUILD_SQL = [
+    f'DELETE FROM {FTS_TABLE}',
+    f"""
+    INSERT INTO {FTS_TABLE} (rowid, name, description)
+    SELECT id, {_fold_sql('name')}, {_fold_sql('description')}
+    FROM titles_title
+    """,
+]
+
+DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Приводит текст к виду, в котором он лежит в индексе."""
+    return text.casefold().replace('ё', 'е')
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в безопасное выражение MATCH:
+    каждое слово ищется как префикс, все слова обязательны.
+    """
+    words = WORD_RE.findall(normalize(text))
+    return ' '.join(f'"{word}"*' for word in words)
@@ -0,0 +1,325 @@
+"""Бенчмарк задержек и пропускной способности эндпоинтов API.
+
+Для каждого масштаба (число отзывов в наборе `generate_data`) в отдельном
+процессе создаёт свежую базу SQLite, загружает набор и через тестовый
+клиент Django отправляет по `--requests` запросов на каждый случай: список
+произведений со всеми сочетаниями фильтров `TitleFilter`, произведение,
+отзывы, комментарии, поиск пользователей, регистрация и получение токена.
+Печатает p50/p95/p99 и запросов в секунду и сохраняет результаты в JSON.
+
+С `--baseline` сравнивает p95 каждого случая с сохранённым прогоном и
+завершается с кодом 1, если задержка выросла больше чем на `--threshold`.
+
+    python benchmarks/endpoints.py --scales 1000 100000 1000000 \\
+        --output baseline.json
+    python benchmarks/endpoints.py --scales 1000 100000 1000000 \\
+        --baseline baseline.json
+
+Кэш ответов по умолчанию выключен, чтобы измерять работу с базой; `--cache`
+оставляет его, как в рабочей конфигурации.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+FILTERS = ('genre', 'category', 'name', 'year', 'search')
+# Меньшие различия p95 — шум измерения, а не регрессия.
+MIN_REGRESSION_MS = 1.0
+
+
+def setup(db_path, cache):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    settings.REQUEST_TIMING = {
+        **settings.REQUEST_TIMING, 'LOG': False,
+    }
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.API_THROTTLE = {**settings.API_THROTTLE, 'ENABLED': False}
+    settings.API_RESPONSE_CACHE = {
+        **settings.API_RESPONSE_CACHE, 'ENABLED': cache,
+    }
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def get_filter_values():
+    """Значения фильтров, которые находят произведения в наборе."""
+    from django.db.models import Count
+    from titles.models import Title
+
+    title = Title.objects.annotate(
+        genres=Count('genre')
+    ).filter(genres__gt=0).select_related('category').order_by('pk').first()
+    word = title.name.split()[-1]
+    return {
+        'genre': title.genre.order_by('pk').first().slug,
+        'category': title.category.slug,
+        'name': word,
+        'year': title.year,
+        'search': word,
+    }
+
+
+def get_cases(rng):
+    """(имя, метод, функция -> (путь, данные), заголовки, ожидаемый код)."""
+    from django.contrib.auth.tokens import default_token_generator
+    from django.db.models import Count
+    from api.authentication import RoleAccessToken
+    from reviews.models import Review
+    from titles.models import Title
+    from user.models import User
+
+    cases = []
+    values = get_filter_values()
+    for size in range(len(FILTERS) + 1):
+        for names in itertools.combinations(FILTERS, size):
+            query = '&'.join(f'{name}={values[name]}' for name in names)
+            path = '/api/v1/titles/' + (f'?{query}' if query else '')
+            cases.append((
+                'titles?' + '&'.join(names), 'get',
+                lambda path=path: (path, None), {}, 200,
+            ))
+
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    cases.append((
+        'title', 'get',
+        lambda: (f'/api/v1/titles/{rng.choice(title_ids)}/', None), {}, 200,
+    ))
+    popular = Title.objects.order_by('-rating_count', 'pk').first()
+    cases.append((
+        'reviews (популярное)', 'get',
+        lambda: (f'/api/v1/titles/{popular.pk}/reviews/', None), {}, 200,
+    ))
+    cases.append((
+        'reviews', 'get',
+        lambda: (f'/api/v1/titles/{rng.choice(title_ids)}/reviews/', None),
+        {}, 200,
+    ))
+    review = Review.objects.annotate(
+        comment_count=Count('comments')
+    ).order_by('-comment_count', 'pk').first()
+    cases.append((
+        'comments', 'get',
+        lambda: (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+            'comments/',
+            None,
+        ),
+        {}, 200,
+    ))
+
+    admin = User.objects.create(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    admin_auth = {
+        'HTTP_AUTHORIZATION': f'Bearer {RoleAccessToken.for_user(admin)}'
+    }
+    usernames = User.objects.values_list('username', flat=True)
+    prefixes = sorted({username[:6] for username in usernames[:1000]})
+    cases.append((
+        'users?search', 'get',
+        lambda: (f'/api/v1/users/?search={rng.choice(prefixes)}', None),
+        admin_auth, 200,
+    ))
+
+    signups = (f'bench{number}' for number in itertools.count())
+    signed_up = []
+
+    def sign_up():
+        username = next(signups)
+        signed_up.append(username)
+        return '/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.fake',
+        }
+
+    def obtain_token():
+        user = User.objects.get(username=signed_up.pop(0))
+        return '/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }
+
+    cases.append(('signup', 'post', sign_up, {}, 200))
+    cases.append(('token', 'post', obtain_token, {}, 200))
+    return cases
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def summarize(timings, errors):
+    timings = sorted(timings)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'p50_ms': percentile(timings, 0.5) * 1000,
+        'p95_ms': percentile(timings, 0.95) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'rps': len(timings) / sum(timings),
+    }
+
+
+def run_scale(db_path, scale, requests, warmup, seed, cache):
+    """Запускается в отдельном процессе: загрузка набора и замеры."""
+    setup(db_path, cache)
+    from django.core.management import call_command
+    from django.test import Client
+
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        call_command(
+            'generate_data', database=True, reviews=scale, seed=seed,
+            stdout=devnull,
+        )
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    client = Client()
+    results = {}
+    for name, method, make_request, headers, expected in get_cases(rng):
+        timings = []
+        errors = 0
+        for number in range(warmup + requests):
+            path, data = make_request()
+            request_started = time.perf_counter()
+            response = getattr(client, method)(path, data=data, **headers)
+            elapsed = time.perf_counter() - request_started
+            if number < warmup:
+                continue
+            timings.append(elapsed)
+            errors += response.status_code != expected
+        results[name] = summarize(timings, errors)
+    print(json.dumps({'load_seconds': load_seconds, 'cases': results}))
+
+
+def get_meta(options):
+    import sqlite3
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'requests': options.requests,
+        'seed': options.seed,
+        'cache': options.cache,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Случаи, у которых p95 выросла больше чем на `threshold`."""
+    regressions = []
+    for scale, scale_results in results.items():
+        for name, result in scale_results['cases'].items():
+            try:
+                before = baseline[scale]['cases'][name]['p95_ms']
+            except KeyError:
+                continue
+            after = result['p95_ms']
+            if (
+                after > before * (1 + threshold)
+                and after - before > MIN_REGRESSION_MS
+            ):
+                regressions.append((scale, name, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--scales', type=int, nargs='+', default=[1000, 100000, 1000000],
+        help='Размеры наборов: число отзывов.',
+    )
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', action='store_true')
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--baseline', help='Результаты прошлого прогона.')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Допустимый рост p95 относительно --baseline (0.2 — 20%%).',
+    )
+    parser.add_argument('--run', metavar='DB', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.run:
+        run_scale(
+            options.run, options.scales[0], options.requests,
+            options.warmup, options.seed, options.cache,
+        )
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in options.scales:
+            db_path = os.path.join(workdir, f'bench-{scale}.sqlite3')
+            output = subprocess.run(
+                [
+                    sys.executable, os.path.abspath(__file__),
+                    '--run', db_path, '--scales', str(scale),
+                    '--requests', str(options.requests),
+                    '--warmup', str(options.warmup),
+                    '--seed', str(options.seed),
+                ] + (['--cache'] if options.cache else []),
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[str(scale)] = json.loads(output.splitlines()[-1])
+            os.remove(db_path)
+            print(
+                f'Набор {scale} отзывов, загрузка '
+                f'{results[str(scale)]["load_seconds"]:.1f} с'
+            )
+            for name, result in results[str(scale)]['cases'].items():
+                print(
+                    f'  {name:40} p50 {result["p50_ms"]:7.2f} мс, '
+                    f'p95 {result["p95_ms"]:7.2f} мс, '
+                    f'p99 {result["p99_ms"]:7.2f} мс, '
+                    f'{result["rps"]:7.0f} запросов/с'
+                    + (f', ошибок {result["errors"]}'
+                       if result['errors'] else '')
+                )
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(
+                {'meta': get_meta(options), 'results': results},
+                file, ensure_ascii=False, indent=2,
+            )
+
+    failed = any(
+        result['errors']
+        for scale_results in results.values()
+        for result in scale_results['cases'].values()
+    )
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, options.threshold)
+        for scale, name, before, after in regressions:
+            print(
+                f'Регрессия {scale}/{name}: p95 {before:.2f} → '
+                f'{after:.2f} мс',
+                file=sys.stderr,
+            )
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Бенчмарк загрузки CSV: последовательный импорт против параллельного.
+
+Строит синтетический набор CSV (`core.generator`, как `generate_data`),
+затем для каждого числа процессов загружает его в отдельную свежую базу
+SQLite и печатает время и скорость.
+
+    python benchmarks/import_pipeline.py --reviews 2000000 --text-size 1000 \
+        --workers 1 2 4
+
+При таких параметрах набор занимает несколько гигабайт.
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+
+def generate(path, reviews, text_size, seed=0):
+    """Набор `generate_data` в каталоге `path`; возвращает его размер."""
+    sys.path.insert(0, PROJECT_DIR)
+    from core.generator import Scale, write_csv
+    write_csv(Scale(reviews, text_size=text_size, seed=seed), path)
+    return sum(
+        os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+    )
+
+
+def run_import(db_path, data_path, workers, chunk_size):
+    """Запускается в отдельном процессе: миграции и импорт в свою базу."""
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    with open(os.devnull, 'w') as devnull:
+        started = time.perf_counter()
+        call_command(
+            'import_csv',
+            path=data_path,
+            workers=workers,
+            chunk_size=chunk_size,
+            stdout=devnull,
+        )
+        elapsed = time.perf_counter() - started
+    print(json.dumps({'workers': workers, 'seconds': elapsed}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--text-size', type=int, default=300)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--data', help='Готовый каталог с CSV.')
+    parser.add_argument('--run', metavar='DB', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.run:
+        run_import(
+            options.run, options.data, options.workers[0], options.chunk_size
+        )
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_path = options.data
+        if data_path is None:
+            data_path = os.path.join(workdir, 'data')
+            os.mkdir(data_path)
+            size = generate(data_path, options.reviews, options.text_size)
+            print(f'Набор данных: {size / 2 ** 20:.1f} МБ')
+        rows = 0
+        for name in os.listdir(data_path):
+            with open(os.path.join(data_path, name), encoding='utf-8') as f:
+                rows += sum(1 for _ in csv.reader(f)) - 1
+        results = []
+        for workers in options.workers:
+            db_path = os.path.join(workdir, f'bench-{workers}.sqlite3')
+            output = subprocess.run(
+                [
+                    sys.executable, os.path.abspath(__file__),
+                    '--run', db_path, '--data', data_path,
+                    '--workers', str(workers),
+                    '--chunk-size', str(options.chunk_size),
+                ],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+            os.remove(db_path)
+        baseline = results[0]['seconds']
+        for result in results:
+            print(
+                f'workers={result["workers"]}: {result["seconds"]:.1f} с, '
+                f'{rows / result["seconds"]:.0f} строк/с, '
+                f'ускорение x{baseline / result["seconds"]:.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,471 @@
+"""Нагрузочный тест с замкнутым циклом против запущенного сервера.
+
+Поднимает приложение из `api_yamdb/wsgi.py` на многопоточном WSGI-сервере
+Django в отдельном процессе — на временной базе SQLite с набором
+`generate_data` или на базе `--database` — и запускает `--users`
+виртуальных пользователей. Каждый отправляет запрос, ждёт ответа, делает
+паузу (экспоненциальную, в среднем `--think` секунд) и выбирает следующее
+действие, поэтому одновременных запросов не больше, чем пользователей, а
+при насыщении сервера падает пропускная способность, а не растёт очередь.
+
+Роли пользователей:
+
+* читатели — анонимный просмотр каталога, отзывов и комментариев;
+* авторы (`--writers`, доля) — регистрируются через `/auth/signup/` и
+  `/auth/token/`, читают и пишут отзывы и комментарии;
+* модераторы (`--moderators`) — получают токен так же и удаляют свежие
+  отзывы и комментарии.
+
+Код подтверждения берётся из той же базы, как если бы его прочитали из
+письма. По каждому маршруту печатается гистограмма задержек, p50/p95/p99 и
+доля ошибок: ответы 5xx и сбои соединения (в том числе «database is
+locked»); прочие неожиданные ответы (4xx) считаются отдельно.
+
+    python benchmarks/load_test.py --users 32 --writers 0.25 --seconds 60
+"""
+import argparse
+import bisect
+import http.client
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+HOST = '127.0.0.1'
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Сколько свежих отзывов и комментариев помнить для удаления модераторами.
+RECENT = 1000
+
+
+def setup(db_path, throttle):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    settings.REQUEST_TIMING = {
+        **settings.REQUEST_TIMING, 'LOG': False,
+    }
+    # Все виртуальные пользователи приходят с одного адреса.
+    settings.API_THROTTLE = {**settings.API_THROTTLE, 'ENABLED': throttle}
+    import django
+    django.setup()
+
+
+def serve(db_path, port, throttle):
+    """Запускается в отдельном процессе: сервер до завершения родителя."""
+    setup(db_path, throttle)
+    from django.core.servers.basehttp import WSGIRequestHandler, run
+
+    from api_yamdb.wsgi import application
+
+    # Журнал каждого запроса исказил бы задержки.
+    WSGIRequestHandler.log_message = lambda *args: None
+    run(HOST, port, application, threading=True)
+
+
+def prepare(reviews, seed):
+    """Миграции и набор данных, если база пустая."""
+    from django.core.management import call_command
+    from titles.models import Title
+
+    call_command('migrate', verbosity=0)
+    if not Title.objects.exists():
+        with open(os.devnull, 'w') as devnull:
+            call_command(
+                'generate_data', database=True, reviews=reviews, seed=seed,
+                stdout=devnull,
+            )
+
+
+def get_catalog():
+    """Что просматривать: популярные произведения выбираются чаще."""
+    from reviews.models import Review
+    from titles.models import Category, Genre, Title
+
+    titles = list(Title.objects.values_list('pk', 'rating_count'))
+    return {
+        'titles': [pk for pk, _ in titles],
+        'weights': list(itertools.accumulate(
+            count + 1 for _, count in titles
+        )),
+        'reviews': list(
+            Review.objects.order_by('?').values_list('title_id', 'pk')[:10000]
+        ),
+        'genres': list(Genre.objects.values_list('slug', flat=True)),
+        'categories': list(Category.objects.values_list('slug', flat=True)),
+        'count': len(titles),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер не запустился на порту {port}')
+
+
+class Stats:
+    """Задержки и исходы запросов по маршрутам; общий для всех потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    def add(self, route, latency, outcome):
+        with self.lock:
+            self.latencies[route].append(latency)
+            if outcome == 'error':
+                self.errors[route] += 1
+            elif outcome == 'rejected':
+                self.rejected[route] += 1
+
+    def report(self, seconds):
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = sorted(self.latencies[route])
+            count = len(latencies)
+            histogram = [0] * (len(BUCKETS_MS) + 1)
+            for latency in latencies:
+                histogram[bisect.bisect_left(BUCKETS_MS, latency * 1000)] += 1
+            routes[route] = {
+                'requests': count,
+                'rps': count / seconds,
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+                'error_rate': self.errors[route] / count,
+                'rejected_rate': self.rejected[route] / count,
+                'histogram': dict(zip(
+                    [f'<={bound}' for bound in BUCKETS_MS] + ['+Inf'],
+                    histogram,
+                )),
+            }
+        return routes
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class VirtualUser:
+    """Один клиент: запрос, ожидание ответа, пауза, следующий запрос."""
+
+    def __init__(self, number, role, options, port, catalog, shared, stats):
+        self.number = number
+        self.role = role
+        self.options = options
+        self.port = port
+        self.catalog = catalog
+        self.shared = shared
+        self.stats = stats
+        self.rng = random.Random(f'{options.seed}:{number}')
+        self.token = None
+        self.reviewed = set()
+
+    def request(self, route, method, path, data=None, expected=200):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = json.dumps(data) if data is not None else None
+        connection = http.client.HTTPConnection(HOST, self.port, timeout=60)
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.stats.add(route, time.perf_counter() - started, 'error')
+            return None
+        finally:
+            connection.close()
+        latency = time.perf_counter() - started
+        if status >= 500:
+            outcome = 'error'
+        elif status != expected:
+            outcome = 'rejected'
+        else:
+            outcome = 'ok'
+        self.stats.add(route, latency, outcome)
+        if outcome != 'ok' or not content:
+            return None
+        return json.loads(content)
+
+    def log_in(self):
+        """Регистрация и токен через API; код — из базы, как из письма."""
+        from django.contrib.auth.tokens import default_token_generator
+        from django.db import connection
+        from user.models import User
+
+        username = f'load{self.options.seed}-{self.number}-{time.time_ns()}'
+        self.request('POST signup', 'POST', '/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.fake',
+        })
+        try:
+            user = User.objects.get(username=username)
+            if self.role == 'moderator':
+                User.objects.filter(pk=user.pk).update(role='moderator')
+            code = default_token_generator.make_token(user)
+        except User.DoesNotExist:
+            return
+        finally:
+            connection.close()
+        response = self.request('POST token', 'POST', '/api/v1/auth/token/', {
+            'username': username, 'confirmation_code': code,
+        })
+        if response:
+            self.token = response['token']
+
+    def random_title(self):
+        return self.rng.choices(
+            self.catalog['titles'], cum_weights=self.catalog['weights']
+        )[0]
+
+    def browse(self):
+        rng = self.rng
+        action = rng.choices(
+            ('titles', 'filter', 'title', 'reviews', 'comments', 'genres'),
+            weights=(4, 2, 3, 3, 2, 1),
+        )[0]
+        if action == 'titles':
+            offset = rng.randrange(0, max(self.catalog['count'], 1), 10)
+            self.request(
+                'GET titles', 'GET',
+                f'/api/v1/titles/?limit=10&offset={offset}',
+            )
+        elif action == 'filter':
+            kind, key = rng.choice(
+                (('genre', 'genres'), ('category', 'categories'))
+            )
+            slug = rng.choice(self.catalog[key])
+            self.request(
+                'GET titles?filter', 'GET', f'/api/v1/titles/?{kind}={slug}'
+            )
+        elif action == 'title':
+            self.request(
+                'GET title', 'GET', f'/api/v1/titles/{self.random_title()}/'
+            )
+        elif action == 'reviews':
+            self.request(
+                'GET reviews', 'GET',
+                f'/api/v1/titles/{self.random_title()}/reviews/',
+            )
+        elif action == 'comments' and self.catalog['reviews']:
+            title_id, review_id = rng.choice(self.catalog['reviews'])
+            self.request(
+                'GET comments', 'GET',
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            )
+        else:
+            self.request('GET genres', 'GET', '/api/v1/genres/')
+
+    def write(self):
+        rng = self.rng
+        if rng.random() < 0.4:
+            title_id = self.random_title()
+            if title_id in self.reviewed:
+                return self.browse()
+            self.reviewed.add(title_id)
+            review = self.request(
+                'POST review', 'POST', f'/api/v1/titles/{title_id}/reviews/',
+                {'text': 'Отзыв под нагрузкой', 'score': rng.randint(1, 10)},
+                expected=201,
+            )
+            if review:
+                self.shared['reviews'].append((title_id, review['id']))
+        elif self.catalog['reviews']:
+            title_id, review_id = rng.choice(self.catalog['reviews'])
+            comment = self.request(
+                'POST comment', 'POST',
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                {'text': 'Комментарий под нагрузкой'},
+                expected=201,
+            )
+            if comment:
+                self.shared['comments'].append(
+                    (title_id, review_id, comment['id'])
+                )
+
+    def moderate(self):
+        try:
+            if self.rng.random() < 0.5:
+                title_id, review_id = self.shared['reviews'].popleft()
+                path = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+                route = 'DELETE review'
+            else:
+                title_id, review_id, comment_id = (
+                    self.shared['comments'].popleft()
+                )
+                path = (
+                    f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+                    f'comments/{comment_id}/'
+                )
+                route = 'DELETE comment'
+        except IndexError:
+            return self.browse()
+        self.request(route, 'DELETE', path, expected=204)
+
+    def run(self, deadline):
+        if self.role != 'reader':
+            self.log_in()
+        act = {
+            'reader': self.browse,
+            'writer': self.write,
+            'moderator': self.moderate,
+        }[self.role]
+        share = self.options.write_share
+        while time.monotonic() < deadline:
+            if self.role == 'reader' or self.rng.random() >= share:
+                self.browse()
+            else:
+                act()
+            if self.options.think:
+                time.sleep(self.rng.expovariate(1 / self.options.think))
+
+
+def get_roles(options):
+    writers = round(options.users * options.writers)
+    moderators = min(options.moderators, options.users - writers)
+    return (
+        ['moderator'] * moderators + ['writer'] * writers
+        + ['reader'] * (options.users - writers - moderators)
+    )
+
+
+def print_report(routes):
+    for route, result in routes.items():
+        print(
+            f'{route:18} {result["requests"]:7} запросов, '
+            f'{result["rps"]:6.1f}/с, p50 {result["p50_ms"]:7.1f} мс, '
+            f'p95 {result["p95_ms"]:7.1f} мс, p99 {result["p99_ms"]:7.1f} мс, '
+            f'ошибок {result["error_rate"]:.1%}, '
+            f'отклонено {result["rejected_rate"]:.1%}'
+        )
+        print('    ' + ' '.join(
+            f'{bound}:{count}'
+            for bound, count in result['histogram'].items() if count
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument(
+        '--writers', type=float, default=0.25,
+        help='Доля авторов среди пользователей.',
+    )
+    parser.add_argument('--moderators', type=int, default=1)
+    parser.add_argument(
+        '--write-share', type=float, default=0.3,
+        help='Доля действий автора или модератора, которые пишут в базу.',
+    )
+    parser.add_argument(
+        '--think', type=float, default=0.1,
+        help='Средняя пауза между запросами пользователя, секунд.',
+    )
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument(
+        '--reviews', type=int, default=10000,
+        help='Размер набора generate_data для пустой базы.',
+    )
+    parser.add_argument(
+        '--database',
+        help='Файл SQLite; по умолчанию временная база.',
+    )
+    parser.add_argument(
+        '--throttle', action='store_true',
+        help='Не отключать ограничение частоты запросов.',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--serve', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve:
+        serve(options.serve, options.port, options.throttle)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = options.database or os.path.join(workdir, 'load.sqlite3')
+        setup(db_path, options.throttle)
+        prepare(options.reviews, options.seed)
+        catalog = get_catalog()
+        from django.db import connection
+        connection.close()
+
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable, os.path.abspath(__file__),
+                '--serve', db_path, '--port', str(port),
+            ] + (['--throttle'] if options.throttle else []),
+        )
+        try:
+            wait_for_server(port)
+            stats = Stats()
+            shared = {
+                'reviews': deque(maxlen=RECENT),
+                'comments': deque(maxlen=RECENT),
+            }
+            users = [
+                VirtualUser(
+                    number, role, options, port, catalog, shared, stats
+                )
+                for number, role in enumerate(get_roles(options))
+            ]
+            started = time.monotonic()
+            deadline = started + options.seconds
+            threads = [
+                threading.Thread(target=user.run, args=(deadline,))
+                for user in users
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+    routes = stats.report(elapsed)
+    print(
+        f'{options.users} пользователей, {elapsed:.1f} с, '
+        f'{sum(r["requests"] for r in routes.values()) / elapsed:.1f} '
+        'запросов/с'
+    )
+    print_report(routes)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(
+                {'options': vars(options), 'routes': routes},
+                file, ensure_ascii=False, indent=2,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Микробенчмарк чтения: сериализаторы DRF против проекций values().
+
+Создаёт временную базу SQLite с произведениями, отзывами и комментариями
+и для страниц из 10, 100 и 1000 объектов сравнивает время сборки ответа
+(запросы к базе включены) сериализатором и проекцией из api/projections.py.
+
+    python benchmarks/read_path.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+SIZES = (10, 100, 1000)
+
+
+def setup(db_path):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def populate(count):
+    from reviews.models import Comment, Review
+    from titles.models import Category, Genre, Title
+    from user.models import User
+
+    category = Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.bulk_create([
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(10)
+    ])
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create([
+        Title(name=f'Произведение {i}', year=2000, description='Описание',
+              category=category, rating=7.5)
+        for i in range(count)
+    ])
+    title_ids = Title.objects.values_list('pk', flat=True)
+    Title.genre.through.objects.bulk_create([
+        Title.genre.through(title_id=title_id, genre_id=genres[j].pk)
+        for i, title_id in enumerate(title_ids)
+        for j in (i % 10, (i + 3) % 10)
+    ])
+    User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(count)
+    ])
+    title = Title.objects.first()
+    Review.objects.bulk_create([
+        Review(title=title, author=user, text='Текст отзыва', score=7)
+        for user in User.objects.all()
+    ])
+    review = Review.objects.first()
+    Comment.objects.bulk_create([
+        Comment(review=review, author=user, text='Текст комментария')
+        for user in User.objects.all()
+    ])
+    return title, review
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup(os.path.join(workdir, 'bench.sqlite3'))
+        from api import projections, serializers
+        from reviews.models import Comment, Review
+        from titles.models import Title
+
+        title, review = populate(max(SIZES))
+        cases = (
+            (
+                'titles',
+                Title.objects.select_related('category').prefetch_related(
+                    'genre'
+                ).order_by('pk'),
+                serializers.TitleViewSerializer,
+                projections.TitleProjection,
+            ),
+            (
+                'reviews',
+                Review.objects.filter(title=title).select_related('author'),
+                serializers.ReviewSerializer,
+                projections.ReviewProjection,
+            ),
+            (
+                'comments',
+                Comment.objects.filter(review=review).select_related(
+                    'author'
+                ),
+                serializers.CommentSerializer,
+                projections.CommentProjection,
+            ),
+        )
+        for name, queryset, serializer_class, projection_class in cases:
+            for size in SIZES:
+                projection = projection_class()
+                serializer_ms = measure(
+                    lambda: serializer_class(
+                        queryset[:size], many=True
+                    ).data,
+                    options.repeat,
+                )
+                projection_ms = measure(
+                    lambda: projection.render(
+                        projection.values(queryset)[:size]
+                    ),
+                    options.repeat,
+                )
+                print(
+                    f'{name:8} {size:5}: сериализатор {serializer_ms:8.2f} мс,'
+                    f' проекция {projection_ms:8.2f} мс,'
+                    f' ускорение x{serializer_ms / projection_ms:.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
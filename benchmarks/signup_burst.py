@@ -0,0 +1,111 @@
+"""Нагрузочный тест регистрации: одновременные запросы с одним username.
+
+Поднимает приложение на временной базе SQLite и из нескольких потоков
+одновременно отправляет `POST /api/v1/auth/signup/` с одним username: половина
+запросов с одинаковым email, половина — каждый со своим. Проверяет, что создан
+ровно один пользователь, запросы с его email получили 200 (новая регистрация
+или повторная отправка кода), остальные — 400, и ни один запрос не упал с
+ошибкой сервера. Печатает время и задержки.
+
+    python benchmarks/signup_burst.py --requests 200 --threads 16
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+
+def setup(db_path):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['*']
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    # Все запросы идут с одного адреса; проверяется регистрация, а не лимиты.
+    settings.API_THROTTLE = {**settings.API_THROTTLE, 'ENABLED': False}
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    # Ответы 400 здесь ожидаемы.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup(os.path.join(workdir, 'burst.sqlite3'))
+        from django.db import connection
+        from django.test import Client
+        from core.models import OutboxMessage
+        from user.models import User
+
+        start = threading.Barrier(min(options.threads, options.requests))
+
+        def sign_up(number):
+            client = Client()
+            email = (
+                'burst@yamdb.fake' if number % 2 == 0
+                else f'burst{number}@yamdb.fake'
+            )
+            if number < start.parties:
+                start.wait()
+            started = time.perf_counter()
+            try:
+                response = client.post(
+                    '/api/v1/auth/signup/',
+                    data={'username': 'burst', 'email': email},
+                )
+            finally:
+                connection.close()
+            return email, response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options.threads) as executor:
+            results = list(executor.map(sign_up, range(options.requests)))
+        elapsed = time.perf_counter() - started
+
+        errors = []
+        users = list(User.objects.filter(username='burst'))
+        if len(users) != 1:
+            errors.append(f'пользователей burst: {len(users)}, ожидался 1')
+        winner = users[0].email if users else None
+        for number, (email, status, _) in enumerate(results):
+            expected = 200 if email == winner else 400
+            if status != expected:
+                errors.append(
+                    f'запрос {number}: {status}, ожидался {expected}'
+                )
+        queued = OutboxMessage.objects.count()
+        accepted = sum(1 for _, status, _ in results if status == 200)
+        if queued != accepted:
+            errors.append(f'писем в очереди: {queued}, ожидалось {accepted}')
+
+        latencies = sorted(latency for _, _, latency in results)
+        print(
+            f'{options.requests} запросов за {elapsed:.2f} с '
+            f'({options.requests / elapsed:.0f} в секунду), '
+            f'p50 {statistics.median(latencies) * 1000:.1f} мс, '
+            f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} мс'
+        )
+        for error in errors:
+            print(error, file=sys.stderr)
+        sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
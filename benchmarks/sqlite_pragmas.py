@@ -0,0 +1,151 @@
+"""Смешанная нагрузка чтение/запись на SQLite: без PRAGMA и с SQLITE_PRAGMAS.
+
+Для каждого режима создаётся свежая база, заполняется произведениями и
+отзывами, затем несколько процессов одновременно выполняют запросы: доля
+`--writes` — добавление комментария, остальное — чтение страницы
+произведений и отзывов через ORM. Печатается пропускная способность и число
+ошибок «database is locked».
+
+    python benchmarks/sqlite_pragmas.py --processes 4 --seconds 10 --writes 0.2
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+MODES = ('default', 'tuned')
+
+
+def setup(db_path, mode):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    if mode == 'default':
+        # Как до настройки: журнал DELETE и только таймаут модуля sqlite3.
+        settings.SQLITE_PRAGMAS = {}
+        settings.DATABASES['default']['CONN_MAX_AGE'] = 0
+    import django
+    django.setup()
+
+
+def populate(titles):
+    from django.core.management import call_command
+    from reviews.models import Review
+    from titles.models import Category, Title
+    from user.models import User
+
+    call_command('migrate', verbosity=0)
+    category = Category.objects.create(name='Фильм', slug='movie')
+    Title.objects.bulk_create([
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(titles)
+    ])
+    user = User.objects.create(username='bench', email='bench@yamdb.fake')
+    Review.objects.bulk_create([
+        Review(title=title, author=user, text='Отзыв', score=7)
+        for title in Title.objects.all()
+    ])
+
+
+def work(seconds, writes, seed):
+    """Запускается в отдельном процессе: цикл запросов в течение seconds."""
+    from django.db import OperationalError, close_old_connections
+    from reviews.models import Comment, Review
+    from titles.models import Title
+
+    rng = random.Random(seed)
+    review_ids = list(Review.objects.values_list('pk', flat=True))
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < writes:
+                Comment.objects.create(
+                    review_id=rng.choice(review_ids),
+                    author_id=1,
+                    text='Комментарий',
+                )
+                counts['writes'] += 1
+            else:
+                offset = rng.randrange(0, len(review_ids) - 20)
+                list(Title.objects.select_related('category')[
+                    offset:offset + 20
+                ])
+                list(Review.objects.filter(
+                    title_id=rng.choice(review_ids)
+                ).select_related('author')[:20])
+                counts['reads'] += 1
+        except OperationalError:
+            counts['locked'] += 1
+        # Как между запросами: CONN_MAX_AGE решает, закрывать ли соединение.
+        close_old_connections()
+    print(json.dumps(counts))
+
+
+def run_mode(workdir, mode, options):
+    db_path = os.path.join(workdir, f'{mode}.sqlite3')
+    script = os.path.abspath(__file__)
+    subprocess.run(
+        [sys.executable, script, '--populate', db_path, '--mode', mode,
+         '--titles', str(options.titles)],
+        check=True,
+    )
+    processes = [
+        subprocess.Popen(
+            [sys.executable, script, '--work', db_path, '--mode', mode,
+             '--seconds', str(options.seconds),
+             '--writes', str(options.writes), '--seed', str(number)],
+            stdout=subprocess.PIPE, text=True,
+        )
+        for number in range(options.processes)
+    ]
+    total = {'reads': 0, 'writes': 0, 'locked': 0}
+    for process in processes:
+        output, _ = process.communicate()
+        for key, value in json.loads(output.splitlines()[-1]).items():
+            total[key] += value
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writes', type=float, default=0.2)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--mode', choices=MODES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--populate', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--work', metavar='DB', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.populate:
+        setup(options.populate, options.mode)
+        populate(options.titles)
+        return
+    if options.work:
+        setup(options.work, options.mode)
+        work(options.seconds, options.writes, options.seed)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in MODES:
+            total = run_mode(workdir, mode, options)
+            operations = total['reads'] + total['writes']
+            print(
+                f'{mode:8}: {operations / options.seconds:7.0f} оп/с '
+                f'(чтений {total["reads"]}, записей {total["writes"]}), '
+                f'database is locked: {total["locked"]}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Микробенчмарк ограничения частоты запросов по хранилищам корзин.
+
+Создаёт временную базу SQLite и для каждого хранилища из
+`API_THROTTLE['STORE']` сравнивает время обработки минимального запроса DRF
+без ограничения и с одной корзиной по адресу клиента. Печатает медиану
+на запрос и добавку от проверки лимита в микросекундах и процентах.
+
+    python benchmarks/throttling.py --requests 5000 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+STORES = ('memory', 'cache', 'database')
+
+
+def setup(db_path):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_view(throttle_classes):
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    class PingView(APIView):
+        authentication_classes = ()
+        permission_classes = ()
+
+        def get(self, request):
+            return Response()
+
+    PingView.throttle_classes = throttle_classes
+    return PingView.as_view()
+
+
+def measure(view, requests, repeat):
+    """Медиана по `repeat` прогонам, микросекунд на запрос."""
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    timings = []
+    for _ in range(repeat):
+        request = factory.get('/')
+        started = time.perf_counter()
+        for _ in range(requests):
+            view(request)
+        timings.append((time.perf_counter() - started) / requests)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup(os.path.join(workdir, 'bench.sqlite3'))
+        from django.conf import settings
+
+        from api.throttling import STORES as BUCKET_STORES
+        from api.throttling import throttles
+
+        plain_us = measure(make_view(()), options.requests, options.repeat)
+        print(f'без ограничения: {plain_us:8.1f} мкс')
+        for store in STORES:
+            settings.API_THROTTLE = {
+                **settings.API_THROTTLE,
+                'ENABLED': True,
+                'STORE': store,
+                'RATES': {'bench:ip': '1000000000/s'},
+            }
+            view = make_view(throttles('bench', 'ip'))
+            throttled_us = measure(view, options.requests, options.repeat)
+            overhead_us = throttled_us - plain_us
+            print(
+                f'{store:8}: {throttled_us:8.1f} мкс,'
+                f' проверка лимита +{overhead_us:6.1f} мкс'
+                f' ({overhead_us / plain_us:+.0%})'
+            )
+            if store == 'memory':
+                BUCKET_STORES['memory'].clear()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+
+from api.authentication import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """База очищается между тестами без сигналов, поэтому и кэш тоже."""
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    yield
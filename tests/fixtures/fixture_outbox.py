@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_outbox(settings):
+    """Письма отправляются сразу, как будто `send_outbox` уже отработал."""
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': True}
+
+
+@pytest.fixture
+def queued_outbox(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'EAGER': False}
@@ -0,0 +1,42 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def _format_queries(context):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(context.captured_queries, start=1)
+    )
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Проверяет, что запрос к эндпоинту укладывается в бюджет SQL-запросов.
+
+    Эндпоинт запрашивается дважды: с одним объектом на странице и с
+    `page_size` объектами. Число запросов не должно превышать `budget`
+    и не должно зависеть от размера страницы.
+    """
+
+    def check(client, url, budget, page_size=50):
+        counts = []
+        for limit in (1, page_size):
+            separator = '&' if '?' in url else '?'
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(f'{url}{separator}limit={limit}')
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            assert len(context) <= budget, (
+                f'GET запрос `{url}?limit={limit}` выполнил {len(context)} '
+                f'SQL-запросов при бюджете {budget}:\n'
+                f'{_format_queries(context)}'
+            )
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Количество SQL-запросов для `{url}` зависит от размера страницы '
+            f'({counts[0]} против {counts[1]}), проверьте N+1'
+        )
+
+    return check
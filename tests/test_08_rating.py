@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+from titles.models import Title
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_review_delete(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        client_user = auth_client(user)
+        client_user.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (9, 2), (
+            'Проверьте, что при удалении отзыва пересчитываются сумма и количество оценок произведения'
+        )
+        assert title.rating == 4.5, (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг произведения'
+        )
+        client_moderator = auth_client(moderator)
+        for review in reviews:
+            if review['id'] != reviews[1]['id']:
+                client_moderator.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов `rating` произведения равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4.0), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает агрегаты рейтинга'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None), (
+            'Проверьте, что команда `rebuild_ratings` обнуляет рейтинг произведений без отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_ratings_resets_etags(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        etag = client.get(url)['ETag']
+        call_command('rebuild_ratings')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['rating'] == 4, (
+            'Проверьте, что `rebuild_ratings` сбрасывает ETag и кэш ответов при исправлении рейтингов'
+        )
@@ -0,0 +1,46 @@
+import pytest
+
+from titles.models import Category, Genre, Title
+
+from .common import create_comments
+
+
+def create_extra_titles(count=10):
+    category = Category.objects.create(name='Сериал', slug='series')
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(3)
+    ]
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+class Test09QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_catalog_budget(self, client, admin_client, admin, assert_query_budget):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        create_extra_titles()
+        assert_query_budget(client, '/api/v1/titles/', 3)
+        assert_query_budget(client, '/api/v1/titles/?genre=genre-1', 3)
+        assert_query_budget(client, '/api/v1/titles/?search=произведение', 3)
+        assert_query_budget(client, f'/api/v1/titles/{titles[0]["id"]}/', 2)
+        assert_query_budget(client, '/api/v1/categories/', 2)
+        assert_query_budget(client, '/api/v1/genres/', 2)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_budget(self, client, admin_client, admin, assert_query_budget):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}'
+        assert_query_budget(client, f'{title_url}/reviews/', 3)
+        assert_query_budget(client, f'{title_url}/reviews/{reviews[0]["id"]}/', 2)
+        assert_query_budget(client, f'{title_url}/reviews/{reviews[0]["id"]}/comments/', 3)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_users_budget(self, admin_client, admin, assert_query_budget):
+        create_comments(admin_client, admin)
+        assert_query_budget(admin_client, '/api/v1/users/', 3)
+        assert_query_budget(admin_client, '/api/v1/users/?search=Test', 3)
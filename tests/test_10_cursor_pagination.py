@@ -0,0 +1,41 @@
+import pytest
+
+from .common import create_reviews, create_titles
+
+
+class Test10CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?pagination=cursor&limit=1')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/?pagination=cursor` возвращает статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            'Проверьте, что курсорная пагинация не считает `count` и отдаёт ссылку `next`'
+        )
+        seen = [item['id'] for item in data['results']]
+        response = client.get(data['next'])
+        seen += [item['id'] for item in response.json()['results']]
+        assert seen == sorted(title['id'] for title in titles), (
+            'Проверьте, что курсорная пагинация произведений упорядочена по `id`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=cursor&limit=2'
+        seen = []
+        while url:
+            data = client.get(url).json()
+            seen += [item['id'] for item in data['results']]
+            url = data['next']
+        assert sorted(seen) == sorted(review['id'] for review in reviews), (
+            'Проверьте, что курсорная пагинация отзывов возвращает все отзывы ровно один раз'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/?limit=2&offset=2')
+        assert response.json().get('count') == len(reviews), (
+            'Проверьте, что без `pagination=cursor` сохраняется пагинация limit/offset'
+        )
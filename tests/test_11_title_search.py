@@ -0,0 +1,44 @@
+import pytest
+
+from titles.models import Title
+
+
+class Test11TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_is_ranked_and_folded(self, client):
+        Title.objects.create(name='Ёжик в тумане', description='Мультфильм', year=1975)
+        Title.objects.create(name='Туман', description='Про ёжика и туман', year=2007)
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        response = client.get('/api/v1/titles/?search=ЕЖИК')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/?search=` возвращает статус 200'
+        )
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Ёжик в тумане', 'Туман'], (
+            'Проверьте, что поиск не зависит от регистра, не различает ё/е '
+            'и ставит выше совпадения в названии'
+        )
+        response = client.get('/api/v1/titles/?search=побег')
+        assert [t['name'] for t in response.json()['results']] == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск находит произведение по слову из названия'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_index_follows_writes(self, client):
+        title = Title.objects.create(name='Крестный отец', year=1972)
+        title.name = 'Зеленая миля'
+        title.save()
+        assert client.get('/api/v1/titles/?search=крестный').json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        assert client.get('/api/v1/titles/?search=миля').json()['count'] == 1, (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        title.delete()
+        assert client.get('/api/v1/titles/?search=миля').json()['count'] == 0, (
+            'Проверьте, что поисковый индекс очищается при удалении произведения'
+        )
+        assert client.get('/api/v1/titles/?search=%22%2A').json()['count'] == 0, (
+            'Проверьте, что служебные символы в `search` не ломают запрос'
+        )
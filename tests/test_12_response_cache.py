@@ -0,0 +1,61 @@
+import pytest
+
+from api import cache as response_cache
+
+from .common import auth_client, create_categories, create_titles, create_users_api
+
+
+class Test12ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_category_cache_invalidation(self, client, admin_client):
+        create_categories(admin_client)
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что первый GET запрос `/api/v1/categories/` не берётся из кэша'
+        )
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'HIT' and response.json()['count'] == 2, (
+            'Проверьте, что повторный GET запрос `/api/v1/categories/` отдаётся из кэша'
+        )
+        assert client.get('/api/v1/categories/?limit=1')['X-Cache'] == 'MISS', (
+            'Проверьте, что строка запроса входит в ключ кэша'
+        )
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кэш списка категорий'
+        )
+        stats = response_cache.get_stats()
+        assert (stats['hits'], stats['misses']) == (1, 3), (
+            'Проверьте, что кэш ответов считает попадания и промахи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_cache_follows_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        client.get('/api/v1/titles/')
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Отлично', 'score': 9}
+        )
+        response = client.get('/api/v1/titles/')
+        ratings = {title['id']: title['rating'] for title in response.json()['results']}
+        assert response['X-Cache'] == 'MISS' and ratings[titles[0]['id']] == 9, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_host_in_cache_key(self, client, admin_client):
+        create_categories(admin_client)
+        response = client.get('/api/v1/categories/?limit=1', HTTP_HOST='evil.example')
+        assert response.json()['next'].startswith('http://evil.example/')
+        response = client.get('/api/v1/categories/?limit=1')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что хост запроса входит в ключ кэша: ссылки пагинации абсолютные'
+        )
+        assert response.json()['next'].startswith('http://testserver/')
+        response = client.get('/api/v1/categories/?limit=1', secure=True)
+        assert response['X-Cache'] == 'MISS' and response.json()['next'].startswith('https://'), (
+            'Проверьте, что схема запроса входит в ключ кэша'
+        )
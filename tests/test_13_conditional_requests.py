@@ -0,0 +1,83 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test13ConditionalRequests:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_etag(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что GET запрос `{url}` возвращает заголовки `ETag` и `Last-Modified`'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304 and response['ETag'] == etag, (
+            f'Проверьте, что GET запрос `{url}` с актуальным `If-None-Match` возвращает статус 304'
+        )
+        auth_client(moderator).delete(f'{url}reviews/{reviews[1]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            f'Проверьте, что удаление отзыва меняет `ETag` произведения `{url}`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_if_match(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        client_user = auth_client(user)
+        etag = client_user.get(url)['ETag']
+        response = client_user.patch(url, data={'text': 'Новый текст'}, HTTP_IF_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что PATCH запрос `{url}` с актуальным `If-Match` возвращает статус 200'
+        )
+        assert response['ETag'] != etag and response['ETag'] == client_user.get(url)['ETag'], (
+            f'Проверьте, что PATCH запрос `{url}` возвращает новый `ETag` отзыва'
+        )
+        response = client_user.patch(url, data={'text': 'Ещё текст'}, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, (
+            f'Проверьте, что PATCH запрос `{url}` с устаревшим `If-Match` возвращает статус 412'
+        )
+        response = client_user.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, (
+            f'Проверьте, что DELETE запрос `{url}` с устаревшим `If-Match` возвращает статус 412'
+        )
+        list_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(list_url)['ETag']
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            f'Проверьте, что GET запрос `{list_url}` с актуальным `If-None-Match` возвращает статус 304'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sibling_writes_keep_if_match(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        url = f'{title_url}reviews/{reviews[1]["id"]}/'
+        client_user = auth_client(user)
+        client_moderator = auth_client(moderator)
+        etag = client_user.get(url)['ETag']
+        title_etag = client.get(title_url)['ETag']
+        client_moderator.patch(f'{title_url}reviews/{reviews[2]["id"]}/', data={'text': 'Соседний'})
+        client_moderator.patch('/api/v1/users/me/', data={'bio': 'Новое описание'})
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client_user.patch(url, data={'text': 'Мой текст'}, HTTP_IF_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что запись в соседний отзыв или профиль другого пользователя '
+            'не меняет `ETag` отзыва'
+        )
+        etag = response['ETag']
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        assert client_user.delete(url, HTTP_IF_MATCH=etag).status_code == 412, (
+            'Проверьте, что смена имени автора меняет `ETag` его отзыва'
+        )
+        category = titles[0]['category']
+        assert client.get(title_url, HTTP_IF_NONE_MATCH=title_etag).status_code == 200
+        title_etag = client.get(title_url)['ETag']
+        admin_client.delete(f'/api/v1/categories/{category}/')
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=title_etag)
+        assert response.status_code == 200 and response.json()['category'] is None, (
+            'Проверьте, что удаление категории меняет `ETag` её произведений'
+        )
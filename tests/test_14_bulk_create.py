@@ -0,0 +1,107 @@
+import pytest
+
+from titles.models import Category, Genre, Title
+
+from .common import create_genre, create_titles, create_users_api
+
+
+class Test14BulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_titles(self, admin_client, user_client, django_assert_max_num_queries):
+        data = [{'name': f'Жанр {i}', 'slug': f'bulk-genre-{i}'} for i in range(3)]
+        response = admin_client.post('/api/v1/genres/bulk/', data=data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST запрос `/api/v1/genres/bulk/` создаёт жанры'
+        )
+        admin_client.post('/api/v1/categories/bulk/', data=[{'name': 'Фильм', 'slug': 'films'}], format='json')
+        titles = [
+            {'name': f'Фильм {i}', 'year': 2000, 'category': 'films',
+             'genre': ['bulk-genre-0', f'bulk-genre-{i % 3}']}
+            for i in range(100)
+        ]
+        with django_assert_max_num_queries(10):
+            response = admin_client.post('/api/v1/titles/bulk/', data=titles, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST запрос `/api/v1/titles/bulk/` создаёт произведения'
+        )
+        created = response.json()
+        assert len(created) == 100 and created[5]['genre'] == ['bulk-genre-0', 'bulk-genre-2'], (
+            'Проверьте, что POST запрос `/api/v1/titles/bulk/` возвращает созданные произведения'
+        )
+        title = Title.objects.get(pk=created[5]['id'])
+        assert title.name == 'Фильм 5' and title.genre.count() == 2, (
+            'Проверьте, что массово созданные произведения получают свои жанры'
+        )
+        response = user_client.post('/api/v1/titles/bulk/', data=titles, format='json')
+        assert response.status_code == 403, (
+            'Проверьте, что массовое создание доступно только администратору'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_errors_per_item(self, admin_client):
+        create_genre(admin_client)
+        data = [
+            {'name': 'Хорошее', 'year': 2000, 'category': 'films', 'genre': ['drama']},
+            {'name': 'Плохое', 'year': 2000, 'category': 'nope', 'genre': ['drama', 'nope']},
+        ]
+        admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        response = admin_client.post('/api/v1/titles/bulk/', data=data, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что при ошибке в элементе `/api/v1/titles/bulk/` возвращает статус 400'
+        )
+        errors = response.json()
+        assert errors[0] == {} and set(errors[1]) == {'category', 'genre'}, (
+            'Проверьте, что ошибки массового создания возвращаются по элементам'
+        )
+        assert not Title.objects.filter(name='Хорошее').exists(), (
+            'Проверьте, что при ошибках массовое создание ничего не сохраняет'
+        )
+        response = admin_client.post(
+            '/api/v1/genres/bulk/', data=[{'name': 'Ещё драма', 'slug': 'drama'}], format='json'
+        )
+        assert response.status_code == 400 and 'slug' in response.json()[0], (
+            'Проверьте, что массовое создание жанров проверяет уникальность `slug`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_reviews(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        user, moderator = create_users_api(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        data = [
+            {'author': user.username, 'text': 'Хорошо', 'score': 8},
+            {'author': moderator.username, 'text': 'Отлично', 'score': 10},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` создаёт отзывы'
+        )
+        assert [review['author'] for review in response.json()] == [user.username, moderator.username], (
+            f'Проверьте, что POST запрос `{url}` возвращает созданные отзывы'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что массово созданные отзывы учитываются в рейтинге'
+        )
+        response = admin_client.post(url, data=data[:1], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что массовое создание не допускает второй отзыв автора'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_reserved_slug(self, admin_client):
+        for url in ('/api/v1/categories/', '/api/v1/genres/'):
+            response = admin_client.post(url, data={'name': 'Массовое', 'slug': 'bulk'})
+            assert response.status_code == 400 and 'slug' in response.json(), (
+                f'Проверьте, что POST запрос `{url}` не принимает slug `bulk`: '
+                f'адрес `{url}bulk/` занят массовым созданием'
+            )
+            response = admin_client.post(
+                f'{url}bulk/', data=[{'name': 'Массовое', 'slug': 'bulk'}], format='json'
+            )
+            assert response.status_code == 400 and 'slug' in response.json()[0], (
+                f'Проверьте, что `{url}bulk/` не принимает slug `bulk`'
+            )
+        assert not Category.objects.filter(slug='bulk').exists()
+        assert not Genre.objects.filter(slug='bulk').exists()
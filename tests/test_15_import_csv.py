@@ -0,0 +1,69 @@
+import os
+import shutil
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from core.models import ImportCheckpoint
+from reviews.models import Review
+from titles.models import Title
+
+from .conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+class Test15ImportCSV:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self):
+        call_command('import_csv', path=DATA_PATH, stdout=open(os.devnull, 'w'))
+        title = Title.objects.get(pk=1)
+        assert title.genre.exists() and title.category_id == 1, (
+            'Проверьте, что `import_csv` загружает произведения с категориями и жанрами'
+        )
+        assert title.rating_count == Review.objects.filter(title=title).count(), (
+            'Проверьте, что после загрузки отзывов `import_csv` пересчитывает рейтинги'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что `import_csv` сохраняет `pub_date` из файла'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_resume_after_failure(self, tmp_path):
+        for name in ('category.csv', 'genre.csv', 'titles.csv'):
+            shutil.copy(os.path.join(DATA_PATH, name), tmp_path / name)
+        with open(tmp_path / 'titles.csv', 'a', encoding='utf-8') as file:
+            file.write('\n1000,Сломанная строка,не год,1\n')
+        options = {'path': str(tmp_path), 'tables': ['category', 'genre', 'titles'], 'chunk_size': 10}
+        with pytest.raises(CommandError):
+            call_command('import_csv', stdout=open(os.devnull, 'w'), **options)
+        assert ImportCheckpoint.objects.get(table='titles').rows_done == Title.objects.count() == 30, (
+            'Проверьте, что `import_csv` фиксирует загруженные куски и отметку прогресса вместе'
+        )
+        shutil.copy(os.path.join(DATA_PATH, 'titles.csv'), tmp_path / 'titles.csv')
+        with open(tmp_path / 'titles.csv', 'a', encoding='utf-8') as file:
+            file.write('\n1000,Исправленная строка,2000,1\n')
+        call_command('import_csv', stdout=open(os.devnull, 'w'), **options)
+        assert Title.objects.count() == 33 and Title.objects.filter(pk=1000).exists(), (
+            'Проверьте, что повторный запуск `import_csv` продолжает с последнего куска'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_parallel_import(self):
+        call_command('import_csv', path=DATA_PATH, workers=2, chunk_size=10, stdout=open(os.devnull, 'w'))
+        assert Review.objects.count() == 72 and Title.objects.get(pk=1).genre.exists(), (
+            'Проверьте, что `import_csv --workers` загружает все таблицы'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что `import_csv --workers` сохраняет `pub_date` из файла'
+        )
+
+    def test_04_dependency_order(self):
+        from core import importer, pipeline
+        order = [table.name for table in pipeline.topological_order(list(reversed(importer.TABLES)))]
+        for table, dependency in (('titles', 'category'), ('genre_title', 'genre'), ('review', 'users'),
+                                  ('review', 'titles'), ('comments', 'review')):
+            assert order.index(dependency) < order.index(table), (
+                f'Проверьте, что таблица `{dependency}` загружается раньше `{table}`'
+            )
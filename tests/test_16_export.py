@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review
+from titles.models import Title
+
+from .test_15_import_csv import DATA_PATH
+
+
+def import_static_data():
+    call_command('import_csv', path=DATA_PATH, stdout=open(os.devnull, 'w'))
+
+
+class Test16Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_command_ndjson(self, tmp_path):
+        import_static_data()
+        output = tmp_path / 'titles.ndjson'
+        call_command('export_data', 'titles', output=str(output), chunk_size=7)
+        rows = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+        assert [row['id'] for row in rows] == list(Title.objects.order_by('pk').values_list('pk', flat=True)), (
+            'Проверьте, что `export_data titles` выгружает все произведения по одному разу'
+        )
+        title = Title.objects.get(pk=rows[0]['id'])
+        assert rows[0]['category']['slug'] == title.category.slug, (
+            'Проверьте, что выгрузка произведений содержит категорию'
+        )
+        assert {genre['slug'] for genre in rows[0]['genre']} == set(title.genre.values_list('slug', flat=True)), (
+            'Проверьте, что выгрузка произведений содержит жанры'
+        )
+        assert rows[0]['rating'] == title.rating, (
+            'Проверьте, что выгрузка произведений содержит рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_command_csv_gzip(self, tmp_path):
+        import_static_data()
+        output = tmp_path / 'comments.csv.gz'
+        call_command('export_data', 'comments', fmt='csv', gzip=True, output=str(output), chunk_size=5)
+        with gzip.open(output, 'rt', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        assert len(rows) == Comment.objects.count(), (
+            'Проверьте, что `export_data comments --format csv --gzip` выгружает все комментарии'
+        )
+        comment = Comment.objects.select_related('review', 'author').get(pk=rows[0]['id'])
+        assert rows[0]['author'] == comment.author.username, (
+            'Проверьте, что выгрузка комментариев содержит автора'
+        )
+        assert int(rows[0]['title_id']) == comment.review.title_id, (
+            'Проверьте, что выгрузка комментариев содержит произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_endpoint(self, admin_client, user_client):
+        import_static_data()
+        response = admin_client.get('/api/v1/export/reviews/')
+        assert response.status_code == 200 and response.streaming, (
+            'Проверьте, что `/api/v1/export/reviews/` отдаёт потоковый ответ'
+        )
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert len(rows) == Review.objects.count(), (
+            'Проверьте, что `/api/v1/export/reviews/` выгружает все отзывы'
+        )
+        response = admin_client.get('/api/v1/export/titles/?fmt=csv', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что выгрузка сжимается, если клиент принимает gzip'
+        )
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        assert len(list(csv.DictReader(io.StringIO(body)))) == Title.objects.count(), (
+            'Проверьте, что `/api/v1/export/titles/?fmt=csv` выгружает все произведения'
+        )
+        response = admin_client.get('/api/v1/export/titles/?fmt=xml')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестный формат выгрузки возвращает статус 400'
+        )
+        response = user_client.get('/api/v1/export/titles/')
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
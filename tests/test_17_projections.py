@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from api.serializers import CommentSerializer, ReviewSerializer, TitleViewSerializer
+from reviews.models import Comment, Review
+from titles.models import Title
+
+from .test_16_export import import_static_data
+
+
+def dump(data):
+    return json.dumps(data, ensure_ascii=False)
+
+
+class Test17Projections:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_same_json(self, client):
+        import_static_data()
+        Title.objects.create(name='Без категории', year=2001)
+        response = client.get('/api/v1/titles/?limit=1000')
+        results = response.json()['results']
+        titles = Title.objects.in_bulk([row['id'] for row in results])
+        expected = TitleViewSerializer([titles[row['id']] for row in results], many=True).data
+        assert dump(results) == dump(expected), (
+            'Проверьте, что список произведений совпадает с ответом `TitleViewSerializer`'
+        )
+        title = Title.objects.exclude(rating=None).first()
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert dump(response.json()) == dump(TitleViewSerializer(title).data), (
+            'Проверьте, что произведение совпадает с ответом `TitleViewSerializer`'
+        )
+        assert client.get('/api/v1/titles/100000/').status_code == 404, (
+            'Проверьте, что несуществующее произведение возвращает статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_same_json(self, client):
+        import_static_data()
+        review = Review.objects.filter(comments__isnull=False).first()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        results = client.get(url).json()['results']
+        expected = ReviewSerializer(Review.objects.filter(title_id=review.title_id), many=True).data
+        assert dump(results) == dump(expected), (
+            'Проверьте, что список отзывов совпадает с ответом `ReviewSerializer`'
+        )
+        response = client.get(f'{url}{review.pk}/')
+        assert dump(response.json()) == dump(ReviewSerializer(review).data), (
+            'Проверьте, что отзыв совпадает с ответом `ReviewSerializer`'
+        )
+        results = client.get(f'{url}{review.pk}/comments/?pagination=cursor').json()['results']
+        expected = CommentSerializer(Comment.objects.filter(review=review).order_by('-pub_date', 'id'), many=True).data
+        assert dump(results) == dump(expected), (
+            'Проверьте, что список комментариев совпадает с ответом `CommentSerializer`'
+        )
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_titles
+
+
+def count_selects(context, table):
+    return sum(
+        1 for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+    )
+
+
+class Test18ParentObjects:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_loaded_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` создаёт отзыв'
+        )
+        assert count_selects(context, 'titles_title') == 1, (
+            'Проверьте, что при создании отзыва произведение загружается один раз'
+        )
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(url)
+        assert count_selects(context, 'titles_title') == 1, (
+            'Проверьте, что при чтении отзывов произведение загружается один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_belongs_to_title(self, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` создаёт комментарий'
+        )
+        assert count_selects(context, 'reviews_review') == 1, (
+            'Проверьте, что при создании комментария отзыв загружается один раз'
+        )
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        assert admin_client.get(url).status_code == 404, (
+            'Проверьте, что комментарии к отзыву другого произведения возвращают статус 404'
+        )
+        response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя прокомментировать отзыв через чужое произведение'
+        )
+        response = admin_client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий не доступен через чужое произведение'
+        )
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import CommentSerializer, ReviewSerializer
+from reviews.models import Comment, Review
+from titles.models import Title
+from user.models import User
+
+from .common import create_comments
+from .test_18_parent_objects import count_selects
+
+
+def create_authors(count):
+    User.objects.bulk_create([
+        User(username=f'author{number}', email=f'author{number}@yamdb.fake')
+        for number in range(count)
+    ])
+
+
+class Test19AuthorLoading:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_serializers_batch_authors(self, django_assert_num_queries):
+        title = Title.objects.create(name='Произведение', year=2000)
+        create_authors(30)
+        authors = list(User.objects.filter(username__startswith='author'))
+        Review.objects.bulk_create([
+            Review(title=title, author=author, text='Отзыв', score=5) for author in authors
+        ])
+        review = Review.objects.first()
+        Comment.objects.bulk_create([
+            Comment(review=review, author=author, text='Комментарий') for author in authors
+        ])
+        with django_assert_num_queries(2):
+            data = ReviewSerializer(Review.objects.filter(title=title), many=True).data
+        assert {row['author'] for row in data} == {author.username for author in authors}, (
+            'Проверьте, что `ReviewSerializer` возвращает авторов всех отзывов'
+        )
+        with django_assert_num_queries(2):
+            data = CommentSerializer(Comment.objects.filter(review=review), many=True).data
+        assert len({row['author'] for row in data}) == len(authors), (
+            'Проверьте, что `CommentSerializer` возвращает авторов всех комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_permissions_do_not_load_author(self, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(url, data={'text': 'Новый текст'})
+        assert response.status_code == 200 and response.json()['author'] == admin.username, (
+            f'Проверьте, что автор может изменить свой отзыв `{url}`'
+        )
+        assert count_selects(context, 'user_user') <= 1, (
+            'Проверьте, что при изменении отзыва автор не загружается повторно'
+        )
+        url = f'{url}comments/{comments[1]["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(url)
+        assert response.status_code == 403, (
+            'Проверьте, что нельзя удалить чужой комментарий'
+        )
+        assert count_selects(context, 'user_user') <= 1, (
+            'Проверьте, что права на комментарий проверяются по `author_id`'
+        )
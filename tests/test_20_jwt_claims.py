@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken, user_cache
+
+from .test_18_parent_objects import count_selects
+
+
+def role_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+    return client
+
+
+class Test20JWTClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_permissions_without_user_query(self, admin, user):
+        client = role_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 201, (
+            'Проверьте, что токен с ролью администратора позволяет создать категорию'
+        )
+        assert count_selects(context, 'user_user') == 0, (
+            'Проверьте, что права доступа проверяются по полям токена без запроса к `user_user`'
+        )
+        response = role_client(user).get('/api/v1/users/me/')
+        assert response.status_code == 200 and response.json()['username'] == user.username, (
+            'Проверьте, что остальные поля пользователя загружаются по требованию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_claims(self, admin_client, user):
+        client = role_client(user)
+        data = {'name': 'Фильм', 'slug': 'films'}
+        assert client.post('/api/v1/categories/', data=data).status_code == 403, (
+            'Проверьте, что пользователь не может создать категорию'
+        )
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert client.post('/api/v1/categories/', data=data).status_code == 201, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` сразу действует для выданных токенов'
+        )
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'user'})
+        data = {'name': 'Книга', 'slug': 'books'}
+        assert client.post('/api/v1/categories/', data=data).status_code == 403, (
+            'Проверьте, что понижение роли сразу отзывает права выданных токенов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_user_cache_bounds(self, settings, admin, moderator, user, django_assert_num_queries):
+        settings.API_USER_CACHE = {'MAX_ENTRIES': 2, 'TIMEOUT': 60}
+        for cached in (admin, moderator, user):
+            user_cache.get(cached.pk)
+        assert list(user_cache.entries) == [moderator.pk, user.pk], (
+            'Проверьте, что кэш пользователей ограничен `MAX_ENTRIES` и вытесняет самые старые записи'
+        )
+        with django_assert_num_queries(0):
+            assert user_cache.get(user.pk).username == user.username
+        settings.API_USER_CACHE = {'MAX_ENTRIES': 2, 'TIMEOUT': 0}
+        user_cache.get(admin.pk)
+        with django_assert_num_queries(1):
+            user_cache.get(admin.pk)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_claims_expire_after_timeout(self, settings, admin):
+        settings.API_USER_CACHE = {'TIMEOUT': 60}
+        token = RoleAccessToken.for_user(admin)
+        token['iat'] -= 61
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Понижение в другом процессе: ни кэш процесса, ни общий кэш не сброшены.
+        type(admin).objects.filter(pk=admin.pk).update(role='user')
+        user_cache.clear()
+        response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 403, (
+            'Проверьте, что полям токена доверяют не дольше `API_USER_CACHE["TIMEOUT"]` после выдачи'
+        )
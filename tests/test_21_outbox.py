@@ -0,0 +1,61 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from core import outbox
+from core.models import OutboxMessage
+
+
+class Test21Outbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues(self, client, queued_outbox):
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200 and not mail.outbox, (
+            'Проверьте, что регистрация не ждёт отправки письма'
+        )
+        message = OutboxMessage.objects.get()
+        assert message.recipients == data['email'] and message.sent_at is None, (
+            'Проверьте, что письмо с кодом подтверждения ставится в очередь'
+        )
+        assert outbox.get_stats()['depth'] == 1
+        call_command('send_outbox', once=True, stdout=mock.MagicMock())
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == [data['email']], (
+            'Проверьте, что `send_outbox` отправляет письма из очереди'
+        )
+        stats = outbox.get_stats()
+        assert stats['depth'] == 0 and stats['latency_p50'] is not None, (
+            'Проверьте, что после отправки очередь пуста и задержка доставки посчитана'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_batch_uses_one_connection(self, queued_outbox):
+        for number in range(5):
+            outbox.enqueue('Тема', 'Текст', 'api@email.com', [f'user{number}@yamdb.fake'])
+        with mock.patch('core.outbox.get_connection', wraps=outbox.get_connection) as get_connection:
+            assert outbox.deliver_batch(batch_size=3) == (3, 0)
+        assert get_connection.call_count == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert outbox.deliver_batch() == (2, 0) and outbox.deliver_batch() == (0, 0)
+        assert len(mail.outbox) == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self, queued_outbox):
+        message = outbox.enqueue('Тема', 'Текст', 'api@email.com', ['user@yamdb.fake'])
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('нет связи')):
+            assert outbox.deliver_batch() == (0, 1)
+        message.refresh_from_db()
+        assert message.attempts == 1 and 'нет связи' in message.last_error, (
+            'Проверьте, что неудачная отправка запоминает ошибку'
+        )
+        assert message.available_at > message.created_at and outbox.deliver_batch() == (0, 0), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        OutboxMessage.objects.update(available_at=message.created_at)
+        assert outbox.deliver_batch() == (1, 0), (
+            'Проверьте, что после задержки письмо отправляется повторно'
+        )
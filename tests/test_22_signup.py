@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from user.models import User
+
+from .conftest import BASE_DIR
+from .test_18_parent_objects import count_selects
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+class Test22Signup:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_without_lookups(self, client):
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == 200 and response.json() == data
+        assert count_selects(context, 'user_user') == 0, (
+            'Проверьте, что регистрация нового пользователя не выполняет предварительных SELECT'
+        )
+        user = User.objects.get(username='newcomer')
+        code = mail.outbox[-1].body.rsplit(' ', 1)[-1]
+        assert default_token_generator.check_token(user, code), (
+            'Проверьте, что код подтверждения выдан для созданного пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_idempotent_resend(self, client):
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        assert client.post(URL_SIGNUP, data=data).status_code == 200
+        response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == 200 and response.json() == data, (
+            'Проверьте, что повторная регистрация неподтверждённого пользователя отправляет код ещё раз'
+        )
+        assert User.objects.filter(username='newcomer').count() == 1 and len(mail.outbox) == 2
+        code = mail.outbox[-1].body.rsplit(' ', 1)[-1]
+        response = client.post(URL_TOKEN, data={'username': 'newcomer', 'confirmation_code': code})
+        assert response.status_code == 200 and 'token' in response.json()
+        response = client.post(URL_TOKEN, data={'username': 'newcomer', 'confirmation_code': code})
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения одноразовый'
+        )
+        response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что подтверждённый пользователь может запросить новый код'
+        )
+        code = mail.outbox[-1].body.rsplit(' ', 1)[-1]
+        response = client.post(URL_TOKEN, data={'username': 'newcomer', 'confirmation_code': code})
+        assert response.status_code == 200 and 'token' in response.json(), (
+            'Проверьте, что по новому коду выдаётся новый токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conflicts(self, client):
+        client.post(URL_SIGNUP, data={'username': 'first', 'email': 'first@yamdb.fake'})
+        response = client.post(URL_SIGNUP, data={'username': 'first', 'email': 'other@yamdb.fake'})
+        assert response.status_code == 400 and 'username' in response.json(), (
+            'Проверьте, что занятый username возвращает ошибку в поле `username`'
+        )
+        response = client.post(URL_SIGNUP, data={'username': 'other', 'email': 'first@yamdb.fake'})
+        assert response.status_code == 400 and 'email' in response.json(), (
+            'Проверьте, что занятый email возвращает ошибку в поле `email`'
+        )
+
+    def test_04_concurrent_signups(self):
+        script = os.path.join(BASE_DIR, 'benchmarks', 'signup_burst.py')
+        result = subprocess.run(
+            [sys.executable, script, '--requests', '40', '--threads', '8'],
+            capture_output=True, text=True, timeout=300,
+        )
+        assert result.returncode == 0, (
+            'Проверьте, что одновременные регистрации с одним username создают одного пользователя:\n'
+            + result.stderr
+        )
@@ -0,0 +1,121 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import STORES, throttles
+from core.models import ThrottleBucket
+
+from .common import create_titles
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+def set_rates(settings, store='cache', **rates):
+    settings.API_THROTTLE = {
+        'ENABLED': True,
+        'STORE': store,
+        'RATES': {key.replace('__', ':'): rate for key, rate in rates.items()},
+    }
+
+
+def sign_up(client, number, address='10.0.0.1'):
+    return client.post(
+        URL_SIGNUP,
+        data={'username': f'bot{number}', 'email': f'bot{number}@yamdb.fake'},
+        REMOTE_ADDR=address,
+    )
+
+
+class Test23Throttling:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('store', ['cache', 'database'])
+    def test_01_signup_per_ip(self, client, settings, store):
+        set_rates(settings, store, signup__ip='3/min')
+        for number in range(3):
+            assert sign_up(client, number).status_code == 200
+        response = sign_up(client, 3)
+        assert response.status_code == 429, (
+            f'Проверьте, что `{URL_SIGNUP}` ограничивает число запросов с одного адреса'
+        )
+        assert 1 <= int(response['Retry-After']) <= 20, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`'
+        )
+        assert sign_up(client, 4, address='10.0.0.2').status_code == 200, (
+            'Проверьте, что лимит по адресу не действует на другие адреса'
+        )
+        if store == 'database':
+            assert ThrottleBucket.objects.count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_endpoint_scope(self, client, settings):
+        set_rates(settings, signup__endpoint='2/min')
+        assert sign_up(client, 0, '10.0.0.1').status_code == 200
+        assert sign_up(client, 1, '10.0.0.2').status_code == 200
+        assert sign_up(client, 2, '10.0.0.3').status_code == 429, (
+            'Проверьте, что общий лимит области действует для всех адресов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_per_user(self, admin_client, user_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        set_rates(settings, review__user='1/min')
+        data = {'text': 'Отзыв', 'score': 5}
+        assert admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data=data).status_code == 201
+        response = admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data=data)
+        assert response.status_code == 429 and 'Retry-After' in response, (
+            'Проверьте, что создание отзывов ограничено для каждого пользователя'
+        )
+        assert user_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data=data).status_code == 201
+        assert admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/').status_code == 200, (
+            'Проверьте, что лимит создания отзывов не действует на чтение'
+        )
+
+    def test_04_token_bucket_refill(self):
+        store = STORES['memory']
+        store.clear()
+        assert [store.consume('key', 2, 1.0, 100.0)[0] for _ in range(3)] == [True, True, False]
+        allowed, wait = store.consume('key', 2, 1.0, 100.5)
+        assert not allowed and wait == pytest.approx(0.5)
+        assert store.consume('key', 2, 1.0, 101.0)[0], (
+            'Проверьте, что корзина пополняется со временем'
+        )
+        store.clear()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_hot_path_default_store(self, settings, django_assert_num_queries):
+        # Время проверки измеряет benchmarks/throttling.py; здесь — что
+        # хранилище по умолчанию не ходит в базу и считает корзину верно.
+        settings.API_THROTTLE = {'RATES': {'bench:ip': '3/min'}}
+        throttle = throttles('bench', 'ip')[0]()
+        request = APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.9')
+        request.user = None
+        with django_assert_num_queries(0):
+            allowed = [throttle.allow_request(request, None) for _ in range(4)]
+        assert allowed == [True, True, True, False], (
+            'Проверьте, что хранилище корзин по умолчанию (`cache`) работает без запросов к базе'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_forwarded_for(self, client, settings):
+        set_rates(settings, signup__ip='2/min')
+
+        def forwarded_sign_up(number, forwarded):
+            return client.post(
+                URL_SIGNUP,
+                data={'username': f'bot{number}', 'email': f'bot{number}@yamdb.fake'},
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=forwarded,
+            )
+
+        statuses = [forwarded_sign_up(number, f'192.0.2.{number}').status_code for number in range(3)]
+        assert statuses == [200, 200, 429], (
+            'Проверьте, что подменённый клиентом `X-Forwarded-For` не обходит лимит по адресу'
+        )
+        settings.API_THROTTLE = {**settings.API_THROTTLE, 'NUM_PROXIES': 1}
+        assert forwarded_sign_up(3, '192.0.2.1, 198.51.100.7').status_code == 200, (
+            'Проверьте, что за доверенным прокси адрес клиента берётся из `X-Forwarded-For`'
+        )
+        assert forwarded_sign_up(4, '203.0.113.9, 198.51.100.7').status_code == 200
+        assert forwarded_sign_up(5, '198.51.100.7').status_code == 429, (
+            'Проверьте, что учитывается только адрес, добавленный доверенным прокси'
+        )
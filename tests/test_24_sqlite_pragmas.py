@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+def open_database(path):
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path)}, alias='pragmas')
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class Test24SQLitePragmas:
+
+    @pytest.mark.django_db
+    def test_01_pragmas_on_connect(self, tmp_path):
+        wrapper = open_database(tmp_path / 'pragmas.sqlite3')
+        try:
+            assert pragma(wrapper, 'journal_mode') == 'wal', (
+                'Проверьте, что новое соединение с SQLite включает режим WAL'
+            )
+            assert pragma(wrapper, 'synchronous') == 1, (
+                'Проверьте, что новое соединение с SQLite устанавливает synchronous=NORMAL'
+            )
+            assert pragma(wrapper, 'busy_timeout') == 5000
+            assert pragma(wrapper, 'temp_store') == 2
+            assert pragma(wrapper, 'cache_size') == -65536
+        finally:
+            wrapper.close()
+
+    @pytest.mark.django_db
+    def test_02_configurable(self, tmp_path, settings):
+        settings.SQLITE_PRAGMAS = {'busy_timeout': 1234}
+        wrapper = open_database(tmp_path / 'custom.sqlite3')
+        try:
+            assert pragma(wrapper, 'busy_timeout') == 1234 and pragma(wrapper, 'journal_mode') == 'delete', (
+                'Проверьте, что PRAGMA берутся из `SQLITE_PRAGMAS`'
+            )
+        finally:
+            wrapper.close()
+        settings.SQLITE_PRAGMAS = {'journal_mode': 'WAL; DROP TABLE user_user'}
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': str(tmp_path / 'invalid.sqlite3')}, alias='pragmas'
+        )
+        try:
+            with pytest.raises(ValueError):
+                wrapper.ensure_connection()
+        finally:
+            wrapper.close()
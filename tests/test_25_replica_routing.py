@@ -0,0 +1,135 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import replicas, routers
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import ReplicaHeartbeat
+from core.routers import ReplicaRouter
+from titles.models import Title
+
+
+def route(method, path, status=200, **extra):
+    """Прогоняет запрос через middleware; возвращает (база для чтения, ответ)."""
+    routed = []
+
+    def get_response(request):
+        routed.append(ReplicaRouter().db_for_read(Title))
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)(path, **extra)
+    response = ReplicaRoutingMiddleware(get_response)(request)
+    return routed[0], response
+
+
+@pytest.fixture
+def replica_alias(tmp_path, settings):
+    connections.databases['replica'] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+        'TEST': {},
+    }
+    connections.ensure_defaults('replica')
+    settings.DATABASE_REPLICAS = ['replica']
+    yield 'replica'
+    connections['replica'].close()
+    if hasattr(connections._connections, 'replica'):
+        delattr(connections._connections, 'replica')
+    del connections.databases['replica']
+
+
+class Test25ReplicaRouting:
+
+    def test_01_router(self, settings):
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что без реплик чтение идёт в основную базу'
+        )
+        settings.DATABASE_REPLICAS = ['replica']
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что вне разрешённого запроса чтение идёт в основную базу'
+        )
+        token = routers.use_replicas(True)
+        try:
+            assert router.db_for_read(Title) == 'replica', (
+                'Проверьте, что разрешённое чтение идёт на реплику'
+            )
+            assert router.db_for_write(Title) == 'default'
+            assert router.db_for_read(Title) is None, (
+                'Проверьте, что после записи запрос читает из основной базы'
+            )
+        finally:
+            routers.reset(token)
+        assert router.allow_migrate('replica', 'titles') is False, (
+            'Проверьте, что к репликам не применяются миграции'
+        )
+
+    def test_02_middleware(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        assert route('get', '/api/v1/titles/')[0] == 'replica', (
+            'Проверьте, что чтение каталога идёт на реплику'
+        )
+        assert route('get', '/api/v1/users/')[0] is None, (
+            'Проверьте, что на реплику идут только пути `REPLICA_ROUTING["PATHS"]`'
+        )
+        assert route('post', '/api/v1/titles/1/reviews/')[0] is None
+        _, response = route('post', '/api/v1/titles/1/reviews/', status=400)
+        assert 'primary_pin' not in response.cookies, (
+            'Проверьте, что неудачная запись не закрепляет клиента'
+        )
+        assert routers._use_replicas.get() is False
+
+    def test_03_read_your_writes(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        auth = {'HTTP_AUTHORIZATION': 'Bearer token-1'}
+        _, response = route('post', '/api/v1/titles/1/reviews/', status=201, **auth)
+        cookie = response.cookies['primary_pin']
+        assert cookie['max-age'] == 5, (
+            'Проверьте, что после записи клиент закрепляется за основной базой на `PIN_SECONDS`'
+        )
+        assert route('get', '/api/v1/titles/1/reviews/', HTTP_COOKIE='primary_pin=1')[0] is None, (
+            'Проверьте, что клиент с cookie закрепления читает из основной базы'
+        )
+        assert route('get', '/api/v1/titles/1/reviews/', **auth)[0] is None, (
+            'Проверьте, что клиент с тем же токеном читает из основной базы и без cookie'
+        )
+        assert route(
+            'get', '/api/v1/titles/1/reviews/', HTTP_AUTHORIZATION='Bearer token-2'
+        )[0] == 'replica'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_refresh_and_lag(self, replica_alias, capsys):
+        assert replicas.measure() == {'replica': None}, (
+            'Проверьте, что `replica_lag` сообщает об отсутствии метки на реплике'
+        )
+        call_command('refresh_replicas')
+        assert ReplicaHeartbeat.objects.using('replica').count() == 1, (
+            'Проверьте, что `refresh_replicas` копирует основную базу в реплику'
+        )
+        call_command('replica_lag')
+        lag = replicas.measure()['replica']
+        assert lag is not None and lag >= 0
+        output = capsys.readouterr().out
+        assert 'replica:' in output and ' с' in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_response_cache(self, replica_alias, client, admin_client):
+        admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        call_command('refresh_replicas')
+        admin_client.post('/api/v1/categories/', data={'name': 'Книга', 'slug': 'books'})
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1, 'Анонимный клиент читает отстающую реплику'
+        assert 'ETag' not in response, (
+            'Проверьте, что ответ, прочитанный с реплики, не получает ETag новой версии'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == 2, (
+            'Проверьте, что ответ, прочитанный с реплики, не попадает в кэш ответов'
+        )
+        assert 'ETag' in response
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'HIT' and response.json()['count'] == 2, (
+            'Проверьте, что ответы из основной базы по-прежнему кэшируются'
+        )
@@ -0,0 +1,98 @@
+import hashlib
+import os
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.generator import Scale
+from core.models import ImportCheckpoint
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+
+
+def digest(path):
+    return {
+        name: hashlib.sha1((path / name).read_bytes()).hexdigest()
+        for name in sorted(os.listdir(path))
+    }
+
+
+def generate(path, **options):
+    call_command('generate_data', output=str(path), stdout=open(os.devnull, 'w'), **options)
+
+
+class Test26GenerateData:
+
+    def test_01_deterministic(self, tmp_path):
+        generate(tmp_path / 'a', reviews=2000, seed=7)
+        generate(tmp_path / 'b', reviews=2000, seed=7)
+        generate(tmp_path / 'c', reviews=2000, seed=8)
+        assert digest(tmp_path / 'a') == digest(tmp_path / 'b'), (
+            'Проверьте, что при одном `--seed` набор совпадает байт в байт'
+        )
+        assert digest(tmp_path / 'a')['review.csv'] != digest(tmp_path / 'c')['review.csv'], (
+            'Проверьте, что `--seed` меняет набор'
+        )
+
+    def test_02_distributions(self):
+        scale = Scale(20000, seed=1)
+        reviews = list(scale.get_rows('review'))
+        per_title = Counter(title for _, title, *_ in reviews)
+        top = per_title.most_common()
+        assert len(reviews) == 20000 and top[0][1] > 50 * top[len(top) // 2][1], (
+            'Проверьте, что число отзывов на произведение распределено по закону Ципфа'
+        )
+        assert len({(title, author) for _, title, _, author, _, _ in reviews}) == len(reviews), (
+            'Проверьте, что у автора не больше одного отзыва на произведение'
+        )
+        assert all(1 <= score <= 10 for *_, score, _ in reviews)
+        assert any(ord(char) > 1000 for char in reviews[0][2]), (
+            'Проверьте, что тексты отзывов на русском'
+        )
+        genres = Counter(title for _, title, _ in scale.get_rows('genre_title'))
+        assert max(genres.values()) > 1 and len(genres) == scale.titles, (
+            'Проверьте, что у каждого произведения есть жанры и они пересекаются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_import_generated_csv(self, tmp_path):
+        generate(tmp_path, reviews=500, seed=3)
+        call_command('import_csv', path=str(tmp_path), stdout=open(os.devnull, 'w'))
+        assert Review.objects.count() == 500 and Comment.objects.count() == 250, (
+            'Проверьте, что `import_csv` принимает CSV-файлы `generate_data`'
+        )
+        assert Genre.objects.filter(slug='drama').exists(), (
+            'Проверьте, что набор включает жанры из `static/data`'
+        )
+        title = Title.objects.order_by('-rating_count').first()
+        assert title.rating_count == Review.objects.filter(title=title).count()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_database(self):
+        call_command(
+            'generate_data', database=True, reviews=500, seed=3, chunk_size=100,
+            stdout=open(os.devnull, 'w'),
+        )
+        generated = list(Review.objects.order_by('pk').values_list('pk', 'title_id', 'text', 'author_id', 'score'))
+        assert generated == [row[:5] for row in Scale(500, seed=3).get_rows('review')], (
+            'Проверьте, что `generate_data --database` загружает тот же набор, что пишет в CSV'
+        )
+        assert Title.objects.exclude(rating_count=0).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_database_not_empty(self):
+        options = {'database': True, 'reviews': 100, 'seed': 3, 'stdout': open(os.devnull, 'w')}
+        Category.objects.create(name='Своя', slug='own')
+        with pytest.raises(CommandError, match='category'):
+            call_command('generate_data', **options)
+        assert not ImportCheckpoint.objects.exists() and not Review.objects.exists(), (
+            'Проверьте, что `generate_data --database` проверяет пустые таблицы до загрузки'
+        )
+        Category.objects.all().delete()
+        call_command('generate_data', **options)
+        call_command('generate_data', **options)
+        assert Review.objects.count() == 100, (
+            'Проверьте, что повторный запуск продолжает загрузку с отметки, а не отклоняется'
+        )
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+from .conftest import BASE_DIR
+
+SCRIPT = os.path.join(BASE_DIR, 'benchmarks', 'endpoints.py')
+
+
+def run_benchmark(*args):
+    return subprocess.run(
+        [sys.executable, SCRIPT, '--scales', '200', '--requests', '3', '--warmup', '1', *args],
+        capture_output=True, text=True, timeout=300,
+    )
+
+
+class Test27EndpointBenchmark:
+
+    def test_01_results_and_baseline(self, tmp_path):
+        output = tmp_path / 'results.json'
+        result = run_benchmark('--output', str(output))
+        assert result.returncode == 0, (
+            'Проверьте, что бенчмарк эндпоинтов проходит без ошибок:\n' + result.stderr
+        )
+        cases = json.loads(output.read_text(encoding='utf-8'))['results']['200']['cases']
+        assert len([name for name in cases if name.startswith('titles?')]) == 32, (
+            'Проверьте, что бенчмарк перебирает все сочетания фильтров `TitleFilter`'
+        )
+        for name in ('title', 'reviews', 'comments', 'users?search', 'signup', 'token'):
+            assert name in cases, f'Проверьте, что бенчмарк измеряет `{name}`'
+        assert all(
+            case['errors'] == 0 and case['p50_ms'] <= case['p95_ms'] <= case['p99_ms'] and case['rps'] > 0
+            for case in cases.values()
+        )
+
+        baseline = json.loads(output.read_text(encoding='utf-8'))
+        for case in baseline['results']['200']['cases'].values():
+            case['p95_ms'] /= 100
+        baseline_path = tmp_path / 'baseline.json'
+        baseline_path.write_text(json.dumps(baseline), encoding='utf-8')
+        result = run_benchmark('--baseline', str(baseline_path))
+        assert result.returncode == 1 and 'Регрессия' in result.stderr, (
+            'Проверьте, что бенчмарк сообщает о росте p95 относительно `--baseline`'
+        )
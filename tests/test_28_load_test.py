@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+from .conftest import BASE_DIR
+
+
+class Test28LoadTest:
+
+    def test_01_closed_loop_against_server(self, tmp_path):
+        script = os.path.join(BASE_DIR, 'benchmarks', 'load_test.py')
+        output = tmp_path / 'load.json'
+        result = subprocess.run(
+            [
+                sys.executable, script, '--users', '4', '--moderators', '1', '--writers', '0.5',
+                '--seconds', '3', '--think', '0.02', '--reviews', '300', '--output', str(output),
+            ],
+            capture_output=True, text=True, timeout=300,
+        )
+        assert result.returncode == 0, (
+            'Проверьте, что нагрузочный тест запускает сервер и завершается без ошибок:\n'
+            + result.stderr
+        )
+        routes = json.loads(output.read_text(encoding='utf-8'))['routes']
+        for route in ('POST signup', 'POST token', 'GET titles'):
+            assert route in routes, f'Проверьте, что нагрузочный тест выполняет `{route}`'
+        assert routes['POST token']['requests'] == 3 and routes['POST token']['rejected_rate'] == 0, (
+            'Проверьте, что авторы и модераторы получают токен через `/auth/signup/` и `/auth/token/`'
+        )
+        for route, stats in routes.items():
+            assert stats['error_rate'] == 0, f'Ошибки сервера на маршруте `{route}`'
+            assert sum(stats['histogram'].values()) == stats['requests']
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
@@ -0,0 +1,86 @@
+import json
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+def parse_server_timing(header):
+    return {
+        metric.split(';')[0]: metric
+        for metric in header.split(', ')
+    }
+
+
+class Test29RequestTiming:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing(self, admin_client, settings):
+        settings.REQUEST_TIMING = {'LOG': False}
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        header = response.get('Server-Timing')
+        assert header, 'Проверьте, что ответ содержит заголовок `Server-Timing`'
+        metrics = parse_server_timing(header)
+        assert {'db', 'view', 'serialize', 'render', 'total'} <= set(metrics), (
+            'Проверьте, что `Server-Timing` содержит время базы, представления, сериализации, отрисовки и общее'
+        )
+        queries = re.search(r'desc="(\d+) queries"', metrics['db'])
+        assert queries and int(queries.group(1)) == len(context.captured_queries), (
+            'Проверьте, что `Server-Timing` сообщает число запросов к базе'
+        )
+        durations = {name: float(re.search(r'dur=([\d.]+)', metric).group(1)) for name, metric in metrics.items()}
+        assert durations['db'] <= durations['total'] and durations['view'] <= durations['total']
+        assert durations['serialize'] <= durations['view']
+        response = admin_client.post('/api/v1/genres/', data={'name': 'Джаз', 'slug': 'jazz'})
+        assert 'serialize' in parse_server_timing(response['Server-Timing']), (
+            'Проверьте, что время `serializer.data` попадает в `serialize`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_structured_log(self, admin_client, settings, caplog):
+        settings.REQUEST_TIMING = {'HEADER': False, 'LOG_MIN_MS': 0, 'SLOW_QUERIES': 2}
+        create_titles(admin_client)
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger='core.timing'):
+            response = admin_client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
+        records = [json.loads(record.getMessage()) for record in caplog.records if record.name == 'core.timing']
+        assert len(records) == 1, 'Проверьте, что каждый запрос записывается в журнал `core.timing`'
+        record = records[0]
+        assert record['route'] == 'titles-list' and record['status'] == 200 and record['queries'] > 0
+        assert 0 < len(record['slowest_queries']) <= 2, (
+            'Проверьте, что журнал хранит ограниченное число самых долгих запросов'
+        )
+        assert record['total_ms'] >= record['db_ms'] and 'serialize_ms' in record
+        settings.REQUEST_TIMING = {'HEADER': False}
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger='core.timing'):
+            admin_client.get('/api/v1/titles/')
+        assert not [record for record in caplog.records if record.name == 'core.timing'], (
+            'Проверьте, что по умолчанию в журнал попадают только медленные запросы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_header_only_for_staff(self, client, user_client, admin_client, settings):
+        settings.REQUEST_TIMING = {'LOG': False}
+        assert 'Server-Timing' not in client.get('/api/v1/titles/'), (
+            'Проверьте, что анонимный клиент не получает `Server-Timing`'
+        )
+        assert 'Server-Timing' not in user_client.get('/api/v1/titles/')
+        assert 'Server-Timing' in admin_client.get('/api/v1/titles/')
+        settings.DEBUG = True
+        assert 'Server-Timing' in client.get('/api/v1/titles/'), (
+            'Проверьте, что при DEBUG заголовок `Server-Timing` получают все'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_disabled(self, client, settings):
+        settings.REQUEST_TIMING = {'ENABLED': False}
+        assert 'Server-Timing' not in client.get('/api/v1/titles/')
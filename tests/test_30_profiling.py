@@ -0,0 +1,91 @@
+import os
+import pstats
+import re
+import time
+
+import pytest
+
+from core import profiling
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return 'done'
+
+
+@pytest.fixture
+def profile_dir(tmp_path, settings):
+    settings.REQUEST_PROFILING = {'DIR': str(tmp_path), 'SAMPLE_INTERVAL': 0.0005}
+    return tmp_path
+
+
+class Test30Profiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cprofile(self, admin_client, profile_dir):
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='cprofile')
+        assert response.status_code == 200
+        name = response.get('X-Profile')
+        assert name and name.endswith('.prof'), (
+            'Проверьте, что запрос администратора с `X-Profile: cprofile` профилируется'
+        )
+        assert response['X-Profile-Url'] == f'/api/v1/profiles/{name}/'
+        download = admin_client.get(response['X-Profile-Url'])
+        assert download.status_code == 200, 'Проверьте, что администратор может скачать профиль'
+        path = profile_dir / 'downloaded.prof'
+        path.write_bytes(b''.join(download.streaming_content))
+        functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+        assert 'list' in functions, 'Проверьте, что профиль содержит вызовы представления'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sample(self, admin_client, profile_dir):
+        response = admin_client.get('/api/v1/titles/?profile=sample')
+        name = response.get('X-Profile')
+        assert name and name.endswith('.collapsed'), (
+            'Проверьте, что `?profile=sample` сохраняет свёрнутые стеки'
+        )
+        assert (profile_dir / name).exists()
+
+    def test_03_sampler(self, profile_dir):
+        result, name = profiling.profile('sample', busy_work, 0.05)
+        assert result == 'done'
+        lines = (profile_dir / name).read_text(encoding='utf-8').splitlines()
+        assert lines and all(re.match(r'^\S.* \d+$', line) for line in lines), (
+            'Проверьте формат свёрнутых стеков: `кадр;кадр;... число`'
+        )
+        assert any('busy_work (test_30_profiling.py' in line for line in lines), (
+            'Проверьте, что сэмплер снимает стек профилируемого потока'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_only_admin(self, client, user_client, moderator_client, profile_dir):
+        for api_client in (client, user_client, moderator_client):
+            response = api_client.get('/api/v1/titles/', HTTP_X_PROFILE='cprofile')
+            assert response.status_code == 200 and 'X-Profile' not in response, (
+                'Проверьте, что профилировать запросы может только администратор'
+            )
+        assert not os.listdir(profile_dir)
+        assert user_client.get('/api/v1/profiles/1-' + '0' * 32 + '.prof/').status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_download_and_retention(self, admin_client, profile_dir, settings):
+        assert admin_client.get('/api/v1/profiles/..%2Fsettings.py/').status_code == 404
+        assert admin_client.get('/api/v1/profiles/1-' + '0' * 32 + '.prof/').status_code == 404
+        settings.REQUEST_PROFILING = {**settings.REQUEST_PROFILING, 'MAX_FILES': 2}
+        names = [
+            admin_client.get('/api/v1/genres/', HTTP_X_PROFILE='cprofile')['X-Profile']
+            for _ in range(3)
+        ]
+        assert sorted(os.listdir(profile_dir)) == sorted(names[1:]), (
+            'Проверьте, что хранятся только последние `MAX_FILES` профилей'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_superuser_can_download(self, user_superuser_client, profile_dir):
+        response = user_superuser_client.get('/api/v1/titles/', HTTP_X_PROFILE='cprofile')
+        assert 'X-Profile' in response, 'Проверьте, что суперпользователь может профилировать запросы'
+        assert user_superuser_client.get(response['X-Profile-Url']).status_code == 200, (
+            'Проверьте, что профилирование и скачивание профиля доступны одним и тем же пользователям'
+        )
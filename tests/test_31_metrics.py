@@ -0,0 +1,173 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from core import metrics
+from tests.common import create_titles, create_users_api
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics(settings):
+    settings.METRICS = {'ENABLED': True, 'DIR': None, 'ALLOWED_IPS': ('127.0.0.1',)}
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+def get_value(text, name, **labels):
+    """Значение строки `name{метки}` в выводе /metrics/ или None."""
+    for line in text.splitlines():
+        match = re.match(r'^([a-z_]+)(?:\{(.*)\})? (\S+)$', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+        if found == {key: str(value) for key, value in labels.items()}:
+            return float(match.group(3))
+    return None
+
+
+def scrape(client):
+    response = client.get('/metrics/')
+    assert response.status_code == 200, 'Проверьте, что /metrics/ доступен с локального адреса'
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+class Test31Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_http_requests(self, client, admin_client):
+        create_titles(admin_client)
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+        client.get('/no-such-page/')
+        text = scrape(client)
+        assert get_value(
+            text, 'yamdb_http_requests_total', route='titles-list', method='GET', status=200
+        ) == 3, 'Проверьте, что ответы считаются по маршруту, методу и коду'
+        assert get_value(
+            text, 'yamdb_http_requests_total', route='unmatched', method='GET', status=404
+        ) == 1
+        assert get_value(
+            text, 'yamdb_http_request_duration_seconds_count', route='titles-list', method='GET'
+        ) == 3
+        assert get_value(
+            text, 'yamdb_http_request_duration_seconds_bucket', route='titles-list', method='GET', le='+Inf'
+        ) == 3, 'Проверьте, что гистограмма задержек накопительная и заканчивается le="+Inf"'
+        assert get_value(text, 'yamdb_db_queries_total', route='titles-list', method='GET') >= 3
+        assert get_value(text, 'yamdb_http_requests_in_progress') == 1, (
+            'Проверьте, что в обрабатываемых запросах учтён только сам запрос /metrics/'
+        )
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_application_events(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data = {'username': 'metrics', 'email': 'metrics@yamdb.fake'}
+        client.post('/api/v1/auth/signup/', data=data)
+        client.post('/api/v1/auth/signup/', data=data)
+        client.post('/api/v1/auth/signup/', data={'username': 'me', 'email': 'bad'})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = admin_client.post(url, data={'text': 'Текст', 'score': 5}).json()
+        admin_client.patch(f'{url}{review["id"]}/', data={'score': 7})
+        admin_client.delete(f'{url}{review["id"]}/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        text = scrape(client)
+        for outcome, expected in (('created', 1), ('resent', 1), ('rejected', 1)):
+            assert get_value(text, 'yamdb_signups_total', outcome=outcome) == expected, (
+                'Проверьте, что регистрации считаются по исходу'
+            )
+        assert get_value(text, 'yamdb_emails_total', outcome='queued') == 2
+        assert get_value(text, 'yamdb_emails_total', outcome='sent') == 2
+        for operation in ('create', 'update', 'delete'):
+            assert get_value(text, 'yamdb_review_writes_total', operation=operation) == 1, (
+                'Проверьте, что изменения отзывов считаются по операции'
+            )
+        assert get_value(text, 'yamdb_cache_requests_total', cache='response', result='hit') >= 1
+        assert get_value(text, 'yamdb_cache_requests_total', cache='response', result='miss') >= 1
+        assert get_value(text, 'yamdb_cache_requests_total', cache='user', result='hit') >= 1
+        assert get_value(text, 'yamdb_outbox_depth') == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_forbidden(self, client, settings):
+        settings.METRICS = {'ALLOWED_IPS': ('10.0.0.1',)}
+        assert client.get('/metrics/').status_code == 403, (
+            'Проверьте, что /metrics/ недоступен с адресов вне `ALLOWED_IPS`'
+        )
+        settings.METRICS = {'ALLOWED_IPS': ('127.0.0.1',)}
+        settings.API_THROTTLE = {'NUM_PROXIES': 1}
+        response = client.get('/metrics/', HTTP_X_FORWARDED_FOR='203.0.113.5')
+        assert response.status_code == 403, (
+            'Проверьте, что за доверенным прокси /metrics/ проверяет адрес клиента из `X-Forwarded-For`'
+        )
+        response = client.get('/metrics/', HTTP_X_FORWARDED_FOR='127.0.0.1, 203.0.113.5')
+        assert response.status_code == 403, (
+            'Проверьте, что подставленный клиентом адрес в `X-Forwarded-For` не учитывается'
+        )
+        settings.METRICS = {'ALLOWED_IPS': ('203.0.113.5',)}
+        response = client.get('/metrics/', HTTP_X_FORWARDED_FOR='203.0.113.5')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bulk_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, moderator = create_users_api(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        data = [
+            {'author': user.username, 'text': 'Хорошо', 'score': 8},
+            {'author': moderator.username, 'text': 'Отлично', 'score': 10},
+        ]
+        assert admin_client.post(url, data=data, format='json').status_code == 201
+        assert get_value(scrape(client), 'yamdb_review_writes_total', operation='create') == 2, (
+            'Проверьте, что отзывы, созданные массово, учитываются в `yamdb_review_writes_total`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_multiprocess(self, tmp_path, settings):
+        settings.METRICS = {'DIR': str(tmp_path)}
+        metrics.HTTP_REQUESTS.inc(route='titles-list', method='GET', status=200)
+        metrics.HTTP_IN_PROGRESS.inc()
+        # Завершившийся процесс: счётчики учитываются, значения Gauge — нет.
+        other = {
+            'yamdb_http_requests_total': {
+                **metrics.HTTP_REQUESTS.describe(),
+                'samples': [[['titles-list', 'GET', '200'], 4]],
+            },
+            'yamdb_http_requests_in_progress': {
+                **metrics.HTTP_IN_PROGRESS.describe(),
+                'samples': [[[], 5]],
+            },
+        }
+        (tmp_path / '999999999-1.json').write_text(json.dumps(other), encoding='utf-8')
+        text = metrics.render()
+        assert get_value(
+            text, 'yamdb_http_requests_total', route='titles-list', method='GET', status=200
+        ) == 5, 'Проверьте, что счётчики процессов складываются'
+        assert get_value(text, 'yamdb_http_requests_in_progress') == 1, (
+            'Проверьте, что значения Gauge завершившихся процессов не учитываются'
+        )
+        assert any(path.name.startswith(f'{os.getpid()}-') for path in tmp_path.iterdir())
+        assert not (tmp_path / '999999999-1.json').exists() and (tmp_path / 'archive.json').exists(), (
+            'Проверьте, что файлы завершившихся процессов складываются в архив и удаляются'
+        )
+        assert get_value(
+            metrics.render(), 'yamdb_http_requests_total', route='titles-list', method='GET', status=200
+        ) == 5, 'Проверьте, что значения из архива учитываются при следующих сборах'
+
+    def test_06_threads(self):
+        def work():
+            for _ in range(1000):
+                metrics.REVIEW_WRITES.inc(operation='create')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert metrics.REVIEW_WRITES.snapshot() == [[['create'], 8000]], (
+            'Проверьте, что счётчики не теряют значения при работе из нескольких потоков'
+        )